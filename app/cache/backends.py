@@ -0,0 +1,94 @@
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Optional
+
+
+class CacheBackend(ABC):
+    """Базовый интерфейс кэша ответов."""
+
+    # Общий для всех процессов кэш не нужно сбрасывать по событиям других процессов
+    shared = False
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[bytes]:
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes) -> None:
+        ...
+
+    @abstractmethod
+    async def delete(self, *keys: str) -> None:
+        ...
+
+    @abstractmethod
+    async def clear(self) -> None:
+        """Очистка всего кэша; не используется при изменениях данных."""
+
+
+class MemoryCache(CacheBackend):
+    """In-process LRU-кэш с ограничением времени жизни записей."""
+
+    def __init__(self, maxsize: int = 1024, ttl: int = 60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+
+    async def get(self, key: str) -> Optional[bytes]:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        expires, value = item
+        if expires < time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: bytes) -> None:
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            self._data.pop(key, None)
+
+    async def clear(self) -> None:
+        self._data.clear()
+
+
+class RedisCache(CacheBackend):
+    """Кэш поверх Redis-протокола.
+
+    Принимает любой клиент с интерфейсом redis.asyncio (например fakeredis для тестов)."""
+
+    shared = True
+
+    def __init__(self, client: Any, ttl: int = 60, namespace: str = 'menu_api:'):
+        self.client = client
+        self.ttl = ttl
+        self.namespace = namespace
+
+    @classmethod
+    def from_url(cls, url: str, ttl: int = 60) -> 'RedisCache':
+        from redis import asyncio as aioredis
+
+        return cls(aioredis.from_url(url), ttl=ttl)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self.client.get(self.namespace + key)
+
+    async def set(self, key: str, value: bytes) -> None:
+        await self.client.set(self.namespace + key, value, ex=self.ttl)
+
+    async def delete(self, *keys: str) -> None:
+        if keys:
+            await self.client.delete(*[self.namespace + key for key in keys])
+
+    async def clear(self) -> None:
+        keys = [key async for key in self.client.scan_iter(match=f'{self.namespace}*')]
+        if keys:
+            await self.client.delete(*keys)
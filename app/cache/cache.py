@@ -0,0 +1,17 @@
+from app.cache.backends import CacheBackend, MemoryCache, RedisCache
+from app.config import CACHE_BACKEND, CACHE_MAXSIZE, CACHE_TTL, REDIS_URL
+
+
+def create_cache() -> CacheBackend:
+    """Создание бэкенда кэша по настройкам."""
+    if CACHE_BACKEND == 'redis':
+        return RedisCache.from_url(REDIS_URL, ttl=CACHE_TTL)
+    return MemoryCache(maxsize=CACHE_MAXSIZE, ttl=CACHE_TTL)
+
+
+cache = create_cache()
+
+
+async def get_cache() -> CacheBackend:
+    """Возвращает бэкенд кэша."""
+    return cache
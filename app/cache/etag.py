@@ -0,0 +1,26 @@
+from fastapi import Depends, HTTPException, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database.database import get_db
+from app.database.versions import MENUS_VERSION, menu_version, versions
+
+
+def check_etag(request: Request, version: str) -> str:
+    """Сильный ETag версии данных; при совпадении с If-None-Match запрос завершается ответом 304."""
+    etag = f'"{version}"'
+    if_none_match = request.headers.get('if-none-match')
+    if if_none_match:
+        tags = {tag.strip().removeprefix('W/') for tag in if_none_match.split(',')}
+        if etag in tags or '*' in tags:
+            raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+    return etag
+
+
+async def menus_etag(request: Request, db: AsyncSession = Depends(get_db)) -> str:
+    """ETag для ответов, зависящих от всех меню."""
+    return check_etag(request, str(await versions.get(db, MENUS_VERSION)))
+
+
+async def menu_etag(menu_id: str, request: Request, db: AsyncSession = Depends(get_db)) -> str:
+    """ETag для ответов, зависящих от поддерева одного меню."""
+    return check_etag(request, str(await versions.get(db, menu_version(menu_id))))
@@ -0,0 +1,132 @@
+from typing import Any, Awaitable, Callable, Optional, Sequence, Tuple
+
+from fastapi import Response
+
+from app.cache.backends import CacheBackend
+from app.cache.singleflight import single_flight
+from app.database.serializers import dumps
+
+MENUS_PREFIX = 'menus:'
+
+
+NEXT_CURSOR_HEADER = 'X-Next-Cursor'
+
+
+def _key(*parts: Any) -> str:
+    return ':'.join('' if part is None else str(part) for part in parts)
+
+
+def _id(value: str) -> str:
+    return str(value).lower()
+
+
+def menus_key(*params: Any) -> str:
+    return MENUS_PREFIX + _key(*params)
+
+
+def menu_key(menu_id: str) -> str:
+    return _key('menu', _id(menu_id))
+
+
+def submenus_key(menu_id: str, *params: Any) -> str:
+    return _key(menu_key(menu_id), 'submenus', *params)
+
+
+def submenu_key(menu_id: str, submenu_id: str) -> str:
+    return _key(menu_key(menu_id), 'submenu', _id(submenu_id))
+
+
+def dishes_key(menu_id: str, submenu_id: str, *params: Any) -> str:
+    return _key(submenu_key(menu_id, submenu_id), 'dishes', *params)
+
+
+def dish_key(menu_id: str, submenu_id: str, dish_id: str) -> str:
+    return _key(submenu_key(menu_id, submenu_id), 'dish', _id(dish_id))
+
+
+def with_fields(key: str, fields: Optional[Sequence[str]]) -> str:
+    """Ключ ответа с частью полей (?fields=); полный ответ хранится под исходным ключом."""
+    return key if fields is None else _key(key, 'fields', ','.join(fields))
+
+
+def tree_key(menu_id: Optional[str] = None) -> str:
+    return _key('tree') if menu_id is None else _key('tree', _id(menu_id))
+
+
+def _response(body: bytes, etag: str, next_cursor: bytes = b'') -> Response:
+    response = Response(content=body, media_type='application/json', headers={'ETag': etag})
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor.decode()
+    return response
+
+
+async def cached_response(cache: CacheBackend, key: str, etag: str) -> Optional[Response]:
+    """Ответ из кэша, если он сохранен для той же версии данных, что и etag.
+
+    Значение в кэше: строка etag, строка курсора следующей страницы (может быть пустой), тело."""
+    value = await cache.get(key)
+    if value is None:
+        return None
+    version, next_cursor, body = value.split(b'\n', 2)
+    if version.decode() != etag:
+        return None
+    return _response(body, etag, next_cursor)
+
+
+async def cache_response(cache: CacheBackend, key: str, data: Any, etag: str,
+                         next_cursor: Optional[str] = None) -> Tuple[bytes, bytes]:
+    """Сериализует данные и сохраняет их в кэш вместе с версией и курсором; возвращает тело и курсор."""
+    body = dumps(data)
+    cursor = (next_cursor or '').encode()
+    await cache.set(key, b'\n'.join((etag.encode(), cursor, body)))
+    return body, cursor
+
+
+async def cached_or_load(cache: CacheBackend, handler: str, key: str, etag: str,
+                         load: Callable[[], Awaitable[Tuple[Any, Optional[str]]]]) -> Response:
+    """Ответ из кэша, а при промахе — результат load (данные и курсор), сохраненный в кэш.
+
+    Одновременные промахи по одному ключу и версии выполняют load один раз. Между запросами
+    делятся только тело и курсор: объект ответа у каждого запроса свой."""
+    cached = await cached_response(cache, key, etag)
+    if cached is not None:
+        return cached
+
+    async def fill() -> Tuple[bytes, bytes]:
+        data, next_cursor = await load()
+        return await cache_response(cache, key, data, etag, next_cursor)
+
+    body, cursor = await single_flight.do(handler, f'{key}@{etag}', fill)
+    return _response(body, etag, cursor)
+
+
+# Сбрасываются только ключи самих объектов и деревьев: это удаление по точным ключам без просмотра
+# всего кэша. Списки и страницы хранятся вместе с версией данных (ETag) и после ее изменения
+# не отдаются, а затем истекают по времени жизни.
+
+
+async def invalidate_menu(cache: CacheBackend, menu_id: Optional[str] = None) -> None:
+    """Сброс дерева меню и самого меню."""
+    await cache.delete(tree_key())
+    if menu_id is not None:
+        await cache.delete(menu_key(menu_id), tree_key(menu_id))
+
+
+async def invalidate_submenu(cache: CacheBackend, menu_id: str, submenu_id: Optional[str] = None,
+                             counts: bool = False) -> None:
+    """Сброс деревьев, самого подменю и, при изменении количества, родительского меню."""
+    await cache.delete(tree_key(), tree_key(menu_id))
+    if submenu_id is not None:
+        await cache.delete(submenu_key(menu_id, submenu_id))
+    if counts:
+        await invalidate_menu(cache, menu_id)
+
+
+async def invalidate_dish(cache: CacheBackend, menu_id: str, submenu_id: str, dish_id: Optional[str] = None,
+                          counts: bool = False) -> None:
+    """Сброс деревьев, самого блюда и, при изменении количества, родительских подменю и меню."""
+    await cache.delete(tree_key(), tree_key(menu_id))
+    if dish_id is not None:
+        await cache.delete(dish_key(menu_id, submenu_id, dish_id))
+    if counts:
+        await invalidate_submenu(cache, menu_id, submenu_id, counts=True)
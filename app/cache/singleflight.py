@@ -0,0 +1,46 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+
+from app.metrics import SINGLEFLIGHT_CALLS, SINGLEFLIGHT_COALESCED
+
+
+class SingleFlight:
+    """Объединение одновременных одинаковых загрузок: выполняется одна, остальные ждут ее результат."""
+
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Future] = {}
+
+    async def do(self, handler: str, key: str, load: Callable[[], Awaitable[Any]]) -> Any:
+        """Результат load для ключа; если загрузка по ключу уже идет, возвращает ее результат."""
+        future = self._calls.get(key)
+        if future is not None:
+            SINGLEFLIGHT_COALESCED.labels(handler).inc()
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                # Отменен запрос, выполнявший загрузку, а не текущий: загружаем сами
+                return await load()
+
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        SINGLEFLIGHT_CALLS.labels(handler).inc()
+        try:
+            result = await load()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as error:
+            future.set_exception(error)
+            # Ошибку получат ожидающие запросы; без них исключение future не логируется
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._calls[key]
+
+
+single_flight = SingleFlight()
@@ -7,10 +7,21 @@ prefixes = '/api/v1'
 # PREFIX_LINK = 'http://127.0.0.1:8000/api/v1'
 MENUS_LINK = '/menus/'
 MENU_LINK = '/menus/{menu_id}'
+MENUS_TREE_LINK = '/menus/tree'
+MENU_TREE_LINK = '/menus/{menu_id}/tree'
+MENUS_STATS_LINK = '/menus/stats'
+MENU_STATS_LINK = '/menus/{menu_id}/stats'
+MENU_EVENTS_LINK = '/menus/{menu_id}/events'
 SUBMENUS_LINK = '/menus/{menu_id}/submenus/'
 SUBMENU_LINK = '/menus/{menu_id}/submenus/{submenu_id}'
+SUBMENUS_BULK_LINK = '/menus/{menu_id}/submenus/bulk'
 DISHES_LINK = '/menus/{menu_id}/submenus/{submenu_id}/dishes/'
 DISH_LINK = '/menus/{menu_id}/submenus/{submenu_id}/dishes/{dish_id}'
+DISHES_BULK_LINK = '/menus/{menu_id}/submenus/{submenu_id}/dishes/bulk'
+DISHES_SEARCH_LINK = '/dishes/search'
+BATCH_LINK = '/batch'
+POOL_LINK = '/monitoring/pool'
+METRICS_LINK = '/metrics'
 
 POSTGRES_USER = os.getenv('POSTGRES_USER')
 POSTGRES_PASSWORD = os.getenv('POSTGRES_PASSWORD')
@@ -18,3 +29,50 @@ POSTGRES_DB = os.getenv('POSTGRES_DB')
 POSTGRES_HOST=os.getenv('POSTGRES_HOST')
 
 conn_url = f'postgresql+asyncpg://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{POSTGRES_HOST}/{POSTGRES_DB}'
+
+DB_ECHO = os.getenv('DB_ECHO', 'false').lower() == 'true'
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 5))
+DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', 10))
+DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', 30))
+DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', -1))
+DB_POOL_PRE_PING = os.getenv('DB_POOL_PRE_PING', 'false').lower() == 'true'
+DB_STATEMENT_CACHE_SIZE = int(os.getenv('DB_STATEMENT_CACHE_SIZE', 100))
+
+# Реплики для GET-запросов: полные URL подключения через запятую
+DB_REPLICA_URLS = [url.strip() for url in os.getenv('DB_REPLICA_URLS', '').split(',') if url.strip()]
+DB_REPLICA_CONNECT_TIMEOUT = float(os.getenv('DB_REPLICA_CONNECT_TIMEOUT', 2))
+DB_REPLICA_RETRY = float(os.getenv('DB_REPLICA_RETRY', 30))
+# Сколько секунд после изменения данных чтения идут в основную базу, пока реплики его догоняют
+DB_REPLICA_LAG = float(os.getenv('DB_REPLICA_LAG', 5))
+READ_PRIMARY_HEADER = 'X-Read-Primary'
+READ_PRIMARY_COOKIE = 'read_primary'
+
+CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'memory')
+CACHE_TTL = int(os.getenv('CACHE_TTL', 60))
+CACHE_MAXSIZE = int(os.getenv('CACHE_MAXSIZE', 1024))
+REDIS_URL = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
+
+FAST_JSON = os.getenv('FAST_JSON', 'false').lower() == 'true'
+ID_INDEX = os.getenv('ID_INDEX', 'true').lower() == 'true'
+
+# Несколько воркеров uvicorn: изменения рассылаются через NOTIFY, каждый воркер слушает канал
+HOST = os.getenv('HOST', '0.0.0.0')
+PORT = int(os.getenv('PORT', 80))
+WORKERS = int(os.getenv('WORKERS', 1))
+CHANGE_NOTIFY = os.getenv('CHANGE_NOTIFY', str(WORKERS > 1)).lower() == 'true'
+CHANGE_CHANNEL = os.getenv('CHANGE_CHANNEL', 'menu_changes')
+CHANGE_RETRY = float(os.getenv('CHANGE_RETRY', 1))
+CHANGE_KEEPALIVE = float(os.getenv('CHANGE_KEEPALIVE', 30))
+CHANGE_STARTUP_TIMEOUT = float(os.getenv('CHANGE_STARTUP_TIMEOUT', 10))
+# Срок версий данных в памяти, пока процесс не подписан на изменения (0 — читать версию в каждом запросе)
+VERSIONS_TTL = float(os.getenv('VERSIONS_TTL', 1))
+
+BATCH_MAX_OPERATIONS = int(os.getenv('BATCH_MAX_OPERATIONS', 100))
+
+# Лента событий меню (SSE): размер истории для возобновления, очереди клиента и интервал ping
+FEED_HISTORY = int(os.getenv('FEED_HISTORY', 1000))
+FEED_QUEUE_SIZE = int(os.getenv('FEED_QUEUE_SIZE', 100))
+FEED_HEARTBEAT = float(os.getenv('FEED_HEARTBEAT', 15))
+
+MENU_SYNC_FILE = os.getenv('MENU_SYNC_FILE')
+MENU_SYNC_INTERVAL = float(os.getenv('MENU_SYNC_INTERVAL', 5))
@@ -0,0 +1,78 @@
+import uuid
+from typing import Any, Optional
+
+from sqlalchemy import Row, literal_column
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database.counters import add_dishes, add_submenus
+from app.database.models import Dish, SubMenu
+from app.database.stats import refresh_dish_stats
+
+BATCH_SIZE = 1000
+
+
+async def insert_unique(session: AsyncSession, model: Any, values: dict[str, Any]) -> Optional[Row]:
+    """Вставка одной строки с INSERT ... ON CONFLICT (title) DO NOTHING RETURNING.
+
+    Возвращает созданную строку или None, если строка с таким title уже существует."""
+    stmt = (insert(model).values(id=uuid.uuid4(), **values)
+            .on_conflict_do_nothing(index_elements=[model.title])
+            .returning(*[column for column in model.__table__.columns if column.computed is None]))
+    return (await session.execute(stmt)).first()
+
+
+async def _bulk_upsert(session: AsyncSession, model: Any, rows: list[dict[str, Any]], parent_column: str,
+                       upsert: bool) -> list[dict[str, Any]]:
+    """Пакетная вставка строк с INSERT ... ON CONFLICT (title).
+
+    При upsert существующие строки того же родителя обновляются, иначе пропускаются.
+    Возвращает результат для каждой входной строки в исходном порядке."""
+    first_rows = {}
+    for row in rows:
+        first_rows.setdefault(row['title'], row)
+    unique_rows = list(first_rows.values())
+    saved = {}
+    for start in range(0, len(unique_rows), BATCH_SIZE):
+        batch = [{'id': uuid.uuid4(), **row} for row in unique_rows[start:start + BATCH_SIZE]]
+        stmt = insert(model).values(batch)
+        if upsert:
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[model.title],
+                set_={key: stmt.excluded[key] for key in batch[0] if key not in ('id', 'title', parent_column)},
+                where=getattr(model, parent_column) == stmt.excluded[parent_column],
+            )
+        else:
+            stmt = stmt.on_conflict_do_nothing(index_elements=[model.title])
+        stmt = stmt.returning(model.id, model.title, literal_column('xmax = 0').label('inserted'))
+        for row in await session.execute(stmt):
+            saved[row.title] = {'id': row.id, 'status': 'created' if row.inserted else 'updated'}
+
+    results = []
+    for row in rows:
+        result = saved.pop(row['title'], {'id': None, 'status': 'skipped'})
+        results.append({'title': row['title'], **result})
+    return results
+
+
+async def bulk_upsert_submenus(session: AsyncSession, menu_id: str, submenus: list[dict[str, Any]],
+                               upsert: bool = True) -> list[dict[str, Any]]:
+    """Пакетное создание или обновление подменю меню в текущей транзакции."""
+    rows = [{**submenu, 'menu_id': menu_id} for submenu in submenus]
+    results = await _bulk_upsert(session, SubMenu, rows, 'menu_id', upsert)
+    created = sum(result['status'] == 'created' for result in results)
+    if created:
+        await add_submenus(session, menu_id, created)
+    return results
+
+
+async def bulk_upsert_dishes(session: AsyncSession, submenu_id: str, dishes: list[dict[str, Any]],
+                             upsert: bool = True) -> list[dict[str, Any]]:
+    """Пакетное создание или обновление блюд подменю в текущей транзакции."""
+    rows = [{**dish, 'submenu_id': submenu_id} for dish in dishes]
+    results = await _bulk_upsert(session, Dish, rows, 'submenu_id', upsert)
+    created = sum(result['status'] == 'created' for result in results)
+    if created:
+        await add_dishes(session, submenu_id, created)
+    await refresh_dish_stats(session, [submenu_id])
+    return results
@@ -0,0 +1,67 @@
+import asyncio
+from typing import Collection, Optional
+
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database.database import SessionLocal
+from app.database.models import Dish, Menu, SubMenu
+
+
+async def add_submenus(session: AsyncSession, menu_id: str, delta: int = 1) -> None:
+    """Изменение счетчика подменю в меню в текущей транзакции."""
+    await session.execute(
+        update(Menu).where(Menu.id == menu_id).values(submenus_count=Menu.submenus_count + delta)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def add_dishes(session: AsyncSession, submenu_id: str, delta: int = 1) -> None:
+    """Изменение счетчиков блюд в подменю и его меню в текущей транзакции."""
+    await session.execute(
+        update(SubMenu).where(SubMenu.id == submenu_id).values(dishes_count=SubMenu.dishes_count + delta)
+        .execution_options(synchronize_session=False)
+    )
+    menu_id = select(SubMenu.menu_id).where(SubMenu.id == submenu_id).scalar_subquery()
+    await session.execute(
+        update(Menu).where(Menu.id == menu_id).values(dishes_count=Menu.dishes_count + delta)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def remove_submenu(session: AsyncSession, menu_id: str, dishes_count: int) -> None:
+    """Вычитание удаленного подменю и всех его блюд из счетчиков меню в текущей транзакции."""
+    await session.execute(
+        update(Menu).where(Menu.id == menu_id).values(
+            submenus_count=Menu.submenus_count - 1,
+            dishes_count=Menu.dishes_count - dishes_count,
+        ).execution_options(synchronize_session=False)
+    )
+
+
+async def recalculate_counters(session: AsyncSession, menu_ids: Optional[Collection[str]] = None) -> None:
+    """Пересчет счетчиков по фактическим данным: всех или только указанных меню."""
+    submenus = update(SubMenu).values(
+        dishes_count=select(func.count(Dish.id)).where(Dish.submenu_id == SubMenu.id).scalar_subquery()
+    )
+    menus = update(Menu).values(
+        submenus_count=select(func.count(SubMenu.id)).where(SubMenu.menu_id == Menu.id).scalar_subquery(),
+        dishes_count=select(func.coalesce(func.sum(SubMenu.dishes_count), 0))
+        .where(SubMenu.menu_id == Menu.id).scalar_subquery(),
+    )
+    if menu_ids is not None:
+        submenus = submenus.where(SubMenu.menu_id.in_(menu_ids))
+        menus = menus.where(Menu.id.in_(menu_ids))
+    await session.execute(submenus.execution_options(synchronize_session=False))
+    await session.execute(menus.execution_options(synchronize_session=False))
+
+
+async def main() -> None:
+    async with SessionLocal() as session:
+        await recalculate_counters(session)
+        await session.commit()
+    print("Counters recalculated")
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
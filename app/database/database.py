@@ -1,23 +1,42 @@
-from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
 from sqlalchemy.ext.asyncio import async_sessionmaker
 from sqlalchemy.ext.asyncio import create_async_engine
 from sqlalchemy.orm import declarative_base
-from app.config import conn_url
+from app.config import (conn_url, DB_ECHO, DB_MAX_OVERFLOW, DB_POOL_PRE_PING, DB_POOL_RECYCLE, DB_POOL_SIZE,
+                        DB_POOL_TIMEOUT, DB_STATEMENT_CACHE_SIZE)
+from app.database.pool import InstrumentedQueuePool
 
 Base = declarative_base()
 
 
-engine = create_async_engine(conn_url, echo=True)
+def create_engine(url: str, **connect_args: Any) -> AsyncEngine:
+    """Создание движка с настройками пула из конфигурации."""
+    return create_async_engine(
+        url,
+        echo=DB_ECHO,
+        poolclass=InstrumentedQueuePool,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=DB_POOL_PRE_PING,
+        connect_args={'prepared_statement_cache_size': DB_STATEMENT_CACHE_SIZE, **connect_args},
+    )
+
+
+engine = create_engine(conn_url)
 
 
 SessionLocal = async_sessionmaker(autocommit=False, autoflush=False, class_=AsyncSession, bind=engine)
 
 
 async def init_db():
-    """Создание таблиц."""
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.drop_all)
-        await conn.run_sync(Base.metadata.create_all)
+    """Приведение схемы БД к текущей версии без удаления данных."""
+    from app.database.migrations import migrate
+
+    await migrate(engine)
 
 
 async def get_db() -> AsyncSession:
@@ -0,0 +1,45 @@
+from functools import lru_cache
+from typing import Any, Optional, Sequence, Tuple, Type
+
+from fastapi import HTTPException, status
+from pydantic import BaseModel
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+Fields = Optional[Tuple[str, ...]]
+
+
+def parse_fields(fields: Optional[str], schema: Type[BaseModel]) -> Fields:
+    """Поля ответа из параметра ?fields= в порядке схемы; id возвращается всегда.
+
+    None — все поля схемы: такой ответ строится и кэшируется как обычный."""
+    if fields is None:
+        return None
+    requested = {field.strip() for field in fields.split(',') if field.strip()} | {'id'}
+    unknown = requested - set(schema.model_fields)
+    if unknown:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail=f"unknown fields: {', '.join(sorted(unknown))}")
+    if requested == set(schema.model_fields):
+        return None
+    return tuple(field for field in schema.model_fields if field in requested)
+
+
+@lru_cache(maxsize=1024)
+def _narrowed(statement: Select, model: Any, fields: Tuple[str, ...]) -> Select:
+    # Суженный запрос строится один раз на готовый запрос и набор полей, как и сами готовые запросы
+    return statement.with_only_columns(*[getattr(model, field) for field in fields])
+
+
+def only(statement: Select, model: Any, fields: Fields) -> Select:
+    """Запрос только колонок запрошенных полей; без fields — запрос объектов модели."""
+    if fields is None:
+        return statement
+    return _narrowed(statement, model, fields)
+
+
+async def select_rows(db: AsyncSession, statement: Select, params: dict[str, Any], model: Any,
+                      fields: Fields) -> Sequence[Any]:
+    """Объекты модели или строки с запрошенными колонками."""
+    result = await db.execute(only(statement, model, fields), params)
+    return result.all() if fields is not None else result.scalars().all()
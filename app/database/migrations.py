@@ -0,0 +1,125 @@
+import asyncio
+from typing import Awaitable, Callable, List, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession
+
+from app.database.counters import recalculate_counters
+from app.database.database import Base, engine
+from app.database.models import SEARCH_VECTOR, DataVersion, DishStats
+from app.database.stats import refresh_dish_stats
+from app.database.versions import MENU_VERSION_PREFIX, MENUS_VERSION
+
+# Ключ advisory-блокировки, под которой воркеры по очереди применяют миграции.
+MIGRATION_LOCK_KEY = 7_202_401
+
+Migration = Callable[[AsyncConnection], Awaitable[None]]
+
+
+async def create_tables(conn: AsyncConnection) -> None:
+    """Создание отсутствующих таблиц по текущим моделям."""
+    await conn.run_sync(Base.metadata.create_all)
+
+
+async def add_counters(conn: AsyncConnection) -> None:
+    """Счетчики и составные индексы для баз, созданных до их появления."""
+    await conn.execute(text(
+        'ALTER TABLE menus '
+        'ADD COLUMN IF NOT EXISTS submenus_count integer NOT NULL DEFAULT 0, '
+        'ADD COLUMN IF NOT EXISTS dishes_count integer NOT NULL DEFAULT 0'
+    ))
+    await conn.execute(text('ALTER TABLE submenus ADD COLUMN IF NOT EXISTS dishes_count integer NOT NULL DEFAULT 0'))
+    await conn.execute(text('CREATE INDEX IF NOT EXISTS ix_submenus_menu_id_id ON submenus (menu_id, id)'))
+    await conn.execute(text('CREATE INDEX IF NOT EXISTS ix_dishes_submenu_id_id ON dishes (submenu_id, id)'))
+    async with AsyncSession(bind=conn) as session:
+        await recalculate_counters(session)
+
+
+async def cascade_foreign_keys(conn: AsyncConnection) -> None:
+    """Каскадное удаление подменю и блюд на уровне внешних ключей."""
+    await conn.execute(text(
+        'ALTER TABLE submenus DROP CONSTRAINT IF EXISTS submenus_menu_id_fkey, '
+        'ADD CONSTRAINT submenus_menu_id_fkey FOREIGN KEY (menu_id) REFERENCES menus (id) ON DELETE CASCADE'
+    ))
+    await conn.execute(text(
+        'ALTER TABLE dishes DROP CONSTRAINT IF EXISTS dishes_submenu_id_fkey, '
+        'ADD CONSTRAINT dishes_submenu_id_fkey FOREIGN KEY (submenu_id) REFERENCES submenus (id) ON DELETE CASCADE'
+    ))
+
+
+async def add_dish_search(conn: AsyncConnection) -> None:
+    """Полнотекстовый поиск блюд и индекс по цене."""
+    await conn.execute(text(
+        f'ALTER TABLE dishes ADD COLUMN IF NOT EXISTS search_vector tsvector '
+        f'GENERATED ALWAYS AS ({SEARCH_VECTOR}) STORED'
+    ))
+    await conn.execute(text('CREATE INDEX IF NOT EXISTS ix_dishes_search_vector ON dishes USING gin (search_vector)'))
+    await conn.execute(text('CREATE INDEX IF NOT EXISTS ix_dishes_price ON dishes (price)'))
+
+
+async def add_dish_stats(conn: AsyncConnection) -> None:
+    """Таблица агрегатов цен блюд, заполненная по текущим данным."""
+    await conn.run_sync(DishStats.__table__.create, checkfirst=True)
+    async with AsyncSession(bind=conn) as session:
+        await refresh_dish_stats(session)
+
+
+async def add_data_versions(conn: AsyncConnection) -> None:
+    """Таблица версий данных для ETag со строками для всех меню и существующих меню."""
+    await conn.run_sync(DataVersion.__table__.create, checkfirst=True)
+    await conn.execute(text(
+        'INSERT INTO data_versions (key, version) SELECT CAST(:prefix AS varchar) || CAST(id AS varchar), 0 FROM menus '
+        'UNION ALL SELECT CAST(:menus AS varchar), 0 ON CONFLICT DO NOTHING'
+    ), {'prefix': MENU_VERSION_PREFIX, 'menus': MENUS_VERSION})
+
+
+# Миграции применяются по порядку, номер версии схемы — позиция в списке.
+# create_tables создает таблицы сразу по последним моделям, поэтому следующие миграции
+# должны быть идемпотентными (IF NOT EXISTS и т.п.).
+MIGRATIONS: List[Tuple[str, Migration]] = [
+    ('create tables', create_tables),
+    ('add counters', add_counters),
+    ('cascade foreign keys', cascade_foreign_keys),
+    ('add dish search', add_dish_search),
+    ('add dish stats', add_dish_stats),
+    ('add data versions', add_data_versions),
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+async def current_version(conn: AsyncConnection) -> int:
+    """Версия схемы, записанная в базе; 0 для пустой базы."""
+    if (await conn.execute(text("SELECT to_regclass('schema_version')"))).scalar() is None:
+        return 0
+    return (await conn.execute(text('SELECT max(version) FROM schema_version'))).scalar() or 0
+
+
+async def migrate(db_engine: AsyncEngine = engine) -> List[str]:
+    """Применение недостающих миграций под advisory-блокировкой; возвращает их названия."""
+    async with db_engine.connect() as conn:
+        if await current_version(conn) >= SCHEMA_VERSION:
+            return []
+    applied = []
+    async with db_engine.begin() as conn:
+        await conn.execute(text('SELECT pg_advisory_xact_lock(:key)'), {'key': MIGRATION_LOCK_KEY})
+        await conn.execute(text(
+            'CREATE TABLE IF NOT EXISTS schema_version ('
+            'version integer PRIMARY KEY, name varchar NOT NULL, applied_at timestamptz NOT NULL DEFAULT now())'
+        ))
+        version = await current_version(conn)
+        for number, (name, migration) in enumerate(MIGRATIONS[version:], start=version + 1):
+            await migration(conn)
+            await conn.execute(text('INSERT INTO schema_version (version, name) VALUES (:version, :name)'),
+                               {'version': number, 'name': name})
+            applied.append(name)
+    return applied
+
+
+async def main() -> None:
+    applied = await migrate()
+    print(f"Applied migrations: {', '.join(applied) or 'none'}; schema version {SCHEMA_VERSION}")
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -1,9 +1,12 @@
 import uuid
-from sqlalchemy import Column, String, ForeignKey, DECIMAL
-from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy import BigInteger, Column, Computed, String, ForeignKey, DECIMAL, Index, Integer
+from sqlalchemy.dialects.postgresql import TSVECTOR, UUID
+from sqlalchemy.orm import deferred, relationship
 from app.database.database import Base
 
+SEARCH_CONFIG = 'russian'
+SEARCH_VECTOR = f"to_tsvector('{SEARCH_CONFIG}', coalesce(title, '') || ' ' || coalesce(description, ''))"
+
 
 class Menu(Base):
     __tablename__ = "menus"
@@ -11,26 +14,57 @@ class Menu(Base):
     id = Column(UUID, primary_key=True, index=True, default=uuid.uuid4, unique=True, nullable=False)
     title = Column(String, unique=True, index=True)
     description = Column(String)
-    submenus = relationship("SubMenu", back_populates="menu", cascade="all, delete-orphan")
+    submenus_count = Column(Integer, default=0, server_default='0', nullable=False)
+    dishes_count = Column(Integer, default=0, server_default='0', nullable=False)
+    submenus = relationship("SubMenu", back_populates="menu", cascade="all, delete-orphan", passive_deletes=True,
+                            order_by="SubMenu.id")
 
 
 class SubMenu(Base):
     __tablename__ = "submenus"
+    __table_args__ = (Index("ix_submenus_menu_id_id", "menu_id", "id"),)
 
     id = Column(UUID, primary_key=True, index=True, default=uuid.uuid4, unique=True, nullable=False)
     title = Column(String, unique=True, index=True)
     description = Column(String)
-    menu_id = Column(UUID, ForeignKey("menus.id"))
+    menu_id = Column(UUID, ForeignKey("menus.id", ondelete="CASCADE"))
+    dishes_count = Column(Integer, default=0, server_default='0', nullable=False)
     menu = relationship("Menu", back_populates="submenus")
-    dishes = relationship("Dish", back_populates="submenu", cascade="all, delete-orphan")
+    dishes = relationship("Dish", back_populates="submenu", cascade="all, delete-orphan", passive_deletes=True,
+                          order_by="Dish.id")
 
 
 class Dish(Base):
     __tablename__ = "dishes"
+    __table_args__ = (
+        Index("ix_dishes_submenu_id_id", "submenu_id", "id"),
+        Index("ix_dishes_search_vector", "search_vector", postgresql_using="gin"),
+    )
 
     id = Column(UUID, primary_key=True, index=True, default=uuid.uuid4, unique=True, nullable=False)
     title = Column(String, unique=True, index=True)
     description = Column(String)
-    price = Column(DECIMAL(precision=10, scale=4))
-    submenu_id = Column(UUID, ForeignKey("submenus.id"), index=True, nullable=False)
+    price = Column(DECIMAL(precision=10, scale=4), index=True)
+    submenu_id = Column(UUID, ForeignKey("submenus.id", ondelete="CASCADE"), index=True, nullable=False)
     submenu = relationship("SubMenu", back_populates="dishes")
+    # Полнотекстовый индекс названия и описания; не загружается вместе с блюдом
+    search_vector = deferred(Column(TSVECTOR, Computed(SEARCH_VECTOR, persisted=True)))
+
+
+class DishStats(Base):
+    """Агрегаты цен блюд подменю, обновляются при каждом изменении блюд."""
+    __tablename__ = "dish_stats"
+
+    submenu_id = Column(UUID, ForeignKey("submenus.id", ondelete="CASCADE"), primary_key=True)
+    dishes_count = Column(Integer, default=0, server_default='0', nullable=False)
+    min_price = Column(DECIMAL(precision=10, scale=4))
+    max_price = Column(DECIMAL(precision=10, scale=4))
+    total_price = Column(DECIMAL(precision=16, scale=4), default=0, server_default='0', nullable=False)
+
+
+class DataVersion(Base):
+    """Версии данных для ETag: всех меню и поддерева каждого меню, увеличиваются в транзакции изменения."""
+    __tablename__ = "data_versions"
+
+    key = Column(String, primary_key=True)
+    version = Column(BigInteger, default=0, server_default='0', nullable=False)
@@ -0,0 +1,27 @@
+import base64
+import binascii
+import uuid
+from typing import Any, Optional, Sequence
+
+from fastapi import HTTPException, status
+
+
+def encode_cursor(last_id: Any) -> str:
+    """Непрозрачный курсор из идентификатора последней строки страницы."""
+    value = last_id if isinstance(last_id, uuid.UUID) else uuid.UUID(str(last_id))
+    return base64.urlsafe_b64encode(value.bytes).rstrip(b'=').decode()
+
+
+def decode_cursor(cursor: str) -> uuid.UUID:
+    """Идентификатор, после которого начинается следующая страница."""
+    try:
+        return uuid.UUID(bytes=base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except (binascii.Error, ValueError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="invalid cursor")
+
+
+def next_cursor(rows: Sequence[Any], limit: int) -> Optional[str]:
+    """Курсор следующей страницы, если текущая страница заполнена."""
+    if limit and len(rows) == limit:
+        return encode_cursor(rows[-1].id)
+    return None
@@ -0,0 +1,103 @@
+import asyncio
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence
+
+from fastapi import Request
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.orm import Session
+
+from app.config import (DB_REPLICA_CONNECT_TIMEOUT, DB_REPLICA_LAG, DB_REPLICA_RETRY, DB_REPLICA_URLS,
+                        READ_PRIMARY_COOKIE, READ_PRIMARY_HEADER)
+from app.database.database import SessionLocal, create_engine, engine
+
+
+class ReplicaRouter:
+    """Выбор реплики для чтения по кругу с переключением на основную базу.
+
+    После изменения данных версия для ETag уже новая, а реплика еще может отдать старые данные,
+    которые попали бы в кэш под новой версией. Поэтому lag секунд после изменения чтения идут в основную базу."""
+
+    def __init__(self, primary: AsyncEngine, replicas: Sequence[AsyncEngine], retry: float = DB_REPLICA_RETRY,
+                 lag: float = DB_REPLICA_LAG):
+        self.primary = primary
+        self.replicas = list(replicas)
+        self.retry = retry
+        self.lag = lag
+        self._next = 0
+        self._down_until: Dict[AsyncEngine, float] = {}
+        self._primary_until = 0.0
+
+    def changed(self) -> None:
+        """Данные изменены (этим или другим процессом): реплики могут отставать."""
+        self._primary_until = time.monotonic() + self.lag
+
+    def lagging(self) -> bool:
+        return time.monotonic() < self._primary_until
+
+    def _candidates(self) -> List[AsyncEngine]:
+        start = self._next
+        self._next = (self._next + 1) % max(len(self.replicas), 1)
+        return self.replicas[start:] + self.replicas[:start]
+
+    def healthy(self, replica: AsyncEngine) -> bool:
+        return self._down_until.get(replica, 0) <= time.monotonic()
+
+    def connect(self) -> Connection:
+        """Соединение с первой доступной репликой; недоступная реплика пропускается retry секунд.
+
+        Вызывается из синхронной сессии внутри AsyncSession, поэтому соединение синхронное."""
+        for replica in self._candidates():
+            if not self.healthy(replica):
+                continue
+            try:
+                return replica.sync_engine.connect()
+            except (OSError, SQLAlchemyError, asyncio.TimeoutError):
+                self._down_until[replica] = time.monotonic() + self.retry
+        return self.primary.sync_engine.connect()
+
+
+class ReplicaSession(Session):
+    """Сессия чтения, которая выбирает реплику и подключается к ней только при первом SQL-запросе.
+
+    Ответы 304 и ответы из кэша не занимают соединение из пула."""
+
+    def __init__(self, router: ReplicaRouter, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.router = router
+        self._connection: Optional[Connection] = None
+
+    def get_bind(self, *args: Any, **kwargs: Any) -> Connection:
+        if self._connection is None:
+            self._connection = self.router.connect()
+        return self._connection
+
+    def close(self) -> None:
+        try:
+            super().close()
+        finally:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+
+replica_engines = [create_engine(url, timeout=DB_REPLICA_CONNECT_TIMEOUT) for url in DB_REPLICA_URLS]
+
+replica_router = ReplicaRouter(engine, replica_engines)
+
+
+def reads_primary(request: Request) -> bool:
+    """Запрос должен читать из основной базы: изменение данных или read-your-writes."""
+    return (request.method not in ('GET', 'HEAD') or bool(request.headers.get(READ_PRIMARY_HEADER))
+            or bool(request.cookies.get(READ_PRIMARY_COOKIE)))
+
+
+async def get_read_db(request: Request) -> AsyncIterator[AsyncSession]:
+    """Возвращает сессию для чтения: с репликой или с основной базой."""
+    if not replica_router.replicas or reads_primary(request) or replica_router.lagging():
+        async with SessionLocal() as async_session:
+            yield async_session
+        return
+    async with AsyncSession(sync_session_class=ReplicaSession, router=replica_router, autoflush=False) as async_session:
+        yield async_session
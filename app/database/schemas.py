@@ -1,6 +1,8 @@
-from pydantic import BaseModel, UUID4, field_validator
+from pydantic import BaseModel, ConfigDict, Field, UUID4, field_validator
 from decimal import Decimal
-from typing import Union
+from typing import Any, List, Literal, Optional, Union
+
+from app.config import BATCH_MAX_OPERATIONS
 
 
 class MenuBase(BaseModel):
@@ -13,6 +15,8 @@ class MenuCreate(MenuBase):
 
 
 class Menu(MenuBase):
+    model_config = ConfigDict(from_attributes=True)
+
     id: UUID4
     title: str
     description: str
@@ -30,6 +34,8 @@ class SubMenuCreate(SubMenuBase):
 
 
 class SubMenu(SubMenuBase):
+    model_config = ConfigDict(from_attributes=True)
+
     id: UUID4
     title: str
     description: str
@@ -47,6 +53,8 @@ class DishCreate(DishBase):
 
 
 class Dish(DishBase):
+    model_config = ConfigDict(from_attributes=True)
+
     id: UUID4
     title: str
     description: str
@@ -55,3 +63,54 @@ class Dish(DishBase):
     @field_validator('price')
     def validate_price(cls, v: Decimal):
         return f'{v:.2f}'
+
+
+class DishSearchResult(Dish):
+    submenu_id: UUID4
+    menu_id: UUID4
+
+
+class PriceStats(BaseModel):
+    dishes_count: int = 0
+    min_price: Optional[str] = None
+    max_price: Optional[str] = None
+    avg_price: Optional[str] = None
+
+
+class SubMenuStats(PriceStats):
+    submenu_id: UUID4
+
+
+class MenuStats(PriceStats):
+    menu_id: UUID4
+    submenus: List[SubMenuStats] = []
+
+
+class BulkResult(BaseModel):
+    title: str
+    id: Optional[UUID4] = None
+    status: Literal['created', 'updated', 'skipped']
+
+
+class BatchOperation(BaseModel):
+    method: Literal['POST', 'PATCH', 'DELETE']
+    path: str
+    body: Any = None
+
+
+class BatchRequest(BaseModel):
+    atomic: bool = True
+    operations: List[BatchOperation] = Field(max_length=BATCH_MAX_OPERATIONS)
+
+
+class BatchResult(BaseModel):
+    status: int
+    body: Any = None
+
+
+class SubMenuTree(SubMenu):
+    dishes: List[Dish] = []
+
+
+class MenuTree(Menu):
+    submenus: List[SubMenuTree] = []
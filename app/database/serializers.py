@@ -0,0 +1,66 @@
+import json
+from typing import Any, Optional, Sequence
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+
+from app.config import FAST_JSON
+from app.database.schemas import Dish, Menu, MenuTree, SubMenu
+
+# В быстром режиме (FAST_JSON) строки БД превращаются в словари без Pydantic-валидации
+# и сериализуются orjson; иначе используются схемы из schemas.py.
+
+
+def fields_data(row: Any, fields: Sequence[str]) -> dict[str, Any]:
+    """Только запрошенные поля для ответа; цена форматируется так же, как в схеме."""
+    data = {field: getattr(row, field) for field in fields}
+    if 'price' in data:
+        data['price'] = f"{data['price']:.2f}"
+    return data
+
+
+def menu_data(menu: Any, fields: Optional[Sequence[str]] = None) -> Any:
+    """Данные меню для ответа."""
+    if fields is not None:
+        return fields_data(menu, fields)
+    if not FAST_JSON:
+        return Menu.model_validate(menu)
+    return {'title': menu.title, 'description': menu.description, 'id': menu.id,
+            'submenus_count': menu.submenus_count, 'dishes_count': menu.dishes_count}
+
+
+def submenu_data(submenu: Any, fields: Optional[Sequence[str]] = None) -> Any:
+    """Данные подменю для ответа."""
+    if fields is not None:
+        return fields_data(submenu, fields)
+    if not FAST_JSON:
+        return SubMenu.model_validate(submenu)
+    return {'title': submenu.title, 'description': submenu.description, 'id': submenu.id,
+            'dishes_count': submenu.dishes_count}
+
+
+def dish_data(dish: Any, fields: Optional[Sequence[str]] = None) -> Any:
+    """Данные блюда для ответа; цена форматируется один раз."""
+    if fields is not None:
+        return fields_data(dish, fields)
+    if not FAST_JSON:
+        return Dish.model_validate(dish)
+    return {'title': dish.title, 'description': dish.description, 'price': f'{dish.price:.2f}', 'id': dish.id}
+
+
+def menu_tree_data(menu: Any) -> Any:
+    """Данные дерева меню для ответа."""
+    if not FAST_JSON:
+        return MenuTree.model_validate(menu)
+    return {
+        **menu_data(menu),
+        'submenus': [{**submenu_data(submenu), 'dishes': [dish_data(dish) for dish in submenu.dishes]}
+                     for submenu in menu.submenus],
+    }
+
+
+def dumps(data: Any) -> bytes:
+    """Сериализация данных ответа в JSON."""
+    if FAST_JSON:
+        return orjson.dumps(data)
+    return json.dumps(jsonable_encoder(data)).encode()
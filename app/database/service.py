@@ -1,29 +1,149 @@
+import uuid
+from contextlib import contextmanager
+from typing import Iterable, Iterator, Optional
+
+from fastapi import HTTPException
 from sqlalchemy import exists, select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm.exc import NoResultFound
 
-from models import Dish, Menu, SubMenu
+from app.config import ID_INDEX
+from app.database.models import Menu, SubMenu
+
+
+def _uuid(value: str) -> Optional[str]:
+    """Идентификатор в каноническом виде или None, если это не UUID."""
+    try:
+        return str(uuid.UUID(str(value)))
+    except ValueError:
+        return None
+
+
+class IdIndex:
+    """Идентификаторы меню и подменю в памяти процесса.
+
+    Обновляется после изменений этого процесса и событий других процессов. Индекс полон (complete),
+    если загружен во время текущей подписки на события: тогда отсутствующий в нем объект не существует.
+    Без подписки в базу могут писать без событий (синхронизация из CLI, заполнение для нагрузочного
+    теста), поэтому индекс подтверждает только существование, а отсутствующий объект проверяется запросом к БД."""
+
+    def __init__(self):
+        self.loaded = False
+        self.menus: dict[str, set[str]] = {}
+        self.submenus: dict[str, str] = {}
+        # Номер текущей подписки на события (0 — подписки нет) и подписки, во время которой загружен индекс
+        self.subscription = 0
+        self._subscriptions = 0
+        self._loaded_in = 0
+
+    @property
+    def complete(self) -> bool:
+        return self.loaded and self.subscription != 0 and self._loaded_in == self.subscription
+
+    def subscribe(self) -> None:
+        """Подписка на события установлена; события до нее могли быть пропущены, поэтому нужна перезагрузка."""
+        self._subscriptions += 1
+        self.subscription = self._subscriptions
+
+    def unsubscribe(self) -> None:
+        self.subscription = 0
+
+    async def load(self, session: AsyncSession) -> None:
+        """Загрузка всех идентификаторов меню и подменю из БД."""
+        subscription = self.subscription
+        menus: dict[str, set[str]] = {str(menu_id): set() for menu_id in await session.scalars(select(Menu.id))}
+        submenus = {}
+        for submenu_id, menu_id in await session.execute(select(SubMenu.id, SubMenu.menu_id)):
+            submenus[str(submenu_id)] = str(menu_id)
+            menus.setdefault(str(menu_id), set()).add(str(submenu_id))
+        self.menus, self.submenus, self.loaded, self._loaded_in = menus, submenus, True, subscription
+
+    def add_menu(self, menu_id: str) -> None:
+        self.menus.setdefault(str(menu_id), set())
+
+    def remove_menu(self, menu_id: str) -> None:
+        for submenu_id in self.menus.pop(str(menu_id), set()):
+            self.submenus.pop(submenu_id, None)
+
+    def add_submenus(self, menu_id: str, submenu_ids: Iterable[str]) -> None:
+        for submenu_id in map(str, submenu_ids):
+            self.submenus[submenu_id] = str(menu_id)
+            self.menus.setdefault(str(menu_id), set()).add(submenu_id)
+
+    def remove_submenu(self, submenu_id: str) -> None:
+        menu_id = self.submenus.pop(str(submenu_id), None)
+        if menu_id is not None:
+            self.menus.get(menu_id, set()).discard(str(submenu_id))
+
+
+id_index = IdIndex()
+
+# Ключ session.info со списком незакоммиченных событий пакета операций. Индекс не видит
+# изменений пакета до коммита, поэтому внутри пакета существование проверяется запросом к БД.
+PENDING_CHANGES = 'pending_changes'
+
+
+def _use_index(db: AsyncSession) -> bool:
+    return ID_INDEX and id_index.loaded and PENDING_CHANGES not in db.info
+
+
+async def menu_exists(db: AsyncSession, menu_id: str) -> bool:
+    """Существование меню по индексу; если в неполном индексе меню нет — запросом к БД."""
+    menu_id = _uuid(menu_id)
+    if menu_id is None:
+        return False
+    use_index = _use_index(db)
+    if use_index and (menu_id in id_index.menus or id_index.complete):
+        return menu_id in id_index.menus
+    found = await db.scalar(select(exists().where(Menu.id == menu_id)))
+    if found and use_index:
+        id_index.add_menu(menu_id)
+    return found
+
+
+async def submenu_exists(db: AsyncSession, menu_id: str, submenu_id: str) -> bool:
+    """Существование подменю в указанном меню по индексу; если в неполном индексе его нет — запросом к БД."""
+    menu_id, submenu_id = _uuid(menu_id), _uuid(submenu_id)
+    if menu_id is None or submenu_id is None:
+        return False
+    use_index = _use_index(db)
+    if use_index and (id_index.submenus.get(submenu_id) == menu_id or id_index.complete):
+        return id_index.submenus.get(submenu_id) == menu_id
+    found = await db.scalar(select(exists().where(SubMenu.id == submenu_id, SubMenu.menu_id == menu_id)))
+    if found and use_index:
+        id_index.remove_submenu(submenu_id)
+        id_index.add_submenus(menu_id, [submenu_id])
+    return found
 
 
 async def check_menu_exists(db: AsyncSession, menu_id: str) -> None:
     """Проверка на существование меню."""
-    query = select(exists().where(Menu.id == menu_id))
-    exists_menu = await db.scalar(query)
-    if not exists_menu:
-        raise NoResultFound('Menu not found')
+    if not await menu_exists(db, menu_id):
+        raise HTTPException(status_code=404, detail="menu not found")
 
 
-async def check_submenu_exists(db: AsyncSession, submenu_id: str) -> None:
+async def check_submenu_exists(db: AsyncSession, menu_id: str, submenu_id: str) -> None:
     """Проверка на существование подменю."""
-    query = select(exists().where(SubMenu.id == submenu_id))
-    exists_submenu = await db.scalar(query)
-    if not exists_submenu:
-        raise NoResultFound('Submenu not found')
-
-
-async def check_dish_exists(db: AsyncSession, dish_id: str) -> None:
-    """Проверка на существование блюда."""
-    query = select(exists().where(Dish.id == dish_id))
-    exists_dish = await db.scalar(query)
-    if not exists_dish:
-        raise NoResultFound('Dish not found')
+    if not await submenu_exists(db, menu_id, submenu_id):
+        raise HTTPException(status_code=404, detail="submenu not found")
+
+
+FOREIGN_KEY_VIOLATION = '23503'
+
+
+@contextmanager
+def parent_required(menu_id: str, submenu_id: Optional[str] = None) -> Iterator[None]:
+    """Вставка в меню или подменю, существование которого подтвердил индекс.
+
+    Родитель мог быть удален без события или параллельным запросом: нарушение внешнего ключа
+    означает 404, а устаревший идентификатор удаляется из индекса."""
+    try:
+        yield
+    except IntegrityError as error:
+        if getattr(error.orig, 'sqlstate', None) != FOREIGN_KEY_VIOLATION:
+            raise
+        if submenu_id is None:
+            id_index.remove_menu(_uuid(menu_id))
+            raise HTTPException(status_code=404, detail="menu not found") from error
+        id_index.remove_submenu(_uuid(submenu_id))
+        raise HTTPException(status_code=404, detail="submenu not found") from error
@@ -0,0 +1,73 @@
+from decimal import Decimal
+from typing import Any, Optional, Tuple
+
+from sqlalchemy import Select, bindparam, delete, func, select
+from sqlalchemy.orm import selectinload
+
+from app.database.models import SEARCH_CONFIG, Dish, DishStats, Menu, SubMenu
+from app.database.pagination import decode_cursor
+
+# Горячие запросы роутеров строятся один раз при импорте. Значения передаются параметрами,
+# поэтому ключ кэша SQLAlchemy вычисляется однократно, SQL-строка не меняется между запросами
+# и asyncpg переиспользует подготовленный statement из кэша соединения.
+
+Pages = Tuple[Select, Select]
+
+
+def pages(query: Select, key: Any) -> Pages:
+    """Запросы страницы, упорядоченной по ключу: по смещению (skip, limit) и по курсору (cursor, limit)."""
+    query = query.order_by(key)
+    return (query.offset(bindparam('skip')).limit(bindparam('limit')),
+            query.where(key > bindparam('cursor')).limit(bindparam('limit')))
+
+
+def page(statements: Pages, skip: int, limit: int, cursor: Optional[str] = None,
+         **params: Any) -> Tuple[Select, dict[str, Any]]:
+    """Запрос страницы и его параметры; с курсором используется keyset-пагинация."""
+    if cursor is not None:
+        return statements[1], {**params, 'cursor': decode_cursor(cursor), 'limit': limit}
+    return statements[0], {**params, 'skip': skip, 'limit': limit}
+
+
+MENUS = pages(select(Menu), Menu.id)
+MENU = select(Menu).where(Menu.id == bindparam('menu_id'))
+# Меню, подменю и блюда дерева упорядочены по id (подменю и блюда — через order_by отношений),
+# чтобы тело ответа и его ETag не менялись между запросами
+MENUS_TREE = select(Menu).options(selectinload(Menu.submenus).selectinload(SubMenu.dishes)).order_by(Menu.id)
+MENU_TREE = MENUS_TREE.where(Menu.id == bindparam('menu_id'))
+DELETE_MENU = (delete(Menu).where(Menu.id == bindparam('menu_id')).returning(Menu.id)
+               .execution_options(synchronize_session=False))
+
+SUBMENUS = pages(select(SubMenu).where(SubMenu.menu_id == bindparam('menu_id')), SubMenu.id)
+SUBMENU = select(SubMenu).where(SubMenu.id == bindparam('submenu_id'), SubMenu.menu_id == bindparam('menu_id'))
+DELETE_SUBMENU = (delete(SubMenu)
+                  .where(SubMenu.id == bindparam('submenu_id'), SubMenu.menu_id == bindparam('menu_id'))
+                  .returning(SubMenu.id, SubMenu.dishes_count).execution_options(synchronize_session=False))
+
+DISHES = pages(select(Dish).where(Dish.submenu_id == bindparam('submenu_id')), Dish.id)
+DISH = select(Dish).where(Dish.id == bindparam('dish_id'), Dish.submenu_id == bindparam('submenu_id'))
+DELETE_DISH = (delete(Dish).where(Dish.id == bindparam('dish_id'), Dish.submenu_id == bindparam('submenu_id'))
+               .returning(Dish.id, Dish.price).execution_options(synchronize_session=False))
+
+STATS = (select(Menu.id.label('menu_id'), SubMenu.id.label('submenu_id'), DishStats.dishes_count,
+                DishStats.min_price, DishStats.max_price, DishStats.total_price)
+         .outerjoin(SubMenu, SubMenu.menu_id == Menu.id).outerjoin(DishStats, DishStats.submenu_id == SubMenu.id)
+         .order_by(Menu.id, SubMenu.id))
+MENU_STATS = STATS.where(Menu.id == bindparam('menu_id'))
+
+
+def dish_search(query: Optional[str], min_price: Optional[Decimal], max_price: Optional[Decimal]) -> Select:
+    """Поиск блюд во всех меню: по тексту с сортировкой по релевантности, иначе по цене."""
+    statement = (select(Dish.id, Dish.title, Dish.description, Dish.price, Dish.submenu_id, SubMenu.menu_id)
+                 .join(SubMenu, SubMenu.id == Dish.submenu_id))
+    if query:
+        ts_query = func.websearch_to_tsquery(SEARCH_CONFIG, query)
+        statement = (statement.where(Dish.search_vector.bool_op('@@')(ts_query))
+                     .order_by(func.ts_rank(Dish.search_vector, ts_query).desc(), Dish.id))
+    else:
+        statement = statement.order_by(Dish.price, Dish.id)
+    if min_price is not None:
+        statement = statement.where(Dish.price >= min_price)
+    if max_price is not None:
+        statement = statement.where(Dish.price <= max_price)
+    return statement
@@ -0,0 +1,99 @@
+from decimal import Decimal
+from typing import Any, Collection, Optional, Sequence
+
+from sqlalchemy import case, cast, func, literal, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database.models import Dish, DishStats, SubMenu
+
+
+async def refresh_dish_stats(session: AsyncSession, submenu_ids: Optional[Collection[str]] = None,
+                             menu_ids: Optional[Collection[str]] = None) -> None:
+    """Пересчет агрегатов цен указанных подменю (или всех подменю меню) в текущей транзакции.
+
+    Пересчет идет по индексу блюд подменю, без полного просмотра таблицы блюд."""
+    query = (select(SubMenu.id, func.count(Dish.id), func.min(Dish.price), func.max(Dish.price),
+                    func.coalesce(func.sum(Dish.price), 0))
+             .outerjoin(Dish, Dish.submenu_id == SubMenu.id).group_by(SubMenu.id))
+    if submenu_ids is not None:
+        query = query.where(SubMenu.id.in_(submenu_ids))
+    if menu_ids is not None:
+        query = query.where(SubMenu.menu_id.in_(menu_ids))
+    columns = ['submenu_id', 'dishes_count', 'min_price', 'max_price', 'total_price']
+    stmt = insert(DishStats).from_select(columns, query)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[DishStats.submenu_id],
+        set_={column: stmt.excluded[column] for column in columns[1:]},
+    )
+    await session.execute(stmt)
+
+
+async def apply_dish_price(session: AsyncSession, submenu_id: str, added: Optional[Decimal] = None,
+                           removed: Optional[Decimal] = None) -> None:
+    """Учет в агрегатах подменю добавленной и (или) убранной цены блюда одним запросом в текущей транзакции.
+
+    Количество и сумма меняются на разницу, минимум и максимум — сравнением с новой ценой.
+    По блюдам подменю (уже измененным) они пересчитываются, только если убранная цена была крайней."""
+    # Цена приводится к точности столбца, как при записи блюда
+    price = None if added is None else cast(literal(added), Dish.price.type)
+    if removed is None:
+        stmt = insert(DishStats).values(submenu_id=submenu_id, dishes_count=1, min_price=price, max_price=price,
+                                        total_price=price)
+        stmt = stmt.on_conflict_do_update(index_elements=[DishStats.submenu_id], set_={
+            'dishes_count': DishStats.dishes_count + 1,
+            'min_price': func.least(DishStats.min_price, stmt.excluded.min_price),
+            'max_price': func.greatest(DishStats.max_price, stmt.excluded.max_price),
+            'total_price': DishStats.total_price + stmt.excluded.total_price,
+        })
+        await session.execute(stmt)
+        return
+    prices = select(Dish.price).where(Dish.submenu_id == submenu_id)
+    if price is None:
+        values = {'dishes_count': DishStats.dishes_count - 1, 'total_price': DishStats.total_price - removed}
+        min_price, max_price = DishStats.min_price, DishStats.max_price
+    else:
+        values = {'total_price': DishStats.total_price - removed + price}
+        min_price, max_price = func.least(DishStats.min_price, price), func.greatest(DishStats.max_price, price)
+    # Подзапрос выполняется, только если выбрана его ветка CASE
+    values['min_price'] = case((DishStats.min_price == removed,
+                                prices.with_only_columns(func.min(Dish.price)).scalar_subquery()), else_=min_price)
+    values['max_price'] = case((DishStats.max_price == removed,
+                                prices.with_only_columns(func.max(Dish.price)).scalar_subquery()), else_=max_price)
+    await session.execute(update(DishStats).where(DishStats.submenu_id == submenu_id).values(**values)
+                          .execution_options(synchronize_session=False))
+
+
+def _price(value: Optional[Decimal]) -> Optional[str]:
+    return None if value is None else f'{value:.2f}'
+
+
+def _stats(count: int, min_price: Optional[Decimal], max_price: Optional[Decimal],
+           total: Decimal) -> dict[str, Any]:
+    return {
+        'dishes_count': count,
+        'min_price': _price(min_price),
+        'max_price': _price(max_price),
+        'avg_price': _price(total / count) if count else None,
+    }
+
+
+def menu_stats(rows: Sequence[Any]) -> list[dict[str, Any]]:
+    """Статистика меню и их подменю из строк агрегатов, упорядоченных по меню."""
+    menus: dict[Any, dict[str, Any]] = {}
+    for row in rows:
+        menu = menus.setdefault(row.menu_id, {'menu_id': row.menu_id, 'submenus': [],
+                                              'totals': [0, None, None, Decimal(0)]})
+        if row.submenu_id is None:
+            continue
+        count, total = row.dishes_count or 0, row.total_price or Decimal(0)
+        menu['submenus'].append({'submenu_id': row.submenu_id,
+                                 **_stats(count, row.min_price, row.max_price, total)})
+        totals = menu['totals']
+        totals[0] += count
+        totals[3] += total
+        if row.min_price is not None:
+            totals[1] = row.min_price if totals[1] is None else min(totals[1], row.min_price)
+            totals[2] = row.max_price if totals[2] is None else max(totals[2], row.max_price)
+    return [{'menu_id': menu['menu_id'], **_stats(*menu.pop('totals')), 'submenus': menu['submenus']}
+            for menu in menus.values()]
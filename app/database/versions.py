@@ -0,0 +1,81 @@
+import time
+from typing import Iterable, Optional
+
+from sqlalchemy import String, cast, literal, select, union_all
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import VERSIONS_TTL
+from app.database.models import DataVersion, Menu
+
+MENUS_VERSION = 'menus'
+MENU_VERSION_PREFIX = 'menu:'
+
+
+def menu_version(menu_id: str) -> str:
+    return MENU_VERSION_PREFIX + str(menu_id).lower()
+
+
+async def bump_versions(session: AsyncSession, menu_ids: Optional[Iterable[str]]) -> dict[str, int]:
+    """Увеличение версий указанных меню (None — всех меню) и версии всех меню одним запросом.
+
+    Строки версий заблокированы до коммита, поэтому версии меняются в порядке коммитов и не повторяются.
+    Строки берутся по порядку ключей, чтобы параллельные транзакции не блокировали друг друга крест-накрест."""
+    if menu_ids is None:
+        key = (literal(MENU_VERSION_PREFIX) + cast(Menu.id, String)).label('key')
+        rows = union_all(select(key, literal(1)), select(literal(MENUS_VERSION), literal(1))).order_by('key')
+        stmt = insert(DataVersion).from_select(['key', 'version'], rows)
+    else:
+        keys = sorted({menu_version(menu_id) for menu_id in menu_ids} | {MENUS_VERSION})
+        stmt = insert(DataVersion).values([{'key': key, 'version': 1} for key in keys])
+    stmt = stmt.on_conflict_do_update(index_elements=[DataVersion.key], set_={'version': DataVersion.version + 1})
+    return dict((await session.execute(stmt.returning(DataVersion.key, DataVersion.version))).all())
+
+
+class Versions:
+    """Версии данных в памяти процесса, чтобы проверять ETag без обращения к БД.
+
+    Пока подписка на события активна (mirrored), новые значения приходят в событиях изменений и хранятся
+    без срока. Без подписки версии могут увеличить другие процессы, синхронизация или seed, поэтому значение
+    перечитывается из основной базы, если прочитано раньше чем ttl секунд назад (0 — в каждом запросе).
+    Значения только растут, поэтому опоздавшее чтение не откатывает версию."""
+
+    def __init__(self, ttl: float = VERSIONS_TTL):
+        self.ttl = ttl
+        self.mirrored = False
+        self.values: dict[str, int] = {}
+        self._read_at: dict[str, float] = {}
+        # Чтение, начатое до очистки, не должно вернуть в память значение, пропустившее события
+        self._generation = 0
+
+    def _fresh(self, key: str) -> bool:
+        return self.mirrored or time.monotonic() - self._read_at[key] < self.ttl
+
+    async def get(self, session: AsyncSession, key: str) -> int:
+        version = self.values.get(key)
+        if version is not None and self._fresh(key):
+            return version
+        generation = self._generation
+        version = await session.scalar(select(DataVersion.version).where(DataVersion.key == key))
+        if version is None:
+            # Меню без версии еще не менялось или не существует: такие ключи в памяти не хранятся
+            return 0
+        if generation != self._generation:
+            return version
+        self.update({key: version})
+        return self.values[key]
+
+    def update(self, values: dict[str, int]) -> None:
+        now = time.monotonic()
+        for key, version in values.items():
+            if version >= self.values.get(key, -1):
+                self.values[key] = version
+                self._read_at[key] = now
+
+    def clear(self) -> None:
+        self._generation += 1
+        self.values.clear()
+        self._read_at.clear()
+
+
+versions = Versions()
@@ -0,0 +1,252 @@
+import asyncio
+import json
+import os
+import socket
+from typing import Any, Iterable, Optional
+
+import asyncpg
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.cache.backends import CacheBackend
+from app.cache.service import dish_key, invalidate_dish, invalidate_menu, invalidate_submenu, submenu_key
+from app.config import CHANGE_CHANNEL, CHANGE_KEEPALIVE, CHANGE_NOTIFY, CHANGE_RETRY, conn_url
+from app.database.database import SessionLocal
+from app.database.replicas import replica_router
+from app.database.service import PENDING_CHANGES, id_index
+from app.database.versions import bump_versions, versions
+from app.feed import change_feed
+from app.metrics import CHANGE_EVENTS_RECEIVED
+
+# Изменения данных рассылаются всем процессам через NOTIFY в транзакции изменения:
+# событие доставляется только после коммита и теряется вместе с откатом.
+# Процесс-источник применяет событие сам сразу после коммита, остальные — получив его через LISTEN.
+
+MENU_EVENT, SUBMENU_EVENT, DISH_EVENT, SYNC_EVENT = 'menu', 'submenu', 'dish', 'sync'
+
+# Предел размера payload в NOTIFY — 8000 байт
+NOTIFY_PAYLOAD_LIMIT = 7900
+
+NOTIFY = text('SELECT pg_notify(:channel, :payload)')
+
+
+def origin() -> str:
+    """Идентификатор текущего процесса среди всех контейнеров и воркеров."""
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def change(kind: str, menu_id: Optional[str] = None, submenu_id: Optional[str] = None,
+           dish_id: Optional[str] = None, created: Iterable[Any] = (), updated: Iterable[Any] = (),
+           deleted: bool = False, counts: bool = False, menus: Optional[Iterable[Any]] = None) -> dict[str, Any]:
+    """Событие изменения: объект, созданные и измененные идентификаторы, удаление и изменение счетчиков.
+
+    Событие sync описывает синхронизацию с файлом: затронутые меню или None, если затронуты все."""
+    return {
+        'kind': kind, 'menu_id': menu_id and str(menu_id), 'submenu_id': submenu_id and str(submenu_id),
+        'dish_id': dish_id and str(dish_id), 'created': [str(item) for item in created],
+        'updated': [str(item) for item in updated], 'deleted': deleted, 'counts': counts,
+        'menus': None if menus is None else [str(item) for item in menus],
+        'versions': {},
+    }
+
+
+def changed_menus(event: dict[str, Any]) -> Optional[list[str]]:
+    """Меню, версии которых меняет событие; None — все меню."""
+    if event['kind'] == SYNC_EVENT:
+        return event['menus']
+    menus = [event['menu_id']] if event['menu_id'] else []
+    if event['kind'] == MENU_EVENT:
+        menus += event['created'] + event['updated']
+    return menus
+
+
+def _payload(event: dict[str, Any]) -> str:
+    payload = json.dumps({**event, 'origin': origin()})
+    if len(payload.encode()) > NOTIFY_PAYLOAD_LIMIT:
+        # Большое событие заменяется полным сбросом состояния у получателей
+        payload = json.dumps({**change(SYNC_EVENT), 'origin': origin()})
+    return payload
+
+
+async def publish_changes(session: AsyncSession, events: list[dict[str, Any]]) -> None:
+    """Увеличение версий затронутых меню и отправка событий другим процессам в текущей транзакции.
+
+    Версии всех событий увеличиваются одним запросом перед коммитом, чтобы строки версий
+    оставались заблокированными как можно меньше. Новые версии передаются в событиях,
+    чтобы все процессы проверяли ETag по одним и тем же значениям."""
+    if not events:
+        return
+    menus: Optional[list[str]] = []
+    for event in events:
+        event_menus = changed_menus(event)
+        menus = None if menus is None or event_menus is None else menus + event_menus
+    changed = await bump_versions(session, menus)
+    for event in events:
+        event['versions'] = changed
+        if CHANGE_NOTIFY:
+            await session.execute(NOTIFY, {'channel': CHANGE_CHANNEL, 'payload': _payload(event)})
+
+
+async def publish_change(session: AsyncSession, event: dict[str, Any]) -> None:
+    await publish_changes(session, [event])
+
+
+async def commit_change(session: AsyncSession, cache: CacheBackend, event: dict[str, Any]) -> None:
+    """Коммит изменения с отправкой события и его применением в текущем процессе.
+
+    В сессии пакета операций изменение только отправляется в БД, а событие отправляется
+    и применяется при коммите пакета."""
+    pending = session.info.get(PENDING_CHANGES)
+    if pending is not None:
+        await session.flush()
+        pending.append(event)
+        return
+    await publish_change(session, event)
+    await session.commit()
+    await apply_change(cache, event)
+
+
+async def apply_change(cache: CacheBackend, event: dict[str, Any], remote: bool = False) -> None:
+    """Обновление версий и индекса идентификаторов, рассылка в ленты меню и сброс кэша по событию.
+
+    Пока реплики догоняют изменение, промахи кэша загружаются из основной базы.
+
+    Индекс после события sync перезагружает тот, кто его получил: ему нужна сессия."""
+    kind, menu_id, submenu_id = event['kind'], event['menu_id'], event['submenu_id']
+    replica_router.changed()
+    if kind == SYNC_EVENT and event['menus'] is None:
+        # Изменения могли быть пропущены: версии перечитываются из БД при следующем запросе
+        versions.clear()
+    versions.update(event.get('versions', {}))
+    if kind == MENU_EVENT:
+        if event['deleted']:
+            id_index.remove_menu(menu_id)
+        for created_id in event['created']:
+            id_index.add_menu(created_id)
+    elif kind == SUBMENU_EVENT:
+        if event['deleted']:
+            id_index.remove_submenu(submenu_id)
+        id_index.add_submenus(menu_id, event['created'])
+    change_feed.publish(event)
+
+    if remote and cache.shared:
+        return
+    if kind == MENU_EVENT:
+        await invalidate_menu(cache, menu_id)
+    elif kind == SUBMENU_EVENT:
+        await invalidate_submenu(cache, menu_id, submenu_id, counts=event['counts'])
+        await cache.delete(*[submenu_key(menu_id, updated_id) for updated_id in event['updated']])
+    elif kind == DISH_EVENT:
+        await invalidate_dish(cache, menu_id, submenu_id, event['dish_id'], counts=event['counts'])
+        await cache.delete(*[dish_key(menu_id, submenu_id, updated_id) for updated_id in event['updated']])
+    else:
+        # Без списка меню (пропущенные события) достаточно сброса версий выше: старые ответы не совпадут с ними
+        for changed_menu_id in event['menus'] or [None]:
+            await invalidate_menu(cache, changed_menu_id)
+
+
+def listener_dsn(url: str = conn_url) -> str:
+    """URL подключения для asyncpg без указания драйвера SQLAlchemy."""
+    return make_url(url).set(drivername='postgresql').render_as_string(hide_password=False)
+
+
+class ChangeListener:
+    """Получение событий других процессов через LISTEN на отдельном от пула соединении.
+
+    После потери соединения события могли быть пропущены, поэтому при переподключении
+    индекс перезагружается, а версии данных перечитываются из БД. Пока соединения нет,
+    версии в памяти действуют не дольше VERSIONS_TTL."""
+
+    def __init__(self, cache: CacheBackend, dsn: Optional[str] = None,
+                 session_factory: async_sessionmaker = SessionLocal, channel: str = CHANGE_CHANNEL):
+        self.cache = cache
+        self.dsn = dsn or listener_dsn()
+        self.session_factory = session_factory
+        self.channel = channel
+        self.connected = asyncio.Event()
+        # Сброс состояния при подключении: после разрыва или если процесс начал работу без подписки
+        self._resync = False
+        self._queue: asyncio.Queue[str] = asyncio.Queue()
+        self._tasks: list[asyncio.Task] = []
+
+    def start(self) -> None:
+        self._tasks = [asyncio.create_task(self._listen()), asyncio.create_task(self._consume())]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def wait_connected(self, timeout: float) -> bool:
+        """Ожидание подписки не дольше timeout.
+
+        Если подписаться не успели, процесс работает без нее, а при подключении сбрасывает состояние."""
+        try:
+            await asyncio.wait_for(self.connected.wait(), timeout)
+        except asyncio.TimeoutError:
+            self._resync = True
+            return False
+        return True
+
+    def _notify(self, connection: Any, pid: int, channel: str, payload: str) -> None:
+        self._queue.put_nowait(payload)
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                connection = await asyncpg.connect(self.dsn)
+            except (OSError, asyncpg.PostgresError, asyncio.TimeoutError) as error:
+                print(f"Change listener connection failed: {error!r}")
+                await asyncio.sleep(CHANGE_RETRY)
+                continue
+            closed = asyncio.Event()
+            connection.add_termination_listener(lambda _: closed.set())
+            try:
+                await connection.add_listener(self.channel, self._notify)
+                # Пропущенные без подписки изменения не попали в память: версии перечитываются из БД,
+                # а индекс снова полон после перезагрузки по событию SYNC (или при запуске)
+                versions.clear()
+                versions.mirrored = True
+                id_index.subscribe()
+                if self._resync:
+                    await self._queue.put(json.dumps({**change(SYNC_EVENT), 'origin': None}))
+                self._resync = True
+                self.connected.set()
+                while not closed.is_set():
+                    try:
+                        await asyncio.wait_for(closed.wait(), CHANGE_KEEPALIVE)
+                    except asyncio.TimeoutError:
+                        await connection.fetchval('SELECT 1')
+            except Exception as error:
+                print(f"Change listener disconnected: {error!r}")
+            finally:
+                versions.mirrored = False
+                id_index.unsubscribe()
+                self.connected.clear()
+                try:
+                    await connection.close(timeout=CHANGE_RETRY)
+                except Exception as error:
+                    # Ошибка закрытия не должна останавливать цикл переподключения
+                    print(f"Change listener close failed: {error!r}")
+                    connection.terminate()
+            await asyncio.sleep(CHANGE_RETRY)
+
+    async def _consume(self) -> None:
+        while True:
+            payload = await self._queue.get()
+            try:
+                await self.handle(json.loads(payload))
+            except Exception as error:
+                print(f"Change event failed: {error!r}")
+
+    async def handle(self, event: dict[str, Any]) -> None:
+        """Применение события другого процесса; свои события уже применены после коммита."""
+        if event.get('origin') == origin():
+            return
+        CHANGE_EVENTS_RECEIVED.labels(event['kind']).inc()
+        if event['kind'] == SYNC_EVENT and id_index.loaded:
+            async with self.session_factory() as session:
+                await id_index.load(session)
+        await apply_change(self.cache, event, remote=True)
@@ -0,0 +1,135 @@
+import asyncio
+import json
+import uuid
+from collections import defaultdict, deque
+from typing import Any, AsyncIterator, Iterator, Optional, Tuple
+
+from app.config import FEED_HEARTBEAT, FEED_HISTORY, FEED_QUEUE_SIZE
+
+# Событие ленты: номер, меню (None — все меню), тип (created, updated, deleted, reset) и данные
+Entry = Tuple[int, Optional[str], str, dict[str, Any]]
+
+CREATED, UPDATED, DELETED, RESET = 'created', 'updated', 'deleted', 'reset'
+
+
+def feed_entries(event: dict[str, Any]) -> Iterator[Tuple[Optional[str], str, dict[str, Any]]]:
+    """События ленты меню по событию изменения: по одному на каждый затронутый объект.
+
+    Синхронизация с файлом не сообщает, что именно изменилось, поэтому дает событие reset."""
+    kind, menu_id, submenu_id = event['kind'], event['menu_id'], event['submenu_id']
+    if kind == 'sync':
+        for changed_menu_id in [None] if event['menus'] is None else event['menus']:
+            yield changed_menu_id, RESET, {'menu_id': changed_menu_id}
+        return
+    if menu_id is None:
+        return
+    object_id = {'menu': menu_id, 'submenu': submenu_id, 'dish': event['dish_id']}[kind]
+    parents = {'menu_id': menu_id, 'submenu_id': submenu_id} if kind == 'dish' else {'menu_id': menu_id}
+    for created_id in event['created']:
+        yield menu_id, CREATED, {'object': kind, 'id': created_id, **parents}
+    if object_id is not None:
+        yield menu_id, DELETED if event['deleted'] else UPDATED, {'object': kind, 'id': object_id, **parents}
+    for updated_id in event['updated']:
+        yield menu_id, UPDATED, {'object': kind, 'id': updated_id, **parents}
+
+
+def sse_message(token: str, name: str, data: dict[str, Any]) -> str:
+    return f'id: {token}\nevent: {name}\ndata: {json.dumps(data)}\n\n'
+
+
+class Subscription:
+    """Очередь событий ленты одного клиента."""
+
+    def __init__(self, feed: 'ChangeFeed', menu_id: str):
+        self.feed = feed
+        self.menu_id = menu_id.lower()
+        self.queue: asyncio.Queue[Entry] = asyncio.Queue(maxsize=FEED_QUEUE_SIZE)
+
+    def put(self, entry: Entry) -> None:
+        try:
+            self.queue.put_nowait(entry)
+        except asyncio.QueueFull:
+            # Клиент не успевает читать: пропущенные события заменяются одним reset
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(self.feed.reset_entry(self.menu_id))
+
+    async def messages(self, heartbeat: float = FEED_HEARTBEAT) -> AsyncIterator[str]:
+        """Сообщения SSE; при отсутствии событий — комментарий для поддержания соединения.
+
+        Лента заканчивается после удаления меню."""
+        while True:
+            try:
+                sequence, _, name, data = await asyncio.wait_for(self.queue.get(), heartbeat)
+            except asyncio.TimeoutError:
+                yield ': ping\n\n'
+                continue
+            yield sse_message(self.feed.token(sequence), name, data)
+            if name == DELETED and data['object'] == 'menu':
+                return
+
+
+class ChangeFeed:
+    """Рассылка событий изменений подписчикам лент меню в пределах процесса.
+
+    Последние события хранятся в памяти, чтобы переподключившийся клиент получил пропущенное по
+    токену (Last-Event-ID). Токен действителен только в выдавшем его процессе; для токена другого
+    процесса или вытесненного из истории события клиент получает reset и должен перечитать меню."""
+
+    def __init__(self, history: int = FEED_HISTORY):
+        self.boot = uuid.uuid4().hex[:8]
+        self.sequence = 0
+        self.history: deque[Entry] = deque(maxlen=history)
+        self.subscribers: defaultdict[str, set[Subscription]] = defaultdict(set)
+
+    def token(self, sequence: int) -> str:
+        return f'{self.boot}-{sequence}'
+
+    def reset_entry(self, menu_id: str) -> Entry:
+        return self.sequence, menu_id, RESET, {'menu_id': menu_id}
+
+    def publish(self, event: dict[str, Any]) -> None:
+        """Добавление событий ленты в историю и рассылка подписчикам затронутых меню."""
+        for menu_id, name, data in feed_entries(event):
+            menu_id = menu_id and menu_id.lower()
+            self.sequence += 1
+            entry = (self.sequence, menu_id, name, data)
+            self.history.append(entry)
+            subscribers = (self.subscribers.get(menu_id, ()) if menu_id is not None
+                           else [subscription for menu in self.subscribers.values() for subscription in menu])
+            for subscription in list(subscribers):
+                subscription.put(entry)
+
+    def _since(self, token: str) -> Optional[list[Entry]]:
+        """События после токена или None, если по токену их восстановить нельзя."""
+        boot, _, sequence = token.partition('-')
+        if boot != self.boot or not sequence.isdigit() or int(sequence) > self.sequence:
+            return None
+        oldest = self.history[0][0] if self.history else self.sequence + 1
+        if int(sequence) < oldest - 1:
+            return None
+        return [entry for entry in self.history if entry[0] > int(sequence)]
+
+    def subscribe(self, menu_id: str, last_event_id: Optional[str] = None) -> Subscription:
+        """Подписка на ленту меню; с токеном в очередь сначала попадают пропущенные события."""
+        subscription = Subscription(self, menu_id)
+        if last_event_id:
+            backlog = self._since(last_event_id)
+            if backlog is None:
+                subscription.put(self.reset_entry(subscription.menu_id))
+            else:
+                for entry in backlog:
+                    if entry[1] in (subscription.menu_id, None):
+                        subscription.put(entry)
+        self.subscribers[subscription.menu_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscribers = self.subscribers.get(subscription.menu_id)
+        if subscribers is not None:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self.subscribers[subscription.menu_id]
+
+
+change_feed = ChangeFeed()
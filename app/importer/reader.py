@@ -0,0 +1,66 @@
+import csv
+import uuid
+from decimal import Decimal, InvalidOperation
+from typing import Iterator
+
+MENUS = 'menus'
+SUBMENUS = 'submenus'
+DISHES = 'dishes'
+
+MenuSnapshot = dict[str, dict[str, tuple]]
+
+
+def read_rows(path: str) -> Iterator[list[str]]:
+    """Построчное чтение CSV или XLSX файла без загрузки его целиком."""
+    if path.endswith('.xlsx'):
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(path, read_only=True, data_only=True)
+        try:
+            for row in workbook.active.iter_rows(values_only=True):
+                yield ['' if value is None else str(value).strip() for value in row]
+        finally:
+            workbook.close()
+    else:
+        with open(path, newline='', encoding='utf-8') as file:
+            for row in csv.reader(file):
+                yield [value.strip() for value in row]
+
+
+def _uuid(value: str, line: int) -> str:
+    try:
+        return str(uuid.UUID(value))
+    except ValueError:
+        raise ValueError(f'line {line}: invalid id {value!r}')
+
+
+def parse_menu_file(path: str) -> MenuSnapshot:
+    """Разбор файла меню в снимок {таблица: {id: значения}}.
+
+    Уровень строки определяется колонкой, в которой стоит id:
+    `menu_id,title,description` — меню,
+    `,submenu_id,title,description` — подменю последнего меню,
+    `,,dish_id,title,description,price` — блюдо последнего подменю.
+    Пустые строки пропускаются."""
+    snapshot: MenuSnapshot = {MENUS: {}, SUBMENUS: {}, DISHES: {}}
+    menu_id = submenu_id = None
+    for line, row in enumerate(read_rows(path), start=1):
+        row += [''] * (6 - len(row))
+        if row[0]:
+            menu_id = _uuid(row[0], line)
+            submenu_id = None
+            snapshot[MENUS][menu_id] = (row[1], row[2])
+        elif row[1]:
+            if menu_id is None:
+                raise ValueError(f'line {line}: submenu without menu')
+            submenu_id = _uuid(row[1], line)
+            snapshot[SUBMENUS][submenu_id] = (row[2], row[3], menu_id)
+        elif row[2]:
+            if submenu_id is None:
+                raise ValueError(f'line {line}: dish without submenu')
+            try:
+                price = Decimal(row[5].replace(',', '.'))
+            except InvalidOperation:
+                raise ValueError(f'line {line}: invalid price {row[5]!r}')
+            snapshot[DISHES][_uuid(row[2], line)] = (row[3], row[4], price, submenu_id)
+    return snapshot
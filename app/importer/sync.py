@@ -0,0 +1,168 @@
+import argparse
+import asyncio
+import os
+from typing import Any, Iterable, Optional
+
+from sqlalchemy import String, cast, delete, select, text, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.cache.backends import CacheBackend
+from app.cache.cache import cache as app_cache
+from app.database.bulk import BATCH_SIZE
+from app.database.counters import recalculate_counters
+from app.database.database import SessionLocal
+from app.database.models import Dish, Menu, SubMenu
+from app.database.service import id_index
+from app.database.stats import refresh_dish_stats
+from app.events import SYNC_EVENT, apply_change, change, publish_change
+from app.importer.reader import DISHES, MENUS, SUBMENUS, MenuSnapshot, parse_menu_file
+
+# Ключ advisory-блокировки: воркеры синхронизируют файл по очереди
+SYNC_LOCK_KEY = 7_202_402
+
+TABLES = {
+    MENUS: (Menu, ('title', 'description')),
+    SUBMENUS: (SubMenu, ('title', 'description', 'menu_id')),
+    DISHES: (Dish, ('title', 'description', 'price', 'submenu_id')),
+}
+
+
+async def load_snapshot(session: AsyncSession) -> MenuSnapshot:
+    """Текущее состояние таблиц в том же виде, что и снимок файла."""
+    snapshot: MenuSnapshot = {}
+    for table, (model, columns) in TABLES.items():
+        result = await session.execute(select(model.id, *[getattr(model, column) for column in columns]))
+        snapshot[table] = {
+            str(row[0]): tuple('' if value is None else str(value) if column.endswith('_id') else value
+                               for column, value in zip(columns, row[1:]))
+            for row in result
+        }
+    return snapshot
+
+
+async def _upsert(session: AsyncSession, table: str, rows: dict[str, tuple]) -> None:
+    model, columns = TABLES[table]
+    items = [{'id': row_id, **dict(zip(columns, values))} for row_id, values in rows.items()]
+    for start in range(0, len(items), BATCH_SIZE):
+        stmt = insert(model).values(items[start:start + BATCH_SIZE])
+        stmt = stmt.on_conflict_do_update(index_elements=[model.id],
+                                          set_={column: stmt.excluded[column] for column in columns})
+        await session.execute(stmt)
+
+
+async def _delete(session: AsyncSession, table: str, ids: Iterable[str]) -> None:
+    model = TABLES[table][0]
+    ids = list(ids)
+    for start in range(0, len(ids), BATCH_SIZE):
+        await session.execute(delete(model).where(model.id.in_(ids[start:start + BATCH_SIZE])))
+
+
+async def _free_titles(session: AsyncSession, table: str, current: MenuSnapshot, target: MenuSnapshot) -> None:
+    """Временные названия (идентификатор строки) у строк, чье название в файле занято другой строкой.
+
+    Такие строки удаляются или переименовываются позже, а без этого вставка замены с новым id
+    или обмен названиями нарушили бы уникальность title."""
+    model = TABLES[table][0]
+    owners = {values[0]: row_id for row_id, values in target[table].items()}
+    ids = [row_id for row_id, values in current[table].items() if owners.get(values[0], row_id) != row_id]
+    for start in range(0, len(ids), BATCH_SIZE):
+        await session.execute(update(model).where(model.id.in_(ids[start:start + BATCH_SIZE]))
+                              .values(title=cast(model.id, String)))
+
+
+def _touched_menus(current: MenuSnapshot, target: MenuSnapshot, upserts: dict[str, dict],
+                   deletes: dict[str, set]) -> set[str]:
+    """Меню, в поддереве которых есть изменения (с учетом старого и нового родителя)."""
+    menus = set(upserts[MENUS]) | deletes[MENUS]
+    for state in (current, target):
+        for submenu_id in set(upserts[SUBMENUS]) | deletes[SUBMENUS]:
+            if submenu_id in state[SUBMENUS]:
+                menus.add(state[SUBMENUS][submenu_id][2])
+        for dish_id in set(upserts[DISHES]) | deletes[DISHES]:
+            if dish_id in state[DISHES]:
+                submenu_id = state[DISHES][dish_id][3]
+                for submenus in (current[SUBMENUS], target[SUBMENUS]):
+                    if submenu_id in submenus:
+                        menus.add(submenus[submenu_id][2])
+    return menus
+
+
+async def sync_snapshot(session: AsyncSession, target: MenuSnapshot) -> dict[str, Any]:
+    """Применение к базе только отличающихся от снимка строк в текущей транзакции.
+
+    Возвращает количество записанных и удаленных строк по таблицам и затронутые меню."""
+    current = await load_snapshot(session)
+    upserts = {
+        table: {row_id: values for row_id, values in target[table].items() if current[table].get(row_id) != values}
+        for table in TABLES
+    }
+    deletes = {table: set(current[table]) - set(target[table]) for table in TABLES}
+
+    # Блюда удаляются первыми, подменю и меню — последними, после того как перенесенные
+    # дочерние строки получили новых родителей; занятые в файле названия освобождаются до записи.
+    await _delete(session, DISHES, deletes[DISHES])
+    for table in (MENUS, SUBMENUS, DISHES):
+        await _free_titles(session, table, current, target)
+    for table in (MENUS, SUBMENUS, DISHES):
+        await _upsert(session, table, upserts[table])
+    await _delete(session, SUBMENUS, deletes[SUBMENUS])
+    await _delete(session, MENUS, deletes[MENUS])
+
+    menus = _touched_menus(current, target, upserts, deletes)
+    if menus:
+        await recalculate_counters(session, menus - deletes[MENUS])
+        await refresh_dish_stats(session, menu_ids=menus - deletes[MENUS])
+    return {
+        'upserted': {table: len(rows) for table, rows in upserts.items()},
+        'deleted': {table: len(ids) for table, ids in deletes.items()},
+        'menus': menus,
+    }
+
+
+async def sync_menu_file(path: str, session_factory: async_sessionmaker = SessionLocal,
+                         cache: CacheBackend = app_cache) -> dict[str, Any]:
+    """Синхронизация таблиц меню с файлом и сброс кэша затронутых меню."""
+    target = parse_menu_file(path)
+    async with session_factory() as session:
+        await session.execute(text('SELECT pg_advisory_xact_lock(:key)'), {'key': SYNC_LOCK_KEY})
+        stats = await sync_snapshot(session, target)
+        event = change(SYNC_EVENT, menus=stats['menus'])
+        if stats['menus']:
+            await publish_change(session, event)
+        await session.commit()
+        if id_index.loaded:
+            await id_index.load(session)
+    await apply_change(cache, event)
+    return stats
+
+
+async def sync_periodically(path: str, interval: float) -> None:
+    """Фоновая синхронизация с файлом меню при каждом его изменении."""
+    last_mtime: Optional[int] = None
+    while True:
+        try:
+            mtime = os.stat(path).st_mtime_ns
+            if mtime != last_mtime:
+                stats = await sync_menu_file(path)
+                last_mtime = mtime
+                print(f"Menu sync: upserted {stats['upserted']}, deleted {stats['deleted']}")
+        except Exception as error:
+            print(f"Menu sync failed: {error!r}")
+        await asyncio.sleep(interval)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Синхронизация меню с CSV/XLSX файлом')
+    parser.add_argument('path')
+    parser.add_argument('--interval', type=float, help='повторять синхронизацию каждые N секунд')
+    args = parser.parse_args()
+    if args.interval:
+        asyncio.run(sync_periodically(args.path, args.interval))
+    else:
+        stats = asyncio.run(sync_menu_file(args.path))
+        print(f"Upserted {stats['upserted']}, deleted {stats['deleted']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,15 @@
+import asyncio
+
 from fastapi import FastAPI
-from .database.database import init_db
-from .routers import submenu, dish, menu
+from .cache.cache import cache
+from .config import CHANGE_NOTIFY, CHANGE_STARTUP_TIMEOUT, ID_INDEX, METRICS_LINK, MENU_SYNC_FILE, MENU_SYNC_INTERVAL
+from .database.database import SessionLocal, engine, init_db
+from .database.replicas import replica_engines
+from .database.service import id_index
+from .events import ChangeListener
+from .importer.sync import sync_periodically
+from .metrics import MetricsMiddleware, instrument_engine, instrument_pool, mark_worker_dead, metrics
+from .routers import submenu, dish, menu, monitoring, batch
 
 app = FastAPI(
     title='Menu API',
@@ -19,6 +28,14 @@ app = FastAPI(
             'name': 'Блюда',
             'description': 'Операции с блюдами',
         },
+        {
+            'name': 'Пакетные операции',
+            'description': 'Несколько изменений в одной транзакции',
+        },
+        {
+            'name': 'Мониторинг',
+            'description': 'Состояние приложения',
+        },
     ]
 )
 
@@ -38,10 +55,41 @@ async def startup_event():
     print("Running on_startup()")
     await init_db()
     print("Database initialization complete")
+    if CHANGE_NOTIFY:
+        # Подписка до загрузки индекса, чтобы не пропустить изменения других воркеров
+        app.state.change_listener = ChangeListener(cache)
+        app.state.change_listener.start()
+        if not await app.state.change_listener.wait_connected(CHANGE_STARTUP_TIMEOUT):
+            print("Change listener is not connected yet, starting without it")
+    if ID_INDEX:
+        async with SessionLocal() as session:
+            await id_index.load(session)
+    if MENU_SYNC_FILE:
+        app.state.menu_sync_task = asyncio.create_task(sync_periodically(MENU_SYNC_FILE, MENU_SYNC_INTERVAL))
+
+
+async def shutdown_event():
+    """Остановка синхронизации с файлом меню и подписки на изменения других воркеров."""
+    if MENU_SYNC_FILE:
+        app.state.menu_sync_task.cancel()
+        await asyncio.gather(app.state.menu_sync_task, return_exceptions=True)
+    if CHANGE_NOTIFY:
+        await app.state.change_listener.stop()
+    mark_worker_dead()
 
 
 app.add_event_handler("startup", startup_event)
+app.add_event_handler("shutdown", shutdown_event)
+
+instrument_engine(engine.sync_engine)
+for replica_engine in replica_engines:
+    instrument_engine(replica_engine.sync_engine)
+instrument_pool(engine)
+app.add_middleware(MetricsMiddleware)
+app.add_route(METRICS_LINK, metrics, include_in_schema=False)
 
 app.include_router(menu.router)
 app.include_router(submenu.router)
 app.include_router(dish.router)
+app.include_router(batch.router)
+app.include_router(monitoring.router)
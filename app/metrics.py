@@ -0,0 +1,147 @@
+import os
+import time
+from contextvars import ContextVar
+from typing import Any, Callable, Optional
+
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, \
+    multiprocess
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+REQUESTS = Counter('http_requests_total', 'Количество запросов', ['method', 'route', 'status'])
+REQUEST_LATENCY = Histogram('http_request_duration_seconds', 'Время обработки запроса', ['method', 'route'])
+REQUESTS_IN_PROGRESS = Gauge('http_requests_in_progress', 'Запросы в обработке', ['method', 'route'],
+                             multiprocess_mode='livesum')
+DB_QUERIES = Histogram('db_queries_per_request', 'Количество SQL-запросов на один запрос', ['method', 'route'],
+                       buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100))
+DB_TIME = Histogram('db_time_per_request_seconds', 'Суммарное время SQL-запросов на один запрос',
+                    ['method', 'route'])
+DB_QUERIES_TOTAL = Counter('db_queries_total', 'Количество SQL-запросов', ['method', 'route'])
+SINGLEFLIGHT_CALLS = Counter('singleflight_calls_total', 'Загрузки данных, выполненные single-flight', ['handler'])
+SINGLEFLIGHT_COALESCED = Counter('singleflight_coalesced_total',
+                                 'Запросы, получившие результат уже выполняющейся загрузки', ['handler'])
+CHANGE_EVENTS_RECEIVED = Counter('change_events_received_total', 'События изменений от других процессов', ['kind'])
+
+# Каталог задает app.server до запуска воркеров; тогда значения метрик пишутся в файлы и суммируются по процессам
+MULTIPROCESS = 'PROMETHEUS_MULTIPROC_DIR' in os.environ
+_gauge_updates: list[Callable[[], None]] = []
+
+
+class QueryStats:
+    """Счетчик SQL-запросов в рамках одного HTTP-запроса."""
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+
+
+_query_stats: ContextVar[Optional[QueryStats]] = ContextVar('query_stats', default=None)
+
+
+def _before_cursor_execute(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any,
+                           executemany: bool) -> None:
+    conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any,
+                          executemany: bool) -> None:
+    elapsed = time.perf_counter() - conn.info['query_start'].pop()
+    stats = _query_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_time += elapsed
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Подключение подсчета SQL-запросов к движку."""
+    event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+
+
+def instrument_pool(engine: Any) -> None:
+    """Метрики состояния пула соединений движка.
+
+    В режиме нескольких процессов значения функций не попадают в общие файлы метрик, поэтому каждый воркер
+    записывает их после своих запросов, а /metrics показывает сумму по живым воркерам.
+    """
+    gauges = {
+        Gauge('db_pool_checked_out', 'Занятые соединения пула', multiprocess_mode='livesum'):
+            lambda: engine.pool.checkedout(),
+        Gauge('db_pool_overflow', 'Соединения сверх размера пула', multiprocess_mode='livesum'):
+            lambda: max(engine.pool.overflow(), 0),
+        Gauge('db_pool_checkout_timeouts', 'Таймауты ожидания соединения', multiprocess_mode='livesum'):
+            lambda: engine.pool.stats.timeouts if hasattr(engine.pool, 'stats') else 0,
+    }
+    for gauge, value in gauges.items():
+        if MULTIPROCESS:
+            _gauge_updates.append(lambda gauge=gauge, value=value: gauge.set(value()))
+        else:
+            gauge.set_function(value)
+
+
+def _update_gauges() -> None:
+    for update in _gauge_updates:
+        update()
+
+
+def mark_worker_dead() -> None:
+    """Удаление файлов live-метрик завершающегося воркера."""
+    if MULTIPROCESS:
+        multiprocess.mark_process_dead(os.getpid())
+
+
+class MetricsMiddleware:
+    """ASGI middleware для метрик времени ответа, статусов и SQL-запросов по маршрутам."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    def _route(self, scope: Scope) -> str:
+        for route in scope['app'].routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return route.path
+        return 'unmatched'
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        method, route = scope['method'], self._route(scope)
+        status = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            await send(message)
+
+        stats = QueryStats()
+        token = _query_stats.set(stats)
+        in_progress = REQUESTS_IN_PROGRESS.labels(method, route)
+        in_progress.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            REQUEST_LATENCY.labels(method, route).observe(time.perf_counter() - start)
+            REQUESTS.labels(method, route, status).inc()
+            DB_QUERIES.labels(method, route).observe(stats.queries)
+            DB_TIME.labels(method, route).observe(stats.db_time)
+            DB_QUERIES_TOTAL.labels(method, route).inc(stats.queries)
+            in_progress.dec()
+            _update_gauges()
+            _query_stats.reset(token)
+
+
+async def metrics(request: Request) -> Response:
+    if not MULTIPROCESS:
+        return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,108 @@
+import inspect
+from functools import lru_cache
+from typing import Any, List, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.routing import APIRoute
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.routing import Match
+
+from app.cache.backends import CacheBackend
+from app.cache.cache import get_cache
+from app.config import prefixes, BATCH_LINK
+from app.database.database import get_db
+from app.database.schemas import BatchOperation, BatchRequest, BatchResult
+from app.database.service import PENDING_CHANGES
+from app.events import apply_change, publish_changes
+from app.routers import dish, menu, submenu
+
+router = APIRouter(prefix=prefixes)
+
+# Операции пакета выполняются обработчиками изменяющих маршрутов меню, подменю и блюд
+BATCH_ROUTES = [route for module in (menu, submenu, dish) for route in module.router.routes
+                if isinstance(route, APIRoute) and route.methods & {'POST', 'PATCH', 'DELETE'}]
+
+
+@lru_cache(maxsize=None)
+def _adapter(annotation: Any) -> TypeAdapter:
+    return TypeAdapter(annotation)
+
+
+def resolve(operation: BatchOperation) -> Tuple[APIRoute, dict[str, Any]]:
+    """Маршрут операции и ее параметры: из пути и строки запроса."""
+    url = urlsplit(operation.path)
+    scope = {'type': 'http', 'method': operation.method, 'path': url.path}
+    allowed = False
+    for route in BATCH_ROUTES:
+        match, child_scope = route.matches(scope)
+        if match == Match.FULL:
+            return route, {**dict(parse_qsl(url.query)), **child_scope['path_params']}
+        allowed = allowed or match == Match.PARTIAL
+    if allowed:
+        raise HTTPException(status_code=status.HTTP_405_METHOD_NOT_ALLOWED, detail="Method Not Allowed")
+    raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+
+
+def database_error(error: SQLAlchemyError) -> HTTPException:
+    """Ошибка БД в операции пакета: нарушение ограничения — конфликт, остальное — неверный запрос."""
+    detail = str(getattr(error, 'orig', None) or error).splitlines()[0]
+    if isinstance(error, IntegrityError):
+        return HTTPException(status_code=status.HTTP_409_CONFLICT, detail=detail)
+    return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
+
+
+async def run_operation(db: AsyncSession, cache: CacheBackend, operation: BatchOperation) -> BatchResult:
+    """Вызов обработчика маршрута в сессии пакета и сериализация ответа по его response_model."""
+    route, params = resolve(operation)
+    kwargs: dict[str, Any] = {'db': db, 'cache': cache}
+    try:
+        for name, parameter in inspect.signature(route.endpoint).parameters.items():
+            if name in kwargs:
+                continue
+            if name in params:
+                kwargs[name] = _adapter(parameter.annotation).validate_python(params[name])
+            elif parameter.default is inspect.Parameter.empty:
+                kwargs[name] = _adapter(parameter.annotation).validate_python(operation.body)
+    except ValidationError as error:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                            detail=error.errors(include_url=False, include_context=False))
+    try:
+        result = await route.endpoint(**kwargs)
+    except SQLAlchemyError as error:
+        # Точку сохранения или транзакцию пакета откатывает вызывающий
+        raise database_error(error)
+    if route.response_model is not None:
+        result = _adapter(route.response_model).validate_python(result, from_attributes=True)
+    return BatchResult(status=route.status_code or status.HTTP_200_OK, body=jsonable_encoder(result))
+
+
+@router.post(BATCH_LINK, response_model=List[BatchResult], tags=['Пакетные операции'])
+async def run_batch(batch: BatchRequest, db: AsyncSession = Depends(get_db), cache: CacheBackend = Depends(get_cache)):
+    # Обработчики не коммитят сессию пакета, а откладывают свои события до общего коммита
+    pending = db.info[PENDING_CHANGES] = []
+    results = []
+    for index, operation in enumerate(batch.operations):
+        if batch.atomic:
+            try:
+                results.append(await run_operation(db, cache, operation))
+            except HTTPException as error:
+                await db.rollback()
+                raise HTTPException(status_code=error.status_code, detail={'index': index, 'detail': error.detail})
+            continue
+        # Без atomic каждая операция выполняется в своей точке сохранения и откатывается отдельно
+        applied = len(pending)
+        try:
+            async with db.begin_nested():
+                results.append(await run_operation(db, cache, operation))
+        except HTTPException as error:
+            del pending[applied:]
+            results.append(BatchResult(status=error.status_code, body={'detail': error.detail}))
+    await publish_changes(db, pending)
+    await db.commit()
+    for event in pending:
+        await apply_change(cache, event)
+    return results
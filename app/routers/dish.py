@@ -1,65 +1,128 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from app.database.database import get_db
-from typing import List
+from app.database.replicas import get_read_db
+from decimal import Decimal
+from typing import List, Optional
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.future import select
 
+from app.database.counters import add_dishes
+from app.database.fields import parse_fields, select_rows
 from app.database.models import Dish as DBDish
-from app.database.schemas import Dish, DishCreate
-from app.config import prefixes, DISHES_LINK, DISH_LINK
+from app.database.pagination import next_cursor
+from app.database.service import check_submenu_exists, parent_required, submenu_exists
+from app.database.stats import apply_dish_price
+from app.database.statements import DELETE_DISH, DISH, DISHES, dish_search, page
+from app.database.bulk import bulk_upsert_dishes, insert_unique
+from app.database.schemas import BulkResult, Dish, DishCreate, DishSearchResult
+from app.database.serializers import dish_data
+from app.cache.backends import CacheBackend
+from app.cache.cache import get_cache
+from app.cache.etag import menu_etag
+from app.cache.service import cached_or_load, dish_key, dishes_key, with_fields
+from app.config import prefixes, DISHES_LINK, DISH_LINK, DISHES_BULK_LINK, DISHES_SEARCH_LINK
+from app.events import DISH_EVENT, change, commit_change
 
 router = APIRouter(prefix=prefixes)
 
 
+@router.get(DISHES_SEARCH_LINK, response_model=List[DishSearchResult], tags=['Блюда'])
+async def search_dishes(q: Optional[str] = None, min_price: Optional[Decimal] = None,
+                        max_price: Optional[Decimal] = None, skip: int = 0, limit: int = 10,
+                        db: AsyncSession = Depends(get_read_db)):
+    query = dish_search(q, min_price, max_price).offset(skip).limit(limit)
+    return (await db.execute(query)).all()
+
+
 @router.get(DISHES_LINK, response_model=List[Dish], tags=['Блюда'])
-async def read_all_dishes(submenu_id: str, skip: int = 0, limit: int = 10, db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(DBDish).filter(DBDish.submenu_id == submenu_id).offset(skip).limit(limit))
-    db_dishes = result.scalars().all()
-    return db_dishes
+async def read_all_dishes(menu_id: str, submenu_id: str, skip: int = 0, limit: int = 10, cursor: Optional[str] = None,
+                          fields: Optional[str] = None, db: AsyncSession = Depends(get_read_db),
+                          cache: CacheBackend = Depends(get_cache), etag: str = Depends(menu_etag)):
+    columns = parse_fields(fields, Dish)
+    if not await submenu_exists(db, menu_id, submenu_id):
+        return []
+
+    async def load():
+        db_dishes = await select_rows(db, *page(DISHES, skip, limit, cursor, submenu_id=submenu_id), DBDish, columns)
+        return [dish_data(db_dish, columns) for db_dish in db_dishes], next_cursor(db_dishes, limit)
+
+    key = with_fields(dishes_key(menu_id, submenu_id, skip, limit, cursor), columns)
+    return await cached_or_load(cache, 'read_all_dishes', key, etag, load)
 
 
 @router.get(DISH_LINK, response_model=Dish, tags=['Блюда'])
-async def read_dish(submenu_id: str, dish_id: str, db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(DBDish).filter(DBDish.id == dish_id, DBDish.submenu_id == submenu_id))
-    db_dish = result.scalars().first()
+async def read_dish(menu_id: str, submenu_id: str, dish_id: str, fields: Optional[str] = None,
+                    db: AsyncSession = Depends(get_read_db), cache: CacheBackend = Depends(get_cache),
+                    etag: str = Depends(menu_etag)):
+    columns = parse_fields(fields, Dish)
+    await check_submenu_exists(db, menu_id, submenu_id)
+
+    async def load():
+        db_dishes = await select_rows(db, DISH, {'submenu_id': submenu_id, 'dish_id': dish_id}, DBDish, columns)
+        if not db_dishes:
+            raise HTTPException(status_code=404, detail="dish not found")
+        return dish_data(db_dishes[0], columns), None
+
+    key = with_fields(dish_key(menu_id, submenu_id, dish_id), columns)
+    return await cached_or_load(cache, 'read_dish', key, etag, load)
+
+
+@router.post(DISHES_LINK, response_model=Dish, status_code=status.HTTP_201_CREATED, tags=['Блюда'])
+async def create_dish(menu_id: str, submenu_id: str, dish: DishCreate, db: AsyncSession = Depends(get_db),
+                      cache: CacheBackend = Depends(get_cache)):
+    await check_submenu_exists(db, menu_id, submenu_id)
+    with parent_required(menu_id, submenu_id):
+        db_dish = await insert_unique(db, DBDish, {**dish.dict(), "submenu_id": submenu_id})
     if db_dish is None:
-        raise HTTPException(status_code=404, detail="dish not found")
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="A dish with this name already exists")
+    await add_dishes(db, submenu_id)
+    await apply_dish_price(db, submenu_id, added=dish.price)
+    event = change(DISH_EVENT, menu_id, submenu_id, created=[db_dish.id], counts=True)
+    await commit_change(db, cache, event)
     return db_dish
 
 
-@router.post(DISHES_LINK, response_model=Dish, status_code=status.HTTP_201_CREATED, tags=['Блюда'])
-async def create_dish(submenu_id: str, dish: DishCreate, db: AsyncSession = Depends(get_db)):
-    async with db as session:
-        existing_dish = await session.execute(select(DBDish).filter(DBDish.title == dish.title))
-        if existing_dish.scalar():
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="A dish with this name already exists")
-        db_dish = DBDish(**dish.dict(), submenu_id=submenu_id)
-        session.add(db_dish)
-        await session.commit()
-        await session.refresh(db_dish)
-        return db_dish
+@router.post(DISHES_BULK_LINK, response_model=List[BulkResult], tags=['Блюда'])
+async def bulk_create_dishes(menu_id: str, submenu_id: str, dishes: List[DishCreate], upsert: bool = True,
+                             db: AsyncSession = Depends(get_db), cache: CacheBackend = Depends(get_cache)):
+    await check_submenu_exists(db, menu_id, submenu_id)
+    with parent_required(menu_id, submenu_id):
+        results = await bulk_upsert_dishes(db, submenu_id, [dish.dict() for dish in dishes], upsert)
+    event = change(DISH_EVENT, menu_id, submenu_id, counts=True,
+                   created=[result['id'] for result in results if result['status'] == 'created'],
+                   updated=[result['id'] for result in results if result['status'] == 'updated'])
+    await commit_change(db, cache, event)
+    return results
 
 
 @router.patch(DISH_LINK, response_model=Dish, tags=['Блюда'])
-async def update_dish(submenu_id: str, dish_id: str, dish: DishCreate, db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(DBDish).filter(DBDish.id == dish_id, DBDish.submenu_id == submenu_id))
-    db_dish = result.scalars().first()
+async def update_dish(menu_id: str, submenu_id: str, dish_id: str, dish: DishCreate,
+                      db: AsyncSession = Depends(get_db), cache: CacheBackend = Depends(get_cache)):
+    await check_submenu_exists(db, menu_id, submenu_id)
+    db_dish = (await db.execute(DISH, {'submenu_id': submenu_id, 'dish_id': dish_id})).scalars().first()
     if db_dish is None:
         raise HTTPException(status_code=404, detail="dish not found")
+    old_price = db_dish.price
     for key, value in dish.dict().items():
         setattr(db_dish, key, value)
-    await db.commit()
+    await db.flush()
+    if dish.price != old_price:
+        await apply_dish_price(db, submenu_id, added=dish.price, removed=old_price)
+    event = change(DISH_EVENT, menu_id, submenu_id, dish_id)
+    await commit_change(db, cache, event)
     await db.refresh(db_dish)
     return db_dish
 
 
 @router.delete(DISH_LINK, tags=['Блюда'])
-async def delete_dish(submenu_id: str, dish_id: str, db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(DBDish).filter(DBDish.id == dish_id, DBDish.submenu_id == submenu_id))
-    db_dish = result.scalars().first()
-    if db_dish is None:
+async def delete_dish(menu_id: str, submenu_id: str, dish_id: str, db: AsyncSession = Depends(get_db),
+                      cache: CacheBackend = Depends(get_cache)):
+    await check_submenu_exists(db, menu_id, submenu_id)
+    deleted = (await db.execute(DELETE_DISH, {'submenu_id': submenu_id, 'dish_id': dish_id})).first()
+    if deleted is None:
         raise HTTPException(status_code=404, detail="dish not found")
-    await db.delete(db_dish)
-    await db.commit()
+    await add_dishes(db, submenu_id, -1)
+    await apply_dish_price(db, submenu_id, removed=deleted.price)
+    event = change(DISH_EVENT, menu_id, submenu_id, dish_id, deleted=True, counts=True)
+    await commit_change(db, cache, event)
     return {"message": "Dish deleted successfully"}
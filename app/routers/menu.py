@@ -1,105 +1,153 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List, cast as typing_cast
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from fastapi.responses import StreamingResponse
+from typing import List, Optional
 
-from sqlalchemy import func
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.future import select
 
-from app.config import prefixes, MENUS_LINK, MENU_LINK
-from app.database.models import Menu as DBMenu, SubMenu as DBSubMenu, Dish as DBDish
-from app.database.schemas import Menu, MenuCreate
-from app.database.database import get_db
+from app.cache.backends import CacheBackend
+from app.cache.cache import get_cache
+from app.cache.etag import menu_etag, menus_etag
+from app.cache.service import cached_or_load, menu_key, menus_key, tree_key, with_fields
+from app.config import (prefixes, MENUS_LINK, MENU_LINK, MENU_EVENTS_LINK, MENUS_STATS_LINK, MENU_STATS_LINK,
+                        MENUS_TREE_LINK, MENU_TREE_LINK)
+from app.database.bulk import insert_unique
+from app.database.fields import parse_fields, select_rows
+from app.database.models import Menu as DBMenu
+from app.database.pagination import next_cursor
+from app.database.schemas import Menu, MenuCreate, MenuStats, MenuTree
+from app.database.serializers import menu_data, menu_tree_data
+from app.database.stats import menu_stats
+from app.database.statements import DELETE_MENU, MENU, MENU_STATS, MENU_TREE, MENUS, MENUS_TREE, STATS, page
+from app.database.database import SessionLocal, get_db
+from app.database.replicas import get_read_db
+from app.database.service import check_menu_exists
+from app.events import MENU_EVENT, change, commit_change
+from app.feed import change_feed
 
 router = APIRouter(prefix=prefixes)
 
 
 @router.get(MENUS_LINK, response_model=List[Menu], tags=['Меню'])
-async def read_all_menus(skip: int = 0, limit: int = 10, db: AsyncSession = Depends(get_db)):
-    async with db:
-        menus_with_counts = await db.execute(
-            select(
-                DBMenu,
-                func.count(DBSubMenu.id.distinct()).label('submenus_count'),
-                func.count(DBDish.id.distinct()).label('dishes_count')
-            ).select_from(DBMenu).outerjoin(DBSubMenu).outerjoin(DBDish).group_by(DBMenu.id).offset(skip).limit(limit)
-        )
-        result_menus = []
-        for menu, submenus_count, dishes_count in menus_with_counts:
-            menu_with_counts = Menu(
-                id=menu.id,
-                title=menu.title,
-                description=menu.description,
-                submenus_count=submenus_count,
-                dishes_count=dishes_count
-            )
-            result_menus.append(menu_with_counts)
-
-    return result_menus
+async def read_all_menus(skip: int = 0, limit: int = 10, cursor: Optional[str] = None, fields: Optional[str] = None,
+                         db: AsyncSession = Depends(get_read_db), cache: CacheBackend = Depends(get_cache),
+                         etag: str = Depends(menus_etag)):
+    columns = parse_fields(fields, Menu)
 
+    async def load():
+        menus = await select_rows(db, *page(MENUS, skip, limit, cursor), DBMenu, columns)
+        return [menu_data(menu, columns) for menu in menus], next_cursor(menus, limit)
 
-@router.get(MENU_LINK, response_model=Menu, tags=['Меню'])
-async def read_menu(menu_id: str, db: AsyncSession = Depends(get_db)):
-    async with db.begin():
-        menu_data = await db.execute(
-            select(
-                DBMenu,
-                func.count(DBSubMenu.id.distinct()).label('submenus_count'),
-                func.count(DBDish.id.distinct()).label('dishes_count')
-            ).outerjoin(DBSubMenu, DBMenu.id == (typing_cast(str, DBSubMenu.menu_id)))
-            .outerjoin(DBDish, DBSubMenu.id == (typing_cast(str, DBDish.submenu_id)))
-            .filter(DBMenu.id == menu_id).group_by(DBMenu.id)
-        )
-        menu_row = menu_data.fetchone()
-
-        if not menu_row:
+    return await cached_or_load(cache, 'read_all_menus', with_fields(menus_key(skip, limit, cursor), columns), etag,
+                                load)
+
+
+@router.get(MENUS_TREE_LINK, response_model=List[MenuTree], tags=['Меню'])
+async def read_menus_tree(db: AsyncSession = Depends(get_read_db), cache: CacheBackend = Depends(get_cache),
+                          etag: str = Depends(menus_etag)):
+    async def load():
+        result = await db.execute(MENUS_TREE)
+        return [menu_tree_data(menu) for menu in result.scalars().all()], None
+
+    return await cached_or_load(cache, 'read_menus_tree', tree_key(), etag, load)
+
+
+@router.get(MENU_TREE_LINK, response_model=MenuTree, tags=['Меню'])
+async def read_menu_tree(menu_id: str, db: AsyncSession = Depends(get_read_db),
+                         cache: CacheBackend = Depends(get_cache), etag: str = Depends(menu_etag)):
+    await check_menu_exists(db, menu_id)
+
+    async def load():
+        menu = (await db.execute(MENU_TREE, {'menu_id': menu_id})).scalars().first()
+        if menu is None:
             raise HTTPException(status_code=404, detail="menu not found")
+        return menu_tree_data(menu), None
+
+    return await cached_or_load(cache, 'read_menu_tree', tree_key(menu_id), etag, load)
+
 
-        menu, submenus_count, dishes_count = menu_row
-        menu_with_counts = Menu(
-            id=menu.id,
-            title=menu.title,
-            description=menu.description,
-            submenus_count=submenus_count,
-            dishes_count=dishes_count
-        )
+@router.get(MENUS_STATS_LINK, response_model=List[MenuStats], tags=['Меню'])
+async def read_menus_stats(db: AsyncSession = Depends(get_read_db)):
+    return menu_stats((await db.execute(STATS)).all())
+
+
+@router.get(MENU_STATS_LINK, response_model=MenuStats, tags=['Меню'])
+async def read_menu_stats(menu_id: str, db: AsyncSession = Depends(get_read_db)):
+    await check_menu_exists(db, menu_id)
+    stats = menu_stats((await db.execute(MENU_STATS, {'menu_id': menu_id})).all())
+    if not stats:
+        raise HTTPException(status_code=404, detail="menu not found")
+    return stats[0]
 
-    return menu_with_counts
+
+@router.get(MENU_EVENTS_LINK, tags=['Меню'], response_class=StreamingResponse)
+async def read_menu_events(menu_id: str, last_event_id: Optional[str] = Header(None)):
+    # Короткая сессия вместо зависимости: соединение не должно оставаться занятым на все время трансляции
+    async with SessionLocal() as db:
+        await check_menu_exists(db, menu_id)
+
+    async def stream():
+        # Клиент возобновляет ленту с токеном последнего полученного события (Last-Event-ID)
+        subscription = change_feed.subscribe(menu_id, last_event_id)
+        try:
+            async for message in subscription.messages():
+                yield message
+        finally:
+            change_feed.unsubscribe(subscription)
+
+    return StreamingResponse(stream(), media_type='text/event-stream',
+                             headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+@router.get(MENU_LINK, response_model=Menu, tags=['Меню'])
+async def read_menu(menu_id: str, fields: Optional[str] = None, db: AsyncSession = Depends(get_read_db),
+                    cache: CacheBackend = Depends(get_cache), etag: str = Depends(menu_etag)):
+    columns = parse_fields(fields, Menu)
+    await check_menu_exists(db, menu_id)
+
+    async def load():
+        menus = await select_rows(db, MENU, {'menu_id': menu_id}, DBMenu, columns)
+        if not menus:
+            raise HTTPException(status_code=404, detail="menu not found")
+        return menu_data(menus[0], columns), None
+
+    return await cached_or_load(cache, 'read_menu', with_fields(menu_key(menu_id), columns), etag, load)
 
 
 @router.post(MENUS_LINK, response_model=Menu, status_code=status.HTTP_201_CREATED, tags=['Меню'])
-async def create_menu(menu: MenuCreate, db: AsyncSession = Depends(get_db)):
-    async with db as session:
-        # Проверяем наличие меню с таким же title
-        existing_menu = await session.execute(select(DBMenu).filter(DBMenu.title == menu.title))
-        if existing_menu.scalar():
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
-                                detail="A menu with the same name already exists")
-        # Если меню с таким title не существует, создаем новое меню
-        db_menu = DBMenu(**menu.dict())
-        session.add(db_menu)
-        await session.commit()
-        await session.refresh(db_menu)
-        return db_menu
+async def create_menu(menu: MenuCreate, db: AsyncSession = Depends(get_db),
+                      cache: CacheBackend = Depends(get_cache)):
+    # Меню с уже существующим title не вставляется, и RETURNING ничего не возвращает
+    db_menu = await insert_unique(db, DBMenu, menu.dict())
+    if db_menu is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail="A menu with the same name already exists")
+    event = change(MENU_EVENT, created=[db_menu.id])
+    await commit_change(db, cache, event)
+    return db_menu
 
 
 @router.patch(MENU_LINK, response_model=Menu, tags=['Меню'])
-async def update_menu(menu_id: str, menu: MenuCreate, db: AsyncSession = Depends(get_db)):
-    db_menu = (await db.execute(select(DBMenu).filter(DBMenu.id == menu_id))).scalars().first()
+async def update_menu(menu_id: str, menu: MenuCreate, db: AsyncSession = Depends(get_db),
+                      cache: CacheBackend = Depends(get_cache)):
+    await check_menu_exists(db, menu_id)
+    db_menu = (await db.execute(MENU, {'menu_id': menu_id})).scalars().first()
     if db_menu is None:
         raise HTTPException(status_code=404, detail="menu not found")
     for key, value in menu.dict(exclude_unset=True).items():
         setattr(db_menu, key, value)
-    await db.commit()
+    event = change(MENU_EVENT, menu_id)
+    await commit_change(db, cache, event)
     await db.refresh(db_menu)
     return db_menu
 
 
 @router.delete(MENU_LINK, tags=['Меню'])
-async def delete_menu(menu_id: str, db: AsyncSession = Depends(get_db)):
-    db_menu = await db.execute(select(DBMenu).filter(DBMenu.id == menu_id))
-    db_menu = db_menu.scalars().first()
-    if db_menu is None:
+async def delete_menu(menu_id: str, db: AsyncSession = Depends(get_db), cache: CacheBackend = Depends(get_cache)):
+    await check_menu_exists(db, menu_id)
+    # Подменю и блюда удаляются каскадом внешних ключей в том же запросе
+    deleted = await db.execute(DELETE_MENU, {'menu_id': menu_id})
+    if deleted.first() is None:
         raise HTTPException(status_code=404, detail="menu not found")
-    await db.delete(db_menu)
-    await db.commit()
+    event = change(MENU_EVENT, menu_id, deleted=True)
+    await commit_change(db, cache, event)
     return {"message": "Menu deleted successfully"}
@@ -0,0 +1,12 @@
+from fastapi import APIRouter
+
+from app.config import prefixes, POOL_LINK
+from app.database.database import engine
+from app.database.pool import pool_status
+
+router = APIRouter(prefix=prefixes)
+
+
+@router.get(POOL_LINK, tags=['Мониторинг'])
+async def read_pool_status():
+    return pool_status(engine.pool)
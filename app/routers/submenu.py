@@ -1,91 +1,114 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from app.database.database import get_db
-from typing import List, cast as typing_cast
+from app.database.replicas import get_read_db
+from typing import List, Optional
 
-from sqlalchemy import func
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.future import select
 
-from app.config import prefixes, SUBMENUS_LINK, SUBMENU_LINK
-from app.database.schemas import SubMenu, SubMenuCreate
-from app.database.models import SubMenu as DBSubMenu, Dish as DBDish
+from app.cache.backends import CacheBackend
+from app.cache.cache import get_cache
+from app.cache.etag import menu_etag
+from app.cache.service import cached_or_load, submenu_key, submenus_key, with_fields
+from app.config import prefixes, SUBMENUS_LINK, SUBMENU_LINK, SUBMENUS_BULK_LINK
+from app.database.bulk import bulk_upsert_submenus, insert_unique
+from app.database.fields import parse_fields, select_rows
+from app.database.schemas import BulkResult, SubMenu, SubMenuCreate
+from app.database.serializers import submenu_data
+from app.database.counters import add_submenus, remove_submenu
+from app.database.models import SubMenu as DBSubMenu
+from app.database.pagination import next_cursor
+from app.database.service import check_menu_exists, check_submenu_exists, menu_exists, parent_required
+from app.database.statements import DELETE_SUBMENU, SUBMENU, SUBMENUS, page
+from app.events import SUBMENU_EVENT, change, commit_change
 
 router = APIRouter(prefix=prefixes)
 
 
 @router.get(SUBMENUS_LINK, response_model=List[SubMenu],  tags=['Подменю'])
-async def read_all_submenus(menu_id: str, skip: int = 0, limit: int = 10, db: AsyncSession = Depends(get_db)):
-    submenus = await db.execute(select(DBSubMenu, func.count(DBDish.id).label("dishes_count")).outerjoin(DBDish)
-                                .filter(DBSubMenu.menu_id == menu_id).group_by(DBSubMenu.id).offset(skip).limit(limit))
+async def read_all_submenus(menu_id: str, skip: int = 0, limit: int = 10, cursor: Optional[str] = None,
+                            fields: Optional[str] = None, db: AsyncSession = Depends(get_read_db),
+                            cache: CacheBackend = Depends(get_cache), etag: str = Depends(menu_etag)):
+    columns = parse_fields(fields, SubMenu)
+    if not await menu_exists(db, menu_id):
+        return []
 
-    submenus_with_counts = [
-        SubMenu(
-            id=submenu.id,
-            title=submenu.title,
-            description=submenu.description,
-            dishes_count=dishes_count
-        )
-        for submenu, dishes_count in submenus
-    ]
+    async def load():
+        submenus = await select_rows(db, *page(SUBMENUS, skip, limit, cursor, menu_id=menu_id), DBSubMenu, columns)
+        return [submenu_data(submenu, columns) for submenu in submenus], next_cursor(submenus, limit)
 
-    return submenus_with_counts
+    key = with_fields(submenus_key(menu_id, skip, limit, cursor), columns)
+    return await cached_or_load(cache, 'read_all_submenus', key, etag, load)
 
 
 @router.get(SUBMENU_LINK, response_model=SubMenu, tags=['Подменю'])
-async def read_submenu(menu_id: str, submenu_id: str, db: AsyncSession = Depends(get_db)):
-    submenu = (await db.execute(select(DBSubMenu).filter(DBSubMenu.id == submenu_id, DBSubMenu.menu_id == menu_id))
-               ).scalars().first()
-    if submenu is None:
-        raise HTTPException(status_code=404, detail='submenu not found')
-    dishes_count = (await db.execute(select(func.count()).where(typing_cast(str, DBDish.submenu_id) == submenu.id))
-                    ).scalar()
+async def read_submenu(menu_id: str, submenu_id: str, fields: Optional[str] = None,
+                       db: AsyncSession = Depends(get_read_db), cache: CacheBackend = Depends(get_cache),
+                       etag: str = Depends(menu_etag)):
+    columns = parse_fields(fields, SubMenu)
+    await check_submenu_exists(db, menu_id, submenu_id)
 
-    submenu_with_counts = SubMenu(
-        id=submenu.id,
-        title=submenu.title,
-        description=submenu.description,
-        dishes_count=dishes_count
-    )
+    async def load():
+        submenus = await select_rows(db, SUBMENU, {'menu_id': menu_id, 'submenu_id': submenu_id}, DBSubMenu, columns)
+        if not submenus:
+            raise HTTPException(status_code=404, detail='submenu not found')
+        return submenu_data(submenus[0], columns), None
 
-    return submenu_with_counts
+    return await cached_or_load(cache, 'read_submenu', with_fields(submenu_key(menu_id, submenu_id), columns), etag,
+                                load)
 
 
 @router.post(SUBMENUS_LINK, response_model=SubMenu, status_code=status.HTTP_201_CREATED, tags=['Подменю'])
-async def create_submenu(menu_id: str, submenu: SubMenuCreate, db: AsyncSession = Depends(get_db)):
-    async with db as session:
-        existing_submenu = await session.execute(select(DBSubMenu).filter(DBSubMenu.title == submenu.title))
-        if existing_submenu.scalar():
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
-                                detail="A submenu with the same name already exists")
-        submenu_data = submenu.dict()
-        submenu_data["menu_id"] = menu_id
-        db_submenu = DBSubMenu(**submenu_data)
-        db.add(db_submenu)
-        await session.commit()
-        await session.refresh(db_submenu)
-        return db_submenu
+async def create_submenu(menu_id: str, submenu: SubMenuCreate, db: AsyncSession = Depends(get_db),
+                         cache: CacheBackend = Depends(get_cache)):
+    await check_menu_exists(db, menu_id)
+    with parent_required(menu_id):
+        db_submenu = await insert_unique(db, DBSubMenu, {**submenu.dict(), "menu_id": menu_id})
+    if db_submenu is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail="A submenu with the same name already exists")
+    await add_submenus(db, menu_id)
+    event = change(SUBMENU_EVENT, menu_id, created=[db_submenu.id], counts=True)
+    await commit_change(db, cache, event)
+    return db_submenu
+
+
+@router.post(SUBMENUS_BULK_LINK, response_model=List[BulkResult], tags=['Подменю'])
+async def bulk_create_submenus(menu_id: str, submenus: List[SubMenuCreate], upsert: bool = True,
+                               db: AsyncSession = Depends(get_db), cache: CacheBackend = Depends(get_cache)):
+    await check_menu_exists(db, menu_id)
+    with parent_required(menu_id):
+        results = await bulk_upsert_submenus(db, menu_id, [submenu.dict() for submenu in submenus], upsert)
+    event = change(SUBMENU_EVENT, menu_id, counts=True,
+                   created=[result['id'] for result in results if result['status'] == 'created'],
+                   updated=[result['id'] for result in results if result['status'] == 'updated'])
+    await commit_change(db, cache, event)
+    return results
 
 
 @router.patch(SUBMENU_LINK, response_model=SubMenu, tags=['Подменю'])
-async def update_submenu(menu_id: str, submenu_id: str, submenu: SubMenuCreate, db: AsyncSession = Depends(get_db)):
-    db_submenu = (await db.execute(select(DBSubMenu).filter(DBSubMenu.id == submenu_id, DBSubMenu.menu_id == menu_id))
-                  ).scalars().first()
+async def update_submenu(menu_id: str, submenu_id: str, submenu: SubMenuCreate, db: AsyncSession = Depends(get_db),
+                         cache: CacheBackend = Depends(get_cache)):
+    await check_submenu_exists(db, menu_id, submenu_id)
+    db_submenu = (await db.execute(SUBMENU, {'menu_id': menu_id, 'submenu_id': submenu_id})).scalars().first()
     if db_submenu is None:
         raise HTTPException(status_code=404, detail="submenu not found")
     for key, value in submenu.dict(exclude_unset=True).items():
         setattr(db_submenu, key, value)
-    await db.commit()
+    event = change(SUBMENU_EVENT, menu_id, submenu_id)
+    await commit_change(db, cache, event)
     await db.refresh(db_submenu)
     return db_submenu
 
 
 @router.delete(SUBMENU_LINK, tags=['Подменю'])
-async def delete_submenu(menu_id: str, submenu_id: str, db: AsyncSession = Depends(get_db)):
-    submenu = (await db.execute(select(DBSubMenu).filter(DBSubMenu.id == submenu_id, DBSubMenu.menu_id == menu_id))
-               ).scalars().first()
+async def delete_submenu(menu_id: str, submenu_id: str, db: AsyncSession = Depends(get_db),
+                         cache: CacheBackend = Depends(get_cache)):
+    await check_submenu_exists(db, menu_id, submenu_id)
+    submenu = (await db.execute(DELETE_SUBMENU, {'menu_id': menu_id, 'submenu_id': submenu_id})).first()
     if submenu is None:
         raise HTTPException(status_code=404, detail="submenu not found")
-    await db.delete(submenu)
-    await db.commit()
+    await remove_submenu(db, menu_id, submenu.dishes_count)
+    event = change(SUBMENU_EVENT, menu_id, submenu_id, deleted=True, counts=True)
+    await commit_change(db, cache, event)
     return {"message": "Submenu deleted successfully"}
 
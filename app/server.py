@@ -0,0 +1,29 @@
+import os
+import shutil
+import tempfile
+
+import uvicorn
+
+from app.config import HOST, PORT, WORKERS
+
+
+def prepare_metrics_dir() -> str:
+    """Пустой каталог для метрик Prometheus всех воркеров.
+
+    Переменная окружения задается до импорта prometheus_client в воркерах, файлы прошлого запуска удаляются.
+    """
+    path = os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', os.path.join(tempfile.gettempdir(), 'menu-api-metrics'))
+    shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(path)
+    return path
+
+
+def main() -> None:
+    """Запуск приложения в WORKERS процессах uvicorn."""
+    if WORKERS > 1:
+        prepare_metrics_dir()
+    uvicorn.run('app.main:app', host=HOST, port=PORT, workers=WORKERS)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,235 @@
+import argparse
+import asyncio
+import json
+import random
+import time
+from typing import Any, Awaitable, Callable, Optional
+
+from httpx import AsyncClient
+
+from app.cache.backends import MemoryCache
+from app.cache.cache import get_cache
+from app.config import (prefixes, BATCH_LINK, DISH_LINK, DISHES_BULK_LINK, DISHES_LINK, DISHES_SEARCH_LINK, MENU_LINK,
+                        MENU_STATS_LINK, MENU_TREE_LINK, MENUS_LINK, MENUS_STATS_LINK, MENUS_TREE_LINK, SUBMENU_LINK,
+                        SUBMENUS_BULK_LINK, SUBMENUS_LINK)
+from app.main import app
+from benchmarks.seed import add_arguments, seed
+
+# Доли операций в смешанной нагрузке: чтение преобладает, как в реальном трафике.
+# Покрыты все маршруты роутеров, кроме потоковой ленты событий меню.
+READ_WRITE_MIX = {
+    'read_all_menus': 10,
+    'read_menu': 15,
+    'read_all_submenus': 15,
+    'read_submenu': 15,
+    'read_all_dishes': 20,
+    'read_dish': 15,
+    'read_menus_tree': 2,
+    'read_menu_tree': 3,
+    'read_menus_stats': 1,
+    'read_menu_stats': 2,
+    'search_dishes': 3,
+    'create_menu': 1,
+    'update_menu': 1,
+    'delete_menu': 1,
+    'create_submenu': 1,
+    'bulk_create_submenus': 1,
+    'update_submenu': 1,
+    'delete_submenu': 1,
+    'create_dish': 3,
+    'bulk_create_dishes': 1,
+    'update_dish': 3,
+    'delete_dish': 2,
+    'run_batch': 1,
+}
+
+READS = {'read_all_menus', 'read_menu', 'read_all_submenus', 'read_submenu', 'read_all_dishes', 'read_dish',
+         'read_menus_tree', 'read_menu_tree', 'read_menus_stats', 'read_menu_stats', 'search_dishes'}
+
+URLS = {
+    'read_all_menus': MENUS_LINK, 'read_menu': MENU_LINK, 'read_menus_tree': MENUS_TREE_LINK,
+    'read_menu_tree': MENU_TREE_LINK, 'read_menus_stats': MENUS_STATS_LINK, 'read_menu_stats': MENU_STATS_LINK,
+    'create_menu': MENUS_LINK, 'update_menu': MENU_LINK,
+    'read_all_submenus': SUBMENUS_LINK, 'read_submenu': SUBMENU_LINK, 'create_submenu': SUBMENUS_LINK,
+    'bulk_create_submenus': SUBMENUS_BULK_LINK, 'update_submenu': SUBMENU_LINK,
+    'read_all_dishes': DISHES_LINK, 'read_dish': DISH_LINK, 'create_dish': DISHES_LINK,
+    'bulk_create_dishes': DISHES_BULK_LINK, 'update_dish': DISH_LINK, 'search_dishes': DISHES_SEARCH_LINK,
+    'run_batch': BATCH_LINK,
+}
+
+
+def percentile(values: list[float], percent: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100))]
+
+
+class LoadTest:
+    """Смешанная нагрузка на все маршруты API по набору данных из seed()."""
+
+    def __init__(self, client: AsyncClient, dataset: dict[str, Any], mix: dict[str, int]):
+        self.client = client
+        self.dataset = dataset
+        self.operations = list(mix)
+        self.weights = list(mix.values())
+        self.latencies: dict[str, list[float]] = {name: [] for name in mix}
+        self.errors: dict[str, int] = {name: 0 for name in mix}
+        # Объекты, созданные тестом: удаляются только они, чтобы не трогать набор данных
+        self.created: list[tuple[str, str, str]] = []
+        self.created_submenus: list[tuple[str, str]] = []
+        self.created_menus: list[str] = []
+        self.counter = 0
+
+    def _ids(self) -> tuple[str, str, str]:
+        menu = random.choice(self.dataset['menus'])
+        submenu = random.choice(menu['submenus'])
+        return menu['id'], submenu['id'], random.choice(submenu['dishes'])
+
+    def _title(self, name: str) -> str:
+        self.counter += 1
+        return f'{name} {self.counter} {time.time_ns()}'
+
+    def _request(self, name: str) -> Optional[Callable[[], Awaitable[Any]]]:
+        if name == 'delete_menu':
+            if not self.created_menus:
+                return None
+            url = prefixes + MENU_LINK.format(menu_id=self.created_menus.pop())
+            return lambda: self.client.delete(url)
+        if name == 'delete_submenu':
+            if not self.created_submenus:
+                return None
+            menu_id, submenu_id = self.created_submenus.pop()
+            url = prefixes + SUBMENU_LINK.format(menu_id=menu_id, submenu_id=submenu_id)
+            return lambda: self.client.delete(url)
+        if name == 'delete_dish':
+            if not self.created:
+                return None
+            menu_id, submenu_id, dish_id = self.created.pop()
+            url = prefixes + DISH_LINK.format(menu_id=menu_id, submenu_id=submenu_id, dish_id=dish_id)
+            return lambda: self.client.delete(url)
+
+        menu_id, submenu_id, dish_id = self._ids()
+        url = prefixes + URLS[name].format(menu_id=menu_id, submenu_id=submenu_id, dish_id=dish_id)
+        if name == 'search_dishes':
+            return lambda: self.client.get(url, params={'q': 'dish', 'max_price': random.randint(100, 999)})
+        if name in READS:
+            return lambda: self.client.get(url)
+        if name == 'create_menu':
+            return lambda: self._create(url, self._body(name), lambda data: self.created_menus.append(data['id']))
+        if name == 'create_submenu':
+            return lambda: self._create(url, self._body(name),
+                                        lambda data: self.created_submenus.append((menu_id, data['id'])))
+        if name == 'create_dish':
+            return lambda: self._create(url, self._body(name),
+                                        lambda data: self.created.append((menu_id, submenu_id, data['id'])))
+        if name == 'bulk_create_submenus':
+            body = [self._body(name) for _ in range(5)]
+            return lambda: self._create(url, body, lambda data: self.created_submenus.extend(
+                (menu_id, result['id']) for result in data if result['status'] == 'created'))
+        if name == 'bulk_create_dishes':
+            body = [self._body(name) for _ in range(5)]
+            return lambda: self._create(url, body, lambda data: self.created.extend(
+                (menu_id, submenu_id, result['id']) for result in data if result['status'] == 'created'))
+        if name == 'run_batch':
+            # Переоценка блюд подменю одним пакетом
+            submenu = next(submenu for menu in self.dataset['menus'] if menu['id'] == menu_id
+                           for submenu in menu['submenus'] if submenu['id'] == submenu_id)
+            operations = [
+                {'method': 'PATCH', 'body': self._body('update_dish'),
+                 'path': prefixes + DISH_LINK.format(menu_id=menu_id, submenu_id=submenu['id'], dish_id=batch_dish_id)}
+                for batch_dish_id in submenu['dishes'][:5]
+            ]
+            return lambda: self.client.post(url, json={'operations': operations})
+        return lambda: self.client.patch(url, json=self._body(name))
+
+    def _body(self, name: str) -> dict[str, str]:
+        body = {'title': self._title(name), 'description': 'Benchmark'}
+        if name.endswith('dish') or name.endswith('dishes'):
+            body['price'] = str(random.randint(100, 999))
+        return body
+
+    async def _create(self, url: str, body: Any, created: Callable[[Any], None]) -> Any:
+        response = await self.client.post(url, json=body)
+        if response.status_code in (200, 201):
+            created(response.json())
+        return response
+
+    async def worker(self, deadline: float) -> None:
+        while time.perf_counter() < deadline:
+            name = random.choices(self.operations, self.weights)[0]
+            request = self._request(name)
+            if request is None:
+                continue
+            start = time.perf_counter()
+            try:
+                response = await request()
+                failed = response.status_code >= 400
+            except Exception:
+                failed = True
+            self.latencies[name].append(time.perf_counter() - start)
+            self.errors[name] += failed
+
+    async def run(self, workers: int, duration: float) -> dict[str, Any]:
+        start = time.perf_counter()
+        await asyncio.gather(*[self.worker(start + duration) for _ in range(workers)])
+        elapsed = time.perf_counter() - start
+        endpoints = {
+            name: {
+                'count': len(latencies),
+                'errors': self.errors[name],
+                'throughput': round(len(latencies) / elapsed, 2),
+                'mean_ms': round(sum(latencies) / len(latencies) * 1000, 3) if latencies else 0.0,
+                'p50_ms': round(percentile(latencies, 50) * 1000, 3),
+                'p95_ms': round(percentile(latencies, 95) * 1000, 3),
+                'p99_ms': round(percentile(latencies, 99) * 1000, 3),
+            }
+            for name, latencies in self.latencies.items()
+        }
+        total = sum(endpoint['count'] for endpoint in endpoints.values())
+        return {
+            'duration': round(elapsed, 3),
+            'requests': total,
+            'throughput': round(total / elapsed, 2),
+            'endpoints': endpoints,
+        }
+
+
+async def run_benchmark(args: argparse.Namespace) -> dict[str, Any]:
+    if args.dataset:
+        with open(args.dataset, encoding='utf-8') as file:
+            dataset = json.load(file)
+    else:
+        dataset = await seed(args.menus, args.submenus, args.dishes)
+    if args.no_cache:
+        uncached = MemoryCache(maxsize=0)
+        app.dependency_overrides[get_cache] = lambda: uncached
+    mix = {name: weight for name, weight in READ_WRITE_MIX.items() if not args.read_only or name in READS}
+    client_options = {'base_url': args.url} if args.url else {'app': app, 'base_url': 'http://benchmark'}
+    async with AsyncClient(timeout=None, **client_options) as client:
+        result = await LoadTest(client, dataset, mix).run(args.workers, args.duration)
+    result['config'] = {key: value for key, value in vars(args).items() if key != 'output'}
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Нагрузочный тест API меню')
+    add_arguments(parser)
+    parser.add_argument('--dataset', help='JSON из benchmarks.seed вместо повторного заполнения базы')
+    parser.add_argument('--workers', type=int, default=50, help='количество параллельных клиентов')
+    parser.add_argument('--duration', type=float, default=30, help='длительность теста в секундах')
+    parser.add_argument('--read-only', action='store_true', help='только GET-запросы')
+    parser.add_argument('--no-cache', action='store_true', help='отключить кэш ответов')
+    parser.add_argument('--url', help='адрес запущенного сервера вместо ASGI-приложения в процессе')
+    parser.add_argument('--output', help='файл для отчета (по умолчанию stdout)')
+    args = parser.parse_args()
+    result = json.dumps(asyncio.run(run_benchmark(args)), indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            file.write(result)
+    else:
+        print(result)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+import argparse
+import asyncio
+import json
+import uuid
+from decimal import Decimal
+from typing import Any
+
+from sqlalchemy import insert
+
+from app.database.bulk import BATCH_SIZE
+from app.database.database import Base, SessionLocal, engine
+from app.database.models import Dish, Menu, SubMenu
+from app.database.stats import refresh_dish_stats
+from app.database.versions import bump_versions
+
+
+async def _insert(session: Any, model: Any, rows: list[dict[str, Any]]) -> None:
+    for start in range(0, len(rows), BATCH_SIZE):
+        await session.execute(insert(model), rows[start:start + BATCH_SIZE])
+
+
+async def seed(menus: int, submenus: int, dishes: int) -> dict[str, Any]:
+    """Пересоздание таблиц и заполнение их menus × submenus × dishes строками.
+
+    ВНИМАНИЕ: все данные в базе из настроек приложения удаляются.
+    Возвращает идентификаторы созданных объектов для нагрузочного теста."""
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+    dataset: dict[str, Any] = {'menus': []}
+    async with SessionLocal() as session:
+        for m in range(menus):
+            menu_id = str(uuid.uuid4())
+            submenu_rows, dish_rows, menu_data = [], [], {'id': menu_id, 'submenus': []}
+            for s in range(submenus):
+                submenu_id = str(uuid.uuid4())
+                submenu_rows.append({'id': submenu_id, 'title': f'Submenu {m}-{s}', 'description': 'Seeded submenu',
+                                     'menu_id': menu_id, 'dishes_count': dishes})
+                dish_ids = []
+                for d in range(dishes):
+                    dish_id = str(uuid.uuid4())
+                    dish_ids.append(dish_id)
+                    dish_rows.append({'id': dish_id, 'title': f'Dish {m}-{s}-{d}', 'description': 'Seeded dish',
+                                      'price': Decimal(100 + d), 'submenu_id': submenu_id})
+                menu_data['submenus'].append({'id': submenu_id, 'dishes': dish_ids})
+            await _insert(session, Menu, [{'id': menu_id, 'title': f'Menu {m}', 'description': 'Seeded menu',
+                                           'submenus_count': submenus, 'dishes_count': submenus * dishes}])
+            await _insert(session, SubMenu, submenu_rows)
+            await _insert(session, Dish, dish_rows)
+            dataset['menus'].append(menu_data)
+        await refresh_dish_stats(session)
+        await bump_versions(session, None)
+        await session.commit()
+    return dataset
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument('--menus', type=int, default=100)
+    parser.add_argument('--submenus', type=int, default=50, help='подменю в каждом меню')
+    parser.add_argument('--dishes', type=int, default=200, help='блюд в каждом подменю')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Заполнение базы тестовыми данными для нагрузочного теста')
+    add_arguments(parser)
+    parser.add_argument('--output', default='dataset.json', help='файл с идентификаторами созданных объектов')
+    args = parser.parse_args()
+    dataset = asyncio.run(seed(args.menus, args.submenus, args.dishes))
+    with open(args.output, 'w', encoding='utf-8') as file:
+        json.dump(dataset, file)
+
+
+if __name__ == '__main__':
+    main()
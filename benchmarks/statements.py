@@ -0,0 +1,77 @@
+import argparse
+import json
+import time
+import uuid
+from typing import Any, Callable
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql.asyncpg import dialect as asyncpg_dialect
+from sqlalchemy.orm import selectinload
+
+from app.database import statements
+from app.database.models import Dish, Menu, SubMenu
+
+MENU_ID, SUBMENU_ID, DISH_ID = (str(uuid.uuid4()) for _ in range(3))
+
+# Запросы в том виде, в котором роутеры строили их на каждый запрос до statements.py.
+PER_REQUEST = {
+    'read_all_menus': lambda: select(Menu).order_by(Menu.id).offset(0).limit(10),
+    'read_menu': lambda: select(Menu).filter(Menu.id == MENU_ID),
+    'read_menu_tree': lambda: select(Menu).options(selectinload(Menu.submenus).selectinload(SubMenu.dishes))
+    .filter(Menu.id == MENU_ID),
+    'read_all_submenus': lambda: select(SubMenu).filter(SubMenu.menu_id == MENU_ID).order_by(SubMenu.id)
+    .offset(0).limit(10),
+    'read_submenu': lambda: select(SubMenu).filter(SubMenu.id == SUBMENU_ID, SubMenu.menu_id == MENU_ID),
+    'read_all_dishes': lambda: select(Dish).filter(Dish.submenu_id == SUBMENU_ID).order_by(Dish.id)
+    .offset(0).limit(10),
+    'read_dish': lambda: select(Dish).filter(Dish.id == DISH_ID, Dish.submenu_id == SUBMENU_ID),
+}
+
+PREBUILT = {
+    'read_all_menus': lambda: statements.MENUS[0],
+    'read_menu': lambda: statements.MENU,
+    'read_menu_tree': lambda: statements.MENU_TREE,
+    'read_all_submenus': lambda: statements.SUBMENUS[0],
+    'read_submenu': lambda: statements.SUBMENU,
+    'read_all_dishes': lambda: statements.DISHES[0],
+    'read_dish': lambda: statements.DISH,
+}
+
+
+def measure(factory: Callable[[], Any], iterations: int) -> float:
+    """Среднее время (мкс) построения запроса и получения его SQL из кэша компиляции, как при execute."""
+    dialect = asyncpg_dialect()
+    compiled_cache: dict = {}
+    for _ in range(10):
+        factory()._compile_w_cache(dialect, compiled_cache=compiled_cache, column_keys=[])
+    start = time.perf_counter()
+    for _ in range(iterations):
+        factory()._compile_w_cache(dialect, compiled_cache=compiled_cache, column_keys=[])
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def run_benchmark(iterations: int) -> dict[str, Any]:
+    report = {}
+    for name in PER_REQUEST:
+        before = measure(PER_REQUEST[name], iterations)
+        after = measure(PREBUILT[name], iterations)
+        report[name] = {'per_request_us': round(before, 2), 'prebuilt_us': round(after, 2),
+                        'saved_us': round(before - after, 2)}
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Затраты CPU на подготовку SQL-запросов роутеров')
+    parser.add_argument('--iterations', type=int, default=20000, help='количество повторов для каждого запроса')
+    parser.add_argument('--output', help='файл для отчета (по умолчанию stdout)')
+    args = parser.parse_args()
+    result = json.dumps(run_benchmark(args.iterations), indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            file.write(result)
+    else:
+        print(result)
+
+
+if __name__ == '__main__':
+    main()
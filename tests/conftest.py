@@ -1,12 +1,15 @@
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.ext.asyncio import async_sessionmaker
 
+from app.cache.backends import MemoryCache
 from app.config import conn_url
 
 test_engine = create_async_engine(conn_url)
 
 TestAsyncSessionLocal = async_sessionmaker(autocommit=False, autoflush=False, class_=AsyncSession, bind=test_engine)
 
+test_cache = MemoryCache()
+
 pytest_plugins = 'tests.fixtures'
 
 
@@ -14,3 +17,8 @@ async def test_init_db():
     """Возвращает соединение с базой данных."""
     async with TestAsyncSessionLocal() as async_session:
         yield async_session
+
+
+async def test_get_cache() -> MemoryCache:
+    """Возвращает кэш, изолированный от настроек приложения."""
+    return test_cache
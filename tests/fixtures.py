@@ -3,10 +3,15 @@ from typing import Any
 
 import pytest
 from httpx import AsyncClient
+from sqlalchemy import event
 
+from app.cache.cache import get_cache
 from app.database.database import Base, get_db
+from app.database.replicas import get_read_db
+from app.database.service import id_index
 from app.main import app
-from conftest import test_init_db, test_engine
+from conftest import TestAsyncSessionLocal, test_cache, test_get_cache, test_init_db, test_engine
+from service import QueryBudget
 
 
 @pytest.fixture(scope='session')
@@ -36,11 +41,25 @@ async def cleanup_db(init_db):
 @pytest.fixture(scope='session')
 async def client():
     """Асинхронный клиент."""
-    app.dependency_overrides = {get_db: test_init_db}
+    app.dependency_overrides = {get_db: test_init_db, get_read_db: test_init_db, get_cache: test_get_cache}
+    async with TestAsyncSessionLocal() as session:
+        await id_index.load(session)
     async with AsyncClient(app=app, base_url='http://test') as client:
         yield client
 
 
+@pytest.fixture
+async def query_budget() -> QueryBudget:
+    """Фикстура для ограничения количества SQL-запросов в блоке `with query_budget(n):`.
+
+    Кэш ответов очищается, чтобы запросы на чтение доходили до БД."""
+    budget = QueryBudget()
+    await test_cache.clear()
+    event.listen(test_engine.sync_engine, 'before_cursor_execute', budget.record)
+    yield budget
+    event.remove(test_engine.sync_engine, 'before_cursor_execute', budget.record)
+
+
 @pytest.fixture
 def menu_post() -> dict[str, str]:
     """Фикстура меню для POST."""
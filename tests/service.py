@@ -1,3 +1,6 @@
+from contextlib import contextmanager
+from typing import Any, Iterator
+
 from app.main import app
 
 
@@ -14,4 +17,25 @@ def reverse(endpoint_name: str, routes: dict[str, str], **kwargs) -> str:
     path = routes.get(endpoint_name)
     if path is None:
         raise ValueError(f"Endpoint '{endpoint_name}' not found in routes.")
-    return path.format(**kwargs)
\ No newline at end of file
+    return path.format(**kwargs)
+
+
+class QueryBudget:
+    """Сбор SQL-запросов тестового движка и проверка их количества."""
+
+    def __init__(self):
+        self.statements: list[str] = []
+
+    def record(self, conn: Any, cursor: Any, statement: str, parameters: Any, context: Any,
+               executemany: bool) -> None:
+        self.statements.append(statement)
+
+    @contextmanager
+    def __call__(self, budget: int) -> Iterator[list[str]]:
+        """Не более budget SQL-запросов внутри блока."""
+        start = len(self.statements)
+        executed: list[str] = []
+        yield executed
+        executed.extend(self.statements[start:])
+        assert len(executed) <= budget, \
+            f'Выполнено {len(executed)} SQL-запросов при бюджете {budget}:\n' + '\n---\n'.join(executed)
@@ -0,0 +1,139 @@
+from http import HTTPStatus
+from typing import Any
+
+import fakeredis
+from httpx import AsyncClient
+
+from app.cache.backends import MemoryCache, RedisCache
+from service import get_routes, reverse
+
+
+async def test_memory_cache_lru() -> None:
+    """Вытеснение самой старой записи при переполнении кэша."""
+    cache = MemoryCache(maxsize=2)
+    await cache.set('a', b'1')
+    await cache.set('b', b'2')
+    await cache.get('a')
+    await cache.set('c', b'3')
+    assert await cache.get('a') == b'1', 'Недавно прочитанная запись вытеснена'
+    assert await cache.get('b') is None, 'Самая старая запись не вытеснена'
+
+
+async def test_memory_cache_ttl() -> None:
+    """Истечение времени жизни записи."""
+    cache = MemoryCache(ttl=-1)
+    await cache.set('a', b'1')
+    assert await cache.get('a') is None, 'Просроченная запись возвращена'
+
+
+async def test_redis_cache() -> None:
+    """Запись, чтение и удаление по точным ключам в Redis-кэше."""
+    cache = RedisCache(fakeredis.FakeAsyncRedis())
+    await cache.set('menu:1', b'1')
+    await cache.set('menu:2', b'2')
+    assert await cache.get('menu:1') == b'1', 'Запись не прочитана'
+    await cache.delete('menu:1')
+    assert await cache.get('menu:1') is None, 'Запись не удалена'
+    assert await cache.get('menu:2') == b'2', 'Удалена другая запись'
+    await cache.clear()
+    assert await cache.get('menu:2') is None, 'Кэш не очищен'
+
+
+async def test_post_menu(
+    menu_post: dict[str, str],
+    saved_data: dict[str, Any],
+    client: AsyncClient,
+) -> None:
+    """Добавление нового меню."""
+    routes = get_routes()
+    response = await client.post(reverse("create_menu", routes=routes), json=menu_post)
+    assert response.status_code == HTTPStatus.CREATED, 'Статус ответа не 201'
+    saved_data['menu'] = response.json()
+
+
+async def test_get_menu_cached(
+    saved_data: dict[str, Any],
+    client: AsyncClient,
+) -> None:
+    """Получение меню и списка меню, которые попадают в кэш."""
+    routes = get_routes()
+    menu = saved_data['menu']
+    response = await client.get(reverse("read_menu", menu_id=menu['id'], routes=routes))
+    assert response.status_code == HTTPStatus.OK, 'Статус ответа не 200'
+    assert response.json()['submenus_count'] == 0, 'Количество подменю не соответствует ожидаемому'
+    response = await client.get(reverse("read_all_menus", routes=routes))
+    assert response.json()[0]['dishes_count'] == 0, 'Количество блюд не соответствует ожидаемому'
+
+
+async def test_post_submenu_and_dish(
+    submenu_post: dict[str, str],
+    dish_post: dict[str, str],
+    saved_data: dict[str, Any],
+    client: AsyncClient,
+) -> None:
+    """Добавление подменю и блюда в закэшированное меню."""
+    routes = get_routes()
+    menu = saved_data['menu']
+    response = await client.post(reverse("create_submenu", menu_id=menu['id'], routes=routes), json=submenu_post)
+    assert response.status_code == HTTPStatus.CREATED, 'Статус ответа не 201'
+    saved_data['submenu'] = response.json()
+    response = await client.get(reverse("read_submenu", menu_id=menu['id'], submenu_id=saved_data['submenu']['id'],
+                                        routes=routes))
+    assert response.json()['dishes_count'] == 0, 'Количество блюд не соответствует ожидаемому'
+    response = await client.post(
+        reverse("create_dish", menu_id=menu['id'], submenu_id=saved_data['submenu']['id'], routes=routes),
+        json=dish_post,
+    )
+    assert response.status_code == HTTPStatus.CREATED, 'Статус ответа не 201'
+    saved_data['dish'] = response.json()
+
+
+async def test_counts_invalidated(
+    saved_data: dict[str, Any],
+    client: AsyncClient,
+) -> None:
+    """Счетчики меню и подменю обновляются после добавления блюда."""
+    routes = get_routes()
+    menu = saved_data['menu']
+    submenu = saved_data['submenu']
+    response = await client.get(reverse("read_menu", menu_id=menu['id'], routes=routes))
+    assert response.json()['submenus_count'] == 1, 'Количество подменю не сброшено в кэше'
+    assert response.json()['dishes_count'] == 1, 'Количество блюд не сброшено в кэше'
+    response = await client.get(reverse("read_all_menus", routes=routes))
+    assert response.json()[0]['dishes_count'] == 1, 'Список меню не сброшен в кэше'
+    response = await client.get(reverse("read_submenu", menu_id=menu['id'], submenu_id=submenu['id'], routes=routes))
+    assert response.json()['dishes_count'] == 1, 'Количество блюд подменю не сброшено в кэше'
+
+
+async def test_patch_dish_invalidated(
+    dish_patch: dict[str, str],
+    saved_data: dict[str, Any],
+    client: AsyncClient,
+) -> None:
+    """Изменение блюда сбрасывает его запись в кэше."""
+    routes = get_routes()
+    menu = saved_data['menu']
+    submenu = saved_data['submenu']
+    dish = saved_data['dish']
+    url = reverse("read_dish", menu_id=menu['id'], submenu_id=submenu['id'], dish_id=dish['id'], routes=routes)
+    await client.get(url)
+    response = await client.patch(url, json=dish_patch)
+    assert response.status_code == HTTPStatus.OK, 'Статус ответа не 200'
+    response = await client.get(url)
+    assert response.json()['title'] == dish_patch['title'], 'Блюдо не сброшено в кэше'
+
+
+async def test_delete_menu_invalidated(
+    saved_data: dict[str, Any],
+    client: AsyncClient,
+) -> None:
+    """Удаление меню сбрасывает все его поддерево в кэше."""
+    routes = get_routes()
+    menu = saved_data['menu']
+    submenu = saved_data['submenu']
+    response = await client.delete(reverse("delete_menu", menu_id=menu['id'], routes=routes))
+    assert response.status_code == HTTPStatus.OK, 'Статус ответа не 200'
+    response = await client.get(reverse("read_submenu", menu_id=menu['id'], submenu_id=submenu['id'], routes=routes))
+    assert response.status_code == HTTPStatus.NOT_FOUND, 'Статус ответа не 404'
+    response = await client.get(reverse("read_all_menus", routes=routes))
+    assert response.json() == [], 'В ответе непустой список'
@@ -0,0 +1,89 @@
+from http import HTTPStatus
+from typing import Any
+
+from httpx import AsyncClient
+
+from service import get_routes, reverse
+
+
+async def test_tree_empty(client: AsyncClient) -> None:
+    """Проверка получения пустого дерева меню."""
+    routes = get_routes()
+    response = await client.get(reverse("read_menus_tree", routes=routes))
+    assert response.status_code == HTTPStatus.OK, 'Статус ответа не 200'
+    assert response.json() == [], 'В ответе непустой список'
+
+
+async def test_post_objects_for_tree(
+    menu_post: dict[str, str],
+    submenu_post: dict[str, str],
+    dish_post: dict[str, str],
+    dish_2_post: dict[str, str],
+    saved_data: dict[str, Any],
+    client: AsyncClient,
+) -> None:
+    """Добавление меню, подменю и двух блюд."""
+    routes = get_routes()
+    response = await client.post(reverse("create_menu", routes=routes), json=menu_post)
+    assert response.status_code == HTTPStatus.CREATED, 'Статус ответа не 201'
+    saved_data['menu'] = response.json()
+    menu = saved_data['menu']
+    response = await client.post(reverse("create_submenu", menu_id=menu['id'], routes=routes), json=submenu_post)
+    assert response.status_code == HTTPStatus.CREATED, 'Статус ответа не 201'
+    saved_data['submenu'] = response.json()
+    submenu = saved_data['submenu']
+    for dish in (dish_post, dish_2_post):
+        response = await client.post(
+            reverse("create_dish", menu_id=menu['id'], submenu_id=submenu['id'], routes=routes),
+            json=dish,
+        )
+        assert response.status_code == HTTPStatus.CREATED, 'Статус ответа не 201'
+
+
+async def test_menus_tree(
+    saved_data: dict[str, Any],
+    client: AsyncClient,
+) -> None:
+    """Получение всего дерева меню."""
+    routes = get_routes()
+    response = await client.get(reverse("read_menus_tree", routes=routes))
+    assert response.status_code == HTTPStatus.OK, 'Статус ответа не 200'
+    tree = response.json()
+    assert len(tree) == 1, 'Количество меню в дереве не соответствует ожидаемому'
+    assert tree[0]['id'] == saved_data['menu']['id'], 'Идентификатор меню не соответствует ожидаемому'
+    assert tree[0]['submenus_count'] == 1, 'Количество подменю не соответствует ожидаемому'
+    assert tree[0]['dishes_count'] == 2, 'Количество блюд не соответствует ожидаемому'
+    submenu = tree[0]['submenus'][0]
+    assert submenu['id'] == saved_data['submenu']['id'], 'Идентификатор подменю не соответствует ожидаемому'
+    assert submenu['dishes_count'] == 2, 'Количество блюд подменю не соответствует ожидаемому'
+    assert len(submenu['dishes']) == 2, 'Количество блюд в дереве не соответствует ожидаемому'
+    dish_ids = [dish['id'] for dish in submenu['dishes']]
+    assert dish_ids == sorted(dish_ids), 'Блюда в дереве не упорядочены по id'
+
+
+async def test_menu_tree(
+    saved_data: dict[str, Any],
+    client: AsyncClient,
+) -> None:
+    """Получение дерева одного меню."""
+    routes = get_routes()
+    menu = saved_data['menu']
+    response = await client.get(reverse("read_menu_tree", menu_id=menu['id'], routes=routes))
+    assert response.status_code == HTTPStatus.OK, 'Статус ответа не 200'
+    assert response.json()['id'] == menu['id'], 'Идентификатор меню не соответствует ожидаемому'
+    assert len(response.json()['submenus'][0]['dishes']) == 2, 'Количество блюд в дереве не соответствует ожидаемому'
+
+
+async def test_delete_menu(
+    saved_data: dict[str, Any],
+    client: AsyncClient,
+) -> None:
+    """Удаление меню сбрасывает дерево."""
+    routes = get_routes()
+    menu = saved_data['menu']
+    response = await client.delete(reverse("delete_menu", menu_id=menu['id'], routes=routes))
+    assert response.status_code == HTTPStatus.OK, 'Статус ответа не 200'
+    response = await client.get(reverse("read_menu_tree", menu_id=menu['id'], routes=routes))
+    assert response.status_code == HTTPStatus.NOT_FOUND, 'Статус ответа не 404'
+    response = await client.get(reverse("read_menus_tree", routes=routes))
+    assert response.json() == [], 'В ответе непустой список'
@@ -0,0 +1,65 @@
+from http import HTTPStatus
+from typing import Any
+
+from httpx import AsyncClient
+
+from service import get_routes, reverse
+
+
+async def test_post_menus(
+    saved_data: dict[str, Any],
+    client: AsyncClient,
+) -> None:
+    """Добавление трех меню."""
+    routes = get_routes()
+    saved_data['menus'] = []
+    for number in range(3):
+        response = await client.post(
+            reverse("create_menu", routes=routes),
+            json={'title': f'Paginated menu {number}', 'description': 'Some description'},
+        )
+        assert response.status_code == HTTPStatus.CREATED, 'Статус ответа не 201'
+        saved_data['menus'].append(response.json()['id'])
+
+
+async def test_menus_cursor_pages(
+    saved_data: dict[str, Any],
+    client: AsyncClient,
+) -> None:
+    """Обход списка меню по курсору."""
+    routes = get_routes()
+    url = reverse("read_all_menus", routes=routes)
+    response = await client.get(url, params={'limit': 2})
+    assert response.status_code == HTTPStatus.OK, 'Статус ответа не 200'
+    assert len(response.json()) == 2, 'Размер первой страницы не соответствует ожидаемому'
+    cursor = response.headers.get('X-Next-Cursor')
+    assert cursor, 'Курсора следующей страницы нет в ответе'
+    ids = [menu['id'] for menu in response.json()]
+
+    response = await client.get(url, params={'limit': 2, 'cursor': cursor})
+    assert response.status_code == HTTPStatus.OK, 'Статус ответа не 200'
+    assert len(response.json()) == 1, 'Размер последней страницы не соответствует ожидаемому'
+    assert 'X-Next-Cursor' not in response.headers, 'У последней страницы есть курсор'
+    ids += [menu['id'] for menu in response.json()]
+    assert sorted(ids) == sorted(saved_data['menus']), 'Страницы не покрывают все меню'
+
+    response = await client.get(url, params={'limit': 2, 'skip': 2})
+    assert [menu['id'] for menu in response.json()] == ids[2:], 'Страница skip/limit не совпадает с курсорной'
+
+
+async def test_invalid_cursor(client: AsyncClient) -> None:
+    """Некорректный курсор."""
+    routes = get_routes()
+    response = await client.get(reverse("read_all_menus", routes=routes), params={'cursor': '!'})
+    assert response.status_code == HTTPStatus.BAD_REQUEST, 'Статус ответа не 400'
+
+
+async def test_delete_menus(
+    saved_data: dict[str, Any],
+    client: AsyncClient,
+) -> None:
+    """Удаление созданных меню."""
+    routes = get_routes()
+    for menu_id in saved_data['menus']:
+        response = await client.delete(reverse("delete_menu", menu_id=menu_id, routes=routes))
+        assert response.status_code == HTTPStatus.OK, 'Статус ответа не 200'
@@ -0,0 +1,82 @@
+from http import HTTPStatus
+from typing import Any
+
+from httpx import AsyncClient
+
+from service import get_routes, reverse
+
+
+async def test_post_menu(
+    menu_post: dict[str, str],
+    saved_data: dict[str, Any],
+    client: AsyncClient,
+) -> None:
+    """Добавление нового меню."""
+    routes = get_routes()
+    response = await client.post(reverse("create_menu", routes=routes), json=menu_post)
+    assert response.status_code == HTTPStatus.CREATED, 'Статус ответа не 201'
+    saved_data['menu'] = response.json()
+
+
+async def test_bulk_submenus(
+    submenu_post: dict[str, str],
+    submenu_patch: dict[str, str],
+    saved_data: dict[str, Any],
+    client: AsyncClient,
+) -> None:
+    """Пакетное добавление подменю."""
+    routes = get_routes()
+    menu = saved_data['menu']
+    response = await client.post(
+        reverse("bulk_create_submenus", menu_id=menu['id'], routes=routes),
+        json=[submenu_post, submenu_patch, submenu_post],
+    )
+    assert response.status_code == HTTPStatus.OK, 'Статус ответа не 200'
+    statuses = [result['status'] for result in response.json()]
+    assert statuses == ['created', 'created', 'skipped'], 'Результаты вставки не соответствуют ожидаемым'
+    saved_data['submenu'] = response.json()[0]
+
+    response = await client.get(reverse("read_menu", menu_id=menu['id'], routes=routes))
+    assert response.json()['submenus_count'] == 2, 'Количество подменю не соответствует ожидаемому'
+
+
+async def test_bulk_dishes(
+    dish_post: dict[str, str],
+    dish_2_post: dict[str, str],
+    saved_data: dict[str, Any],
+    client: AsyncClient,
+) -> None:
+    """Пакетное добавление и обновление блюд."""
+    routes = get_routes()
+    menu = saved_data['menu']
+    submenu = saved_data['submenu']
+    url = reverse("bulk_create_dishes", menu_id=menu['id'], submenu_id=submenu['id'], routes=routes)
+    response = await client.post(url, json=[dish_post])
+    assert response.status_code == HTTPStatus.OK, 'Статус ответа не 200'
+    assert response.json()[0]['status'] == 'created', 'Блюдо не создано'
+
+    response = await client.post(url, json=[{**dish_post, 'price': '1.5'}, dish_2_post])
+    statuses = [result['status'] for result in response.json()]
+    assert statuses == ['updated', 'created'], 'Результаты вставки не соответствуют ожидаемым'
+    dish_id = response.json()[0]['id']
+
+    response = await client.post(url, params={'upsert': False}, json=[dish_post])
+    assert response.json()[0]['status'] == 'skipped', 'Существующее блюдо не пропущено'
+
+    response = await client.get(
+        reverse("read_dish", menu_id=menu['id'], submenu_id=submenu['id'], dish_id=dish_id, routes=routes),
+    )
+    assert response.json()['price'] == '1.50', 'Цена блюда не обновлена'
+    response = await client.get(reverse("read_menu", menu_id=menu['id'], routes=routes))
+    assert response.json()['dishes_count'] == 2, 'Количество блюд не соответствует ожидаемому'
+
+
+async def test_delete_menu(
+    saved_data: dict[str, Any],
+    client: AsyncClient,
+) -> None:
+    """Удаление текущего меню."""
+    routes = get_routes()
+    menu = saved_data['menu']
+    response = await client.delete(reverse("delete_menu", menu_id=menu['id'], routes=routes))
+    assert response.status_code == HTTPStatus.OK, 'Статус ответа не 200'
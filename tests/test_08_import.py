@@ -0,0 +1,88 @@
+import uuid
+from http import HTTPStatus
+from pathlib import Path
+from typing import Any
+
+from httpx import AsyncClient
+
+from app.importer.sync import sync_menu_file
+from conftest import TestAsyncSessionLocal, test_cache
+from service import get_routes, reverse
+
+MENU_ID, SUBMENU_ID, DISH_ID, DISH_2_ID = (str(uuid.uuid4()) for _ in range(4))
+
+
+def write_menu_file(path: Path, price: str, with_second_dish: bool = True,
+                    submenu_id: str = SUBMENU_ID, dish_id: str = DISH_ID) -> str:
+    """Запись файла меню в формате импорта."""
+    rows = [
+        f'{MENU_ID},Imported menu,Menu description',
+        f',{submenu_id},Imported submenu,Submenu description',
+        f',,{dish_id},Imported dish,Dish description,{price}',
+    ]
+    if with_second_dish:
+        rows.append(f',,{DISH_2_ID},Imported second dish,Dish description,10')
+    path.write_text('\n'.join(rows), encoding='utf-8')
+    return str(path)
+
+
+async def sync(path: str) -> dict[str, Any]:
+    return await sync_menu_file(path, session_factory=TestAsyncSessionLocal, cache=test_cache)
+
+
+async def test_import_menu_file(tmp_path: Path, client: AsyncClient) -> None:
+    """Первичный импорт файла меню."""
+    stats = await sync(write_menu_file(tmp_path / 'menu.csv', '12.5'))
+    assert stats['upserted'] == {'menus': 1, 'submenus': 1, 'dishes': 2}, 'Импортированы не все строки'
+
+    routes = get_routes()
+    response = await client.get(reverse("read_menu", menu_id=MENU_ID, routes=routes))
+    assert response.status_code == HTTPStatus.OK, 'Статус ответа не 200'
+    assert response.json()['submenus_count'] == 1, 'Количество подменю не соответствует ожидаемому'
+    assert response.json()['dishes_count'] == 2, 'Количество блюд не соответствует ожидаемому'
+
+
+async def test_import_unchanged_file(tmp_path: Path) -> None:
+    """Повторный импорт того же файла ничего не записывает."""
+    stats = await sync(write_menu_file(tmp_path / 'menu.csv', '12.50'))
+    assert not any(stats['upserted'].values()), 'Записаны неизмененные строки'
+    assert not any(stats['deleted'].values()), 'Удалены неизмененные строки'
+
+
+async def test_import_changed_file(tmp_path: Path, client: AsyncClient) -> None:
+    """Импорт файла с измененной ценой и удаленным блюдом."""
+    routes = get_routes()
+    dish_url = reverse("read_dish", menu_id=MENU_ID, submenu_id=SUBMENU_ID, dish_id=DISH_ID, routes=routes)
+    await client.get(dish_url)
+    stats = await sync(write_menu_file(tmp_path / 'menu.csv', '15', with_second_dish=False))
+    assert stats['upserted']['dishes'] == 1, 'Количество обновленных блюд не соответствует ожидаемому'
+    assert stats['deleted']['dishes'] == 1, 'Количество удаленных блюд не соответствует ожидаемому'
+
+    response = await client.get(dish_url)
+    assert response.json()['price'] == '15.00', 'Цена блюда не обновлена'
+    response = await client.get(reverse("read_menu", menu_id=MENU_ID, routes=routes))
+    assert response.json()['dishes_count'] == 1, 'Количество блюд не соответствует ожидаемому'
+
+
+async def test_import_replaced_rows(tmp_path: Path, client: AsyncClient) -> None:
+    """Импорт файла, где подменю и блюдо заменены строками с новыми id и теми же названиями."""
+    submenu_id, dish_id = str(uuid.uuid4()), str(uuid.uuid4())
+    stats = await sync(write_menu_file(tmp_path / 'menu.csv', '15', with_second_dish=False,
+                                       submenu_id=submenu_id, dish_id=dish_id))
+    assert stats['upserted'] == {'menus': 0, 'submenus': 1, 'dishes': 1}, 'Количество записанных строк неверно'
+    assert stats['deleted'] == {'menus': 0, 'submenus': 1, 'dishes': 1}, 'Количество удаленных строк неверно'
+
+    routes = get_routes()
+    response = await client.get(reverse("read_dish", menu_id=MENU_ID, submenu_id=submenu_id, dish_id=dish_id,
+                                        routes=routes))
+    assert response.status_code == HTTPStatus.OK, 'Статус ответа не 200'
+    assert response.json()['title'] == 'Imported dish', 'Название блюда не соответствует ожидаемому'
+    response = await client.get(reverse("read_submenu", menu_id=MENU_ID, submenu_id=SUBMENU_ID, routes=routes))
+    assert response.status_code == HTTPStatus.NOT_FOUND, 'Статус ответа не 404'
+
+
+async def test_delete_menu(client: AsyncClient) -> None:
+    """Удаление импортированного меню."""
+    routes = get_routes()
+    response = await client.delete(reverse("delete_menu", menu_id=MENU_ID, routes=routes))
+    assert response.status_code == HTTPStatus.OK, 'Статус ответа не 200'
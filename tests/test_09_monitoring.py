@@ -0,0 +1,48 @@
+import os
+import subprocess
+import sys
+from http import HTTPStatus
+from pathlib import Path
+
+from httpx import AsyncClient
+
+from service import get_routes, reverse
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+async def test_pool_status(client: AsyncClient) -> None:
+    """Получение состояния пула соединений."""
+    routes = get_routes()
+    response = await client.get(reverse("read_pool_status", routes=routes))
+    assert response.status_code == HTTPStatus.OK, 'Статус ответа не 200'
+    assert 'checked_out' in response.json(), 'Количества занятых соединений нет в ответе'
+    assert 'checkout_timeouts' in response.json(), 'Количества таймаутов нет в ответе'
+
+
+async def test_metrics(client: AsyncClient) -> None:
+    """Получение метрик Prometheus."""
+    routes = get_routes()
+    await client.get(reverse("read_all_menus", routes=routes))
+    response = await client.get(reverse("metrics", routes=routes))
+    assert response.status_code == HTTPStatus.OK, 'Статус ответа не 200'
+    assert 'http_requests_total{method="GET",route="/api/v1/menus/",status="200"}' in response.text, \
+        'Метрики запросов нет в ответе'
+    assert 'db_queries_per_request' in response.text, 'Метрики SQL-запросов нет в ответе'
+
+
+def test_multiprocess_metrics(tmp_path: Path) -> None:
+    """Метрики воркеров суммируются через каталог PROMETHEUS_MULTIPROC_DIR."""
+    script = (
+        'import asyncio\n'
+        'from app.metrics import REQUESTS, metrics, mark_worker_dead\n'
+        'REQUESTS.labels("GET", "/", 200).inc()\n'
+        'print(asyncio.run(metrics(None)).body.decode())\n'
+        'mark_worker_dead()\n'
+    )
+    env = {**os.environ, 'PROMETHEUS_MULTIPROC_DIR': str(tmp_path)}
+    for _ in range(2):
+        result = subprocess.run([sys.executable, '-c', script], env=env, cwd=ROOT, capture_output=True,
+                                text=True, check=True)
+    assert 'http_requests_total{method="GET",route="/",status="200"} 2.0' in result.stdout, \
+        'Метрики процессов не суммируются'
@@ -0,0 +1,113 @@
+from http import HTTPStatus
+from typing import Any
+
+from httpx import AsyncClient
+
+from service import QueryBudget, get_routes, reverse
+
+
+async def test_menu_budget(
+    menu_post: dict[str, str],
+    menu_patch: dict[str, str],
+    saved_data: dict[str, Any],
+    client: AsyncClient,
+    query_budget: QueryBudget,
+) -> None:
+    """Количество SQL-запросов операций с меню."""
+    routes = get_routes()
+    with query_budget(2):
+        response = await client.post(reverse("create_menu", routes=routes), json=menu_post)
+    assert response.status_code == HTTPStatus.CREATED, 'Статус ответа не 201'
+    saved_data['menu'] = response.json()
+    menu = saved_data['menu']
+    with query_budget(1):
+        await client.get(reverse("read_all_menus", routes=routes))
+    with query_budget(1):
+        await client.get(reverse("read_menu", menu_id=menu['id'], routes=routes))
+    with query_budget(0):
+        await client.get(reverse("read_menu", menu_id=menu['id'], routes=routes))
+    with query_budget(4):
+        await client.patch(reverse("update_menu", menu_id=menu['id'], routes=routes), json=menu_patch)
+
+
+async def test_submenu_budget(
+    submenu_post: dict[str, str],
+    submenu_patch: dict[str, str],
+    saved_data: dict[str, Any],
+    client: AsyncClient,
+    query_budget: QueryBudget,
+) -> None:
+    """Количество SQL-запросов операций с подменю."""
+    routes = get_routes()
+    menu = saved_data['menu']
+    with query_budget(3):
+        response = await client.post(reverse("create_submenu", menu_id=menu['id'], routes=routes), json=submenu_post)
+    assert response.status_code == HTTPStatus.CREATED, 'Статус ответа не 201'
+    saved_data['submenu'] = response.json()
+    submenu = saved_data['submenu']
+    with query_budget(1):
+        await client.get(reverse("read_all_submenus", menu_id=menu['id'], routes=routes))
+    with query_budget(1):
+        await client.get(reverse("read_submenu", menu_id=menu['id'], submenu_id=submenu['id'], routes=routes))
+    with query_budget(4):
+        await client.patch(reverse("update_submenu", menu_id=menu['id'], submenu_id=submenu['id'], routes=routes),
+                           json=submenu_patch)
+
+
+async def test_dish_budget(
+    dish_post: dict[str, str],
+    dish_patch: dict[str, str],
+    saved_data: dict[str, Any],
+    client: AsyncClient,
+    query_budget: QueryBudget,
+) -> None:
+    """Количество SQL-запросов операций с блюдами."""
+    routes = get_routes()
+    menu = saved_data['menu']
+    submenu = saved_data['submenu']
+    with query_budget(5):
+        response = await client.post(
+            reverse("create_dish", menu_id=menu['id'], submenu_id=submenu['id'], routes=routes),
+            json=dish_post,
+        )
+    assert response.status_code == HTTPStatus.CREATED, 'Статус ответа не 201'
+    dish = response.json()
+    dish_url = reverse("read_dish", menu_id=menu['id'], submenu_id=submenu['id'], dish_id=dish['id'], routes=routes)
+    with query_budget(1):
+        await client.get(reverse("read_all_dishes", menu_id=menu['id'], submenu_id=submenu['id'], routes=routes))
+    with query_budget(1):
+        await client.get(dish_url)
+    with query_budget(5):
+        await client.patch(dish_url, json=dish_patch)
+    with query_budget(5):
+        response = await client.delete(dish_url)
+    assert response.status_code == HTTPStatus.OK, 'Статус ответа не 200'
+
+
+async def test_tree_budget(
+    client: AsyncClient,
+    query_budget: QueryBudget,
+) -> None:
+    """Дерево меню загружается постоянным количеством SQL-запросов."""
+    routes = get_routes()
+    with query_budget(3):
+        response = await client.get(reverse("read_menus_tree", routes=routes))
+    assert response.status_code == HTTPStatus.OK, 'Статус ответа не 200'
+
+
+async def test_delete_budget(
+    saved_data: dict[str, Any],
+    client: AsyncClient,
+    query_budget: QueryBudget,
+) -> None:
+    """Удаление подменю и меню вместе с поддеревом одним запросом DELETE."""
+    routes = get_routes()
+    menu = saved_data['menu']
+    submenu = saved_data['submenu']
+    with query_budget(3):
+        response = await client.delete(reverse("delete_submenu", menu_id=menu['id'], submenu_id=submenu['id'],
+                                               routes=routes))
+    assert response.status_code == HTTPStatus.OK, 'Статус ответа не 200'
+    with query_budget(2):
+        response = await client.delete(reverse("delete_menu", menu_id=menu['id'], routes=routes))
+    assert response.status_code == HTTPStatus.OK, 'Статус ответа не 200'
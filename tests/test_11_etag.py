@@ -0,0 +1,113 @@
+from http import HTTPStatus
+from typing import Any
+
+import pytest
+from httpx import AsyncClient
+
+from app.database.versions import bump_versions, versions
+from conftest import TestAsyncSessionLocal, test_cache
+from service import QueryBudget, get_routes, reverse
+
+
+async def test_post_menu(
+    menu_post: dict[str, str],
+    saved_data: dict[str, Any],
+    client: AsyncClient,
+) -> None:
+    """Добавление нового меню."""
+    routes = get_routes()
+    response = await client.post(reverse("create_menu", routes=routes), json=menu_post)
+    assert response.status_code == HTTPStatus.CREATED, 'Статус ответа не 201'
+    saved_data['menu'] = response.json()
+
+
+async def test_menu_not_modified(
+    saved_data: dict[str, Any],
+    client: AsyncClient,
+    query_budget: QueryBudget,
+) -> None:
+    """Повторный запрос с If-None-Match возвращает 304 без обращения к БД."""
+    routes = get_routes()
+    url = reverse("read_menu", menu_id=saved_data['menu']['id'], routes=routes)
+    response = await client.get(url)
+    assert response.status_code == HTTPStatus.OK, 'Статус ответа не 200'
+    etag = response.headers.get('ETag')
+    assert etag, 'ETag нет в ответе'
+    saved_data['etag'] = etag
+    with query_budget(0):
+        response = await client.get(url, headers={'If-None-Match': etag})
+    assert response.status_code == HTTPStatus.NOT_MODIFIED, 'Статус ответа не 304'
+    assert response.headers.get('ETag') == etag, 'ETag ответа 304 не соответствует ожидаемому'
+    assert response.content == b'', 'У ответа 304 есть тело'
+
+
+async def test_etag_survives_cache_loss(
+    saved_data: dict[str, Any],
+    client: AsyncClient,
+) -> None:
+    """ETag не меняется без изменения данных: ни после очистки кэша, ни в процессе без версий в памяти."""
+    routes = get_routes()
+    url = reverse("read_menu", menu_id=saved_data['menu']['id'], routes=routes)
+    await test_cache.clear()
+    response = await client.get(url, headers={'If-None-Match': saved_data['etag']})
+    assert response.status_code == HTTPStatus.NOT_MODIFIED, 'ETag изменился после очистки кэша'
+    versions.clear()
+    response = await client.get(url, headers={'If-None-Match': saved_data['etag']})
+    assert response.status_code == HTTPStatus.NOT_MODIFIED, 'ETag изменился после перечитывания версии из БД'
+
+
+async def test_menu_modified_after_submenu_post(
+    submenu_post: dict[str, str],
+    saved_data: dict[str, Any],
+    client: AsyncClient,
+) -> None:
+    """Изменение поддерева меню меняет ETag меню."""
+    routes = get_routes()
+    menu = saved_data['menu']
+    response = await client.post(reverse("create_submenu", menu_id=menu['id'], routes=routes), json=submenu_post)
+    assert response.status_code == HTTPStatus.CREATED, 'Статус ответа не 201'
+    response = await client.get(
+        reverse("read_menu", menu_id=menu['id'], routes=routes),
+        headers={'If-None-Match': saved_data['etag']},
+    )
+    assert response.status_code == HTTPStatus.OK, 'Статус ответа не 200'
+    assert response.headers['ETag'] != saved_data['etag'], 'ETag не изменился'
+    assert response.json()['submenus_count'] == 1, 'Количество подменю не соответствует ожидаемому'
+
+
+async def test_version_bumped_without_events(
+    saved_data: dict[str, Any],
+    client: AsyncClient,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Версию, увеличенную в БД без событий (другой процесс, seed), процесс без подписки видит после VERSIONS_TTL."""
+    routes = get_routes()
+    url = reverse("read_menu", menu_id=saved_data['menu']['id'], routes=routes)
+    etag = (await client.get(url)).headers['ETag']
+    async with TestAsyncSessionLocal() as session:
+        await bump_versions(session, [saved_data['menu']['id']])
+        await session.commit()
+    monkeypatch.setattr(versions, 'ttl', 0)
+    response = await client.get(url, headers={'If-None-Match': etag})
+    assert response.status_code == HTTPStatus.OK, 'Статус ответа не 200'
+    assert response.headers['ETag'] != etag, 'ETag не изменился после увеличения версии в БД'
+
+
+async def test_menus_list_not_modified(client: AsyncClient) -> None:
+    """Список меню поддерживает условный запрос."""
+    routes = get_routes()
+    url = reverse("read_all_menus", routes=routes)
+    response = await client.get(url)
+    response = await client.get(url, headers={'If-None-Match': response.headers['ETag']})
+    assert response.status_code == HTTPStatus.NOT_MODIFIED, 'Статус ответа не 304'
+
+
+async def test_delete_menu(
+    saved_data: dict[str, Any],
+    client: AsyncClient,
+) -> None:
+    """Удаление текущего меню."""
+    routes = get_routes()
+    menu = saved_data['menu']
+    response = await client.delete(reverse("delete_menu", menu_id=menu['id'], routes=routes))
+    assert response.status_code == HTTPStatus.OK, 'Статус ответа не 200'
@@ -0,0 +1,37 @@
+import json
+import uuid
+from decimal import Decimal
+from types import SimpleNamespace
+
+import orjson
+import pytest
+
+from app.database import serializers
+
+
+@pytest.fixture
+def dish() -> SimpleNamespace:
+    return SimpleNamespace(id=uuid.uuid4(), title='Dish', description='Description', price=Decimal('12.5'))
+
+
+@pytest.fixture
+def menu(dish: SimpleNamespace) -> SimpleNamespace:
+    submenu = SimpleNamespace(id=uuid.uuid4(), title='Submenu', description='Description', dishes_count=1,
+                              dishes=[dish])
+    return SimpleNamespace(id=uuid.uuid4(), title='Menu', description='Description', submenus_count=1,
+                           dishes_count=1, submenus=[submenu])
+
+
+def test_fast_json_matches_schemas(menu: SimpleNamespace, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Быстрая сериализация дает тот же JSON, что и Pydantic-схемы."""
+    expected = json.loads(serializers.dumps(serializers.menu_tree_data(menu)))
+    monkeypatch.setattr(serializers, 'FAST_JSON', True)
+    data = serializers.menu_tree_data(menu)
+    assert isinstance(data, dict), 'В быстром режиме используется Pydantic-модель'
+    assert orjson.loads(serializers.dumps(data)) == expected, 'Быстрая сериализация отличается от схем'
+
+
+def test_fast_json_price(dish: SimpleNamespace, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Цена блюда форматируется с двумя знаками после запятой."""
+    monkeypatch.setattr(serializers, 'FAST_JSON', True)
+    assert orjson.loads(serializers.dumps(serializers.dish_data(dish)))['price'] == '12.50', 'Цена не отформатирована'
@@ -0,0 +1,10 @@
+from app.database.migrations import SCHEMA_VERSION, current_version, migrate
+from conftest import test_engine
+
+
+async def test_migrate_idempotent() -> None:
+    """Повторный запуск миграций не выполняет DDL и оставляет текущую версию схемы."""
+    await migrate(test_engine)
+    assert await migrate(test_engine) == [], 'Миграции применены повторно'
+    async with test_engine.connect() as conn:
+        assert await current_version(conn) == SCHEMA_VERSION, 'Версия схемы не соответствует ожидаемой'
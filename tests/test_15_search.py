@@ -0,0 +1,70 @@
+from http import HTTPStatus
+from typing import Any
+
+from httpx import AsyncClient
+
+from service import get_routes, reverse
+
+
+async def test_post_dishes_for_search(
+    menu_post: dict[str, str],
+    submenu_post: dict[str, str],
+    dish_post: dict[str, str],
+    dish_2_post: dict[str, str],
+    saved_data: dict[str, Any],
+    client: AsyncClient,
+) -> None:
+    """Добавление меню, подменю и двух блюд."""
+    routes = get_routes()
+    response = await client.post(reverse("create_menu", routes=routes), json=menu_post)
+    saved_data['menu'] = response.json()
+    menu = saved_data['menu']
+    response = await client.post(reverse("create_submenu", menu_id=menu['id'], routes=routes), json=submenu_post)
+    saved_data['submenu'] = response.json()
+    for dish in (dish_post, dish_2_post):
+        response = await client.post(
+            reverse("create_dish", menu_id=menu['id'], submenu_id=saved_data['submenu']['id'], routes=routes),
+            json=dish,
+        )
+        assert response.status_code == HTTPStatus.CREATED, 'Статус ответа не 201'
+
+
+async def test_search_by_text(
+    dish_post: dict[str, str],
+    saved_data: dict[str, Any],
+    client: AsyncClient,
+) -> None:
+    """Поиск блюд по названию и описанию."""
+    routes = get_routes()
+    response = await client.get(reverse("search_dishes", routes=routes), params={'q': 'first'})
+    assert response.status_code == HTTPStatus.OK, 'Статус ответа не 200'
+    assert [dish['title'] for dish in response.json()] == [dish_post['title']], 'Найдены не те блюда'
+    assert response.json()[0]['menu_id'] == saved_data['menu']['id'], 'Меню блюда не соответствует ожидаемому'
+    response = await client.get(reverse("search_dishes", routes=routes), params={'q': 'description'})
+    assert len(response.json()) == 2, 'Количество найденных блюд не соответствует ожидаемому'
+
+
+async def test_search_by_price(
+    dish_2_post: dict[str, str],
+    client: AsyncClient,
+) -> None:
+    """Фильтр блюд по диапазону цен."""
+    routes = get_routes()
+    response = await client.get(reverse("search_dishes", routes=routes), params={'min_price': 200, 'max_price': 700})
+    assert response.status_code == HTTPStatus.OK, 'Статус ответа не 200'
+    assert [dish['title'] for dish in response.json()] == [dish_2_post['title']], 'Найдены не те блюда'
+    assert response.json()[0]['price'] == '654.12', 'Цена блюда не соответствует ожидаемой'
+    response = await client.get(reverse("search_dishes", routes=routes), params={'limit': 1, 'skip': 1})
+    assert [dish['title'] for dish in response.json()] == [dish_2_post['title']], 'Пагинация по цене не работает'
+
+
+async def test_delete_menu(
+    saved_data: dict[str, Any],
+    client: AsyncClient,
+) -> None:
+    """Удаление меню убирает его блюда из поиска."""
+    routes = get_routes()
+    response = await client.delete(reverse("delete_menu", menu_id=saved_data['menu']['id'], routes=routes))
+    assert response.status_code == HTTPStatus.OK, 'Статус ответа не 200'
+    response = await client.get(reverse("search_dishes", routes=routes), params={'q': 'dish'})
+    assert response.json() == [], 'В ответе непустой список'
@@ -0,0 +1,107 @@
+from http import HTTPStatus
+from typing import Any
+
+from httpx import AsyncClient
+
+from service import get_routes, reverse
+
+
+async def test_post_objects_for_stats(
+    menu_post: dict[str, str],
+    submenu_post: dict[str, str],
+    dish_post: dict[str, str],
+    dish_2_post: dict[str, str],
+    saved_data: dict[str, Any],
+    client: AsyncClient,
+) -> None:
+    """Добавление меню, подменю и двух блюд."""
+    routes = get_routes()
+    response = await client.post(reverse("create_menu", routes=routes), json=menu_post)
+    saved_data['menu'] = response.json()
+    menu = saved_data['menu']
+    response = await client.post(reverse("create_submenu", menu_id=menu['id'], routes=routes), json=submenu_post)
+    saved_data['submenu'] = response.json()
+    saved_data['dishes'] = []
+    for dish in (dish_post, dish_2_post):
+        response = await client.post(
+            reverse("create_dish", menu_id=menu['id'], submenu_id=saved_data['submenu']['id'], routes=routes),
+            json=dish,
+        )
+        assert response.status_code == HTTPStatus.CREATED, 'Статус ответа не 201'
+        saved_data['dishes'].append(response.json())
+
+
+async def test_menu_stats(
+    saved_data: dict[str, Any],
+    client: AsyncClient,
+) -> None:
+    """Статистика цен меню и подменю."""
+    routes = get_routes()
+    menu = saved_data['menu']
+    response = await client.get(reverse("read_menu_stats", menu_id=menu['id'], routes=routes))
+    assert response.status_code == HTTPStatus.OK, 'Статус ответа не 200'
+    stats = response.json()
+    assert stats['dishes_count'] == 2, 'Количество блюд не соответствует ожидаемому'
+    assert stats['min_price'] == '123.46', 'Минимальная цена не соответствует ожидаемой'
+    assert stats['max_price'] == '654.12', 'Максимальная цена не соответствует ожидаемой'
+    assert stats['avg_price'] == '388.79', 'Средняя цена не соответствует ожидаемой'
+    assert stats['submenus'][0]['submenu_id'] == saved_data['submenu']['id'], 'Подменю не соответствует ожидаемому'
+    response = await client.get(reverse("read_menus_stats", routes=routes))
+    assert response.json() == [stats], 'Статистика всех меню не соответствует статистике меню'
+
+
+async def test_stats_after_changes(
+    dish_patch: dict[str, str],
+    saved_data: dict[str, Any],
+    client: AsyncClient,
+) -> None:
+    """Статистика обновляется после изменения и удаления блюд."""
+    routes = get_routes()
+    menu = saved_data['menu']
+    submenu = saved_data['submenu']
+    first, second = saved_data['dishes']
+    await client.patch(reverse("update_dish", menu_id=menu['id'], submenu_id=submenu['id'], dish_id=first['id'],
+                               routes=routes), json=dish_patch)
+    await client.delete(reverse("delete_dish", menu_id=menu['id'], submenu_id=submenu['id'], dish_id=second['id'],
+                                routes=routes))
+    response = await client.get(reverse("read_menu_stats", menu_id=menu['id'], routes=routes))
+    stats = response.json()
+    assert stats['dishes_count'] == 1, 'Количество блюд не обновлено'
+    assert stats['min_price'] == stats['max_price'] == f"{float(dish_patch['price']):.2f}", 'Цены не обновлены'
+
+
+async def test_stats_deltas(
+    saved_data: dict[str, Any],
+    client: AsyncClient,
+) -> None:
+    """Агрегаты верны после изменения крайней и некрайней цены."""
+    routes = get_routes()
+    menu = saved_data['menu']
+    submenu = saved_data['submenu']
+    dishes_url = reverse("create_dish", menu_id=menu['id'], submenu_id=submenu['id'], routes=routes)
+    dishes = []
+    for title, price in (('Cheap dish', '100'), ('Middle dish', '200')):
+        response = await client.post(dishes_url, json={'title': title, 'description': 'Stats', 'price': price})
+        dishes.append(response.json())
+    await client.delete(reverse("delete_dish", menu_id=menu['id'], submenu_id=submenu['id'], dish_id=dishes[1]['id'],
+                                routes=routes))
+    await client.patch(reverse("update_dish", menu_id=menu['id'], submenu_id=submenu['id'], dish_id=dishes[0]['id'],
+                               routes=routes), json={'title': 'Cheap dish', 'description': 'Stats', 'price': '50'})
+    response = await client.get(reverse("read_menu_stats", menu_id=menu['id'], routes=routes))
+    stats = response.json()
+    assert stats['dishes_count'] == 2, 'Количество блюд не соответствует ожидаемому'
+    assert stats['min_price'] == '50.00', 'Минимальная цена не соответствует ожидаемой'
+    assert stats['max_price'] == '654.12', 'Максимальная цена не соответствует ожидаемой'
+    assert stats['avg_price'] == '352.06', 'Средняя цена не соответствует ожидаемой'
+
+
+async def test_delete_menu(
+    saved_data: dict[str, Any],
+    client: AsyncClient,
+) -> None:
+    """Статистика удаленного меню недоступна."""
+    routes = get_routes()
+    menu = saved_data['menu']
+    await client.delete(reverse("delete_menu", menu_id=menu['id'], routes=routes))
+    response = await client.get(reverse("read_menu_stats", menu_id=menu['id'], routes=routes))
+    assert response.status_code == HTTPStatus.NOT_FOUND, 'Статус ответа не 404'
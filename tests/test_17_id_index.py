@@ -0,0 +1,114 @@
+import uuid
+from http import HTTPStatus
+from typing import Any
+
+from httpx import AsyncClient
+
+from app.database.models import Menu
+from app.database.service import IdIndex, id_index
+from conftest import TestAsyncSessionLocal
+from service import QueryBudget, get_routes, reverse
+
+
+def test_id_index_updates() -> None:
+    """Добавление и удаление идентификаторов в индексе."""
+    index = IdIndex()
+    menu_id, submenu_id = str(uuid.uuid4()), str(uuid.uuid4())
+    index.add_menu(menu_id)
+    index.add_submenus(menu_id, [submenu_id])
+    assert index.submenus[submenu_id] == menu_id, 'Подменю не добавлено в индекс'
+    index.remove_menu(menu_id)
+    assert menu_id not in index.menus, 'Меню не удалено из индекса'
+    assert submenu_id not in index.submenus, 'Подменю удаленного меню осталось в индексе'
+
+
+async def test_unknown_objects_checked_in_db(
+    submenu_post: dict[str, str],
+    dish_post: dict[str, str],
+    client: AsyncClient,
+    query_budget: QueryBudget,
+) -> None:
+    """Отсутствующие в индексе меню и подменю проверяются одним запросом к БД."""
+    routes = get_routes()
+    menu_id, submenu_id = str(uuid.uuid4()), str(uuid.uuid4())
+    response = await client.get(reverse("read_menu", menu_id=menu_id, routes=routes))
+    assert response.status_code == HTTPStatus.NOT_FOUND, 'Статус ответа не 404'
+    response = await client.get(reverse("read_menu", menu_id='not-a-uuid', routes=routes))
+    assert response.status_code == HTTPStatus.NOT_FOUND, 'Статус ответа не 404'
+    with query_budget(1):
+        response = await client.post(reverse("create_submenu", menu_id=menu_id, routes=routes), json=submenu_post)
+        assert response.status_code == HTTPStatus.NOT_FOUND, 'Подменю создано в несуществующем меню'
+    with query_budget(1):
+        response = await client.post(
+            reverse("create_dish", menu_id=menu_id, submenu_id=submenu_id, routes=routes), json=dish_post,
+        )
+        assert response.status_code == HTTPStatus.NOT_FOUND, 'Блюдо создано в несуществующем подменю'
+
+
+async def test_complete_index_answers_misses(
+    submenu_post: dict[str, str],
+    client: AsyncClient,
+    query_budget: QueryBudget,
+) -> None:
+    """Индекс, загруженный во время подписки на события, отвечает 404 без обращения к БД."""
+    routes = get_routes()
+    id_index.subscribe()
+    try:
+        assert not id_index.complete, 'Индекс полон до перезагрузки после подписки'
+        async with TestAsyncSessionLocal() as session:
+            await id_index.load(session)
+        assert id_index.complete, 'Индекс не полон после перезагрузки'
+        with query_budget(0):
+            response = await client.post(
+                reverse("create_submenu", menu_id=str(uuid.uuid4()), routes=routes), json=submenu_post,
+            )
+        assert response.status_code == HTTPStatus.NOT_FOUND, 'Статус ответа не 404'
+    finally:
+        id_index.unsubscribe()
+    assert not id_index.complete, 'Индекс полон без подписки'
+
+
+async def test_stale_parent_not_found(
+    submenu_post: dict[str, str],
+    client: AsyncClient,
+) -> None:
+    """Создание подменю в меню, которое осталось в индексе после удаления, возвращает 404."""
+    routes = get_routes()
+    menu_id = str(uuid.uuid4())
+    id_index.add_menu(menu_id)
+    response = await client.post(reverse("create_submenu", menu_id=menu_id, routes=routes), json=submenu_post)
+    assert response.status_code == HTTPStatus.NOT_FOUND, 'Статус ответа не 404'
+    assert menu_id not in id_index.menus, 'Удаленное меню осталось в индексе'
+
+
+async def test_index_sees_external_writes(client: AsyncClient) -> None:
+    """Меню, записанное в БД в обход процесса, находится и добавляется в индекс."""
+    routes = get_routes()
+    menu_id = str(uuid.uuid4())
+    async with TestAsyncSessionLocal() as session:
+        session.add(Menu(id=menu_id, title=f'External menu {menu_id}', description='External'))
+        await session.commit()
+    response = await client.get(reverse("read_menu", menu_id=menu_id, routes=routes))
+    assert response.status_code == HTTPStatus.OK, 'Статус ответа не 200'
+    assert menu_id in id_index.menus, 'Меню не добавлено в индекс'
+    await client.delete(reverse("delete_menu", menu_id=menu_id, routes=routes))
+
+
+async def test_index_follows_writes(
+    menu_post: dict[str, str],
+    submenu_post: dict[str, str],
+    saved_data: dict[str, Any],
+    client: AsyncClient,
+) -> None:
+    """Созданные и удаленные меню и подменю сразу учитываются индексом."""
+    routes = get_routes()
+    response = await client.post(reverse("create_menu", routes=routes), json=menu_post)
+    menu = response.json()
+    response = await client.post(reverse("create_submenu", menu_id=menu['id'], routes=routes), json=submenu_post)
+    assert response.status_code == HTTPStatus.CREATED, 'Статус ответа не 201'
+    submenu = response.json()
+    response = await client.get(reverse("read_submenu", menu_id=menu['id'], submenu_id=submenu['id'], routes=routes))
+    assert response.status_code == HTTPStatus.OK, 'Статус ответа не 200'
+    await client.delete(reverse("delete_menu", menu_id=menu['id'], routes=routes))
+    response = await client.get(reverse("read_submenu", menu_id=menu['id'], submenu_id=submenu['id'], routes=routes))
+    assert response.status_code == HTTPStatus.NOT_FOUND, 'Статус ответа не 404'
@@ -0,0 +1,79 @@
+import asyncio
+from http import HTTPStatus
+from typing import Any
+
+from httpx import AsyncClient
+
+from app.cache.backends import MemoryCache
+from app.cache.service import cached_or_load
+from app.cache.singleflight import SingleFlight
+from app.metrics import SINGLEFLIGHT_COALESCED
+from service import QueryBudget, get_routes, reverse
+
+
+async def test_single_flight_shares_result() -> None:
+    """Одновременные загрузки по одному ключу выполняются один раз."""
+    single_flight = SingleFlight()
+    calls = 0
+
+    async def load() -> int:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return calls
+
+    results = await asyncio.gather(*[single_flight.do('test', 'key', load) for _ in range(10)])
+    assert results == [1] * 10, 'Запросы получили разные результаты'
+    assert calls == 1, 'Загрузка выполнена несколько раз'
+
+
+async def test_cached_or_load_builds_own_responses() -> None:
+    """Объединенные запросы получают общее тело, но разные объекты ответа."""
+    cache = MemoryCache()
+
+    async def load() -> tuple[dict[str, str], None]:
+        await asyncio.sleep(0.01)
+        return {'title': 'menu'}, None
+
+    responses = await asyncio.gather(*[cached_or_load(cache, 'test', 'shared', '"1"', load) for _ in range(5)])
+    assert len({id(response) for response in responses}) == 5, 'Запросы получили общий объект ответа'
+    assert len({response.body for response in responses}) == 1, 'Запросы получили разные тела'
+
+
+async def test_post_menu(
+    menu_post: dict[str, str],
+    saved_data: dict[str, Any],
+    client: AsyncClient,
+) -> None:
+    """Добавление нового меню."""
+    routes = get_routes()
+    response = await client.post(reverse("create_menu", routes=routes), json=menu_post)
+    assert response.status_code == HTTPStatus.CREATED, 'Статус ответа не 201'
+    saved_data['menu'] = response.json()
+
+
+async def test_concurrent_reads_coalesced(
+    saved_data: dict[str, Any],
+    client: AsyncClient,
+    query_budget: QueryBudget,
+) -> None:
+    """Одновременные одинаковые GET-запросы выполняют один SQL-запрос."""
+    routes = get_routes()
+    url = reverse("read_menu", menu_id=saved_data['menu']['id'], routes=routes)
+    coalesced = SINGLEFLIGHT_COALESCED.labels('read_menu')._value.get()
+    with query_budget(1):
+        responses = await asyncio.gather(*[client.get(url) for _ in range(20)])
+    assert all(response.status_code == HTTPStatus.OK for response in responses), 'Статус ответа не 200'
+    assert len({response.content for response in responses}) == 1, 'Запросы получили разные ответы'
+    assert len({response.headers['ETag'] for response in responses}) == 1, 'Запросы получили разные ETag'
+    assert SINGLEFLIGHT_COALESCED.labels('read_menu')._value.get() > coalesced, 'Запросы не объединены'
+
+
+async def test_delete_menu(
+    saved_data: dict[str, Any],
+    client: AsyncClient,
+) -> None:
+    """Удаление текущего меню."""
+    routes = get_routes()
+    response = await client.delete(reverse("delete_menu", menu_id=saved_data['menu']['id'], routes=routes))
+    assert response.status_code == HTTPStatus.OK, 'Статус ответа не 200'
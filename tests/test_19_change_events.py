@@ -0,0 +1,81 @@
+import asyncio
+import json
+import uuid
+from http import HTTPStatus
+
+import asyncpg
+import pytest
+from httpx import AsyncClient
+
+import app.events
+from app.cache.backends import MemoryCache
+from app.cache.service import dish_key, dishes_key
+from app.config import CHANGE_CHANNEL
+from app.database.service import id_index
+from app.events import (DISH_EVENT, MENU_EVENT, SUBMENU_EVENT, ChangeListener, apply_change, change,
+                        listener_dsn)
+from conftest import TestAsyncSessionLocal, test_cache
+from service import get_routes, reverse
+
+
+async def test_apply_dish_change() -> None:
+    """Событие изменения блюда сбрасывает ключ блюда; список блюд устаревает вместе с версией меню."""
+    cache = MemoryCache()
+    menu_id, submenu_id, dish_id = (str(uuid.uuid4()) for _ in range(3))
+    await cache.set(dish_key(menu_id, submenu_id, dish_id), b'dish')
+    await cache.set(dishes_key(menu_id, submenu_id, 0, 10, None), b'dishes')
+    await apply_change(cache, change(DISH_EVENT, menu_id, submenu_id, dish_id), remote=True)
+    assert await cache.get(dish_key(menu_id, submenu_id, dish_id)) is None, 'Блюдо осталось в кэше'
+    assert await cache.get(dishes_key(menu_id, submenu_id, 0, 10, None)) == b'dishes', 'Кэш просмотрен по префиксу'
+
+
+async def test_listener_applies_foreign_events(client: AsyncClient) -> None:
+    """События других процессов обновляют индекс идентификаторов, свои — пропускаются."""
+    listener = ChangeListener(test_cache, dsn='', session_factory=TestAsyncSessionLocal)
+    menu_id, submenu_id = str(uuid.uuid4()), str(uuid.uuid4())
+    await listener.handle({**change(MENU_EVENT, created=[menu_id]), 'origin': app.events.origin()})
+    assert menu_id not in id_index.menus, 'Применено собственное событие процесса'
+    await listener.handle({**change(MENU_EVENT, created=[menu_id]), 'origin': 'other:1'})
+    await listener.handle({**change(SUBMENU_EVENT, menu_id, created=[submenu_id]), 'origin': 'other:1'})
+    assert id_index.submenus.get(submenu_id) == menu_id, 'Подменю другого процесса не добавлено в индекс'
+    await listener.handle({**change(MENU_EVENT, menu_id, deleted=True), 'origin': 'other:1'})
+    assert menu_id not in id_index.menus, 'Меню, удаленное другим процессом, осталось в индексе'
+
+
+async def test_mutations_notify(
+    menu_post: dict[str, str],
+    client: AsyncClient,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Изменения меню рассылаются через NOTIFY после коммита."""
+    monkeypatch.setattr(app.events, 'CHANGE_NOTIFY', True)
+    routes = get_routes()
+    payloads: asyncio.Queue = asyncio.Queue()
+    connection = await asyncpg.connect(listener_dsn())
+    await connection.add_listener(CHANGE_CHANNEL, lambda *args: payloads.put_nowait(json.loads(args[-1])))
+    try:
+        response = await client.post(reverse("create_menu", routes=routes), json=menu_post)
+        assert response.status_code == HTTPStatus.CREATED, 'Статус ответа не 201'
+        menu = response.json()
+        event = await asyncio.wait_for(payloads.get(), 5)
+        assert event['kind'] == MENU_EVENT, 'Тип события не соответствует ожидаемому'
+        assert event['created'] == [menu['id']], 'Идентификатор меню в событии не соответствует ожидаемому'
+        assert event['origin'] == app.events.origin(), 'Источник события не соответствует ожидаемому'
+        response = await client.delete(reverse("delete_menu", menu_id=menu['id'], routes=routes))
+        assert response.status_code == HTTPStatus.OK, 'Статус ответа не 200'
+        event = await asyncio.wait_for(payloads.get(), 5)
+        assert event['deleted'] and event['menu_id'] == menu['id'], 'Событие удаления не соответствует ожидаемому'
+    finally:
+        await connection.close()
+
+
+async def test_listener_startup_timeout() -> None:
+    """Без доступной БД ожидание подписки ограничено, а цикл переподключения продолжает работу."""
+    listener = ChangeListener(test_cache, dsn='postgresql://postgres@127.0.0.1:1/postgres',
+                              session_factory=TestAsyncSessionLocal)
+    listener.start()
+    try:
+        assert not await listener.wait_connected(0.1), 'Подписка без доступной БД'
+        assert not any(task.done() for task in listener._tasks), 'Цикл переподключения остановлен'
+    finally:
+        await listener.stop()
@@ -0,0 +1,84 @@
+import uuid
+from http import HTTPStatus
+from typing import Any
+
+from httpx import AsyncClient
+
+from app.database.database import engine
+from app.events import MENU_EVENT, change
+from app.feed import ChangeFeed, change_feed
+from app.routers.menu import read_menu_events
+from service import get_routes, reverse
+
+
+def test_feed_resume() -> None:
+    """Возобновление ленты по токену и reset для неизвестного или устаревшего токена."""
+    feed = ChangeFeed(history=2)
+    menu_id = str(uuid.uuid4())
+    for _ in range(2):
+        feed.publish(change(MENU_EVENT, menu_id))
+    subscription = feed.subscribe(menu_id, feed.token(1))
+    assert subscription.queue.qsize() == 1, 'Количество пропущенных событий не соответствует ожидаемому'
+    assert subscription.queue.get_nowait()[0] == 2, 'Номер пропущенного события не соответствует ожидаемому'
+    feed.publish(change(MENU_EVENT, menu_id))
+    for token in (feed.token(0), 'unknown-1'):
+        subscription = feed.subscribe(menu_id, token)
+        assert subscription.queue.get_nowait()[2] == 'reset', 'Для устаревшего токена не отправлен reset'
+
+
+async def test_events_unknown_menu(client: AsyncClient) -> None:
+    """Лента несуществующего меню."""
+    routes = get_routes()
+    response = await client.get(reverse("read_menu_events", menu_id=str(uuid.uuid4()), routes=routes))
+    assert response.status_code == HTTPStatus.NOT_FOUND, 'Статус ответа не 404'
+
+
+async def test_mutations_published(
+    menu_post: dict[str, str],
+    submenu_post: dict[str, str],
+    dish_post: dict[str, str],
+    saved_data: dict[str, Any],
+    client: AsyncClient,
+) -> None:
+    """Изменения подменю, блюд и меню попадают в ленту меню."""
+    routes = get_routes()
+    response = await client.post(reverse("create_menu", routes=routes), json=menu_post)
+    menu = response.json()
+    subscription = change_feed.subscribe(menu['id'])
+    try:
+        response = await client.post(reverse("create_submenu", menu_id=menu['id'], routes=routes), json=submenu_post)
+        submenu = response.json()
+        response = await client.post(
+            reverse("create_dish", menu_id=menu['id'], submenu_id=submenu['id'], routes=routes), json=dish_post,
+        )
+        dish = response.json()
+        response = await client.delete(reverse("delete_menu", menu_id=menu['id'], routes=routes))
+        assert response.status_code == HTTPStatus.OK, 'Статус ответа не 200'
+        events = []
+        while not subscription.queue.empty():
+            _, _, name, data = subscription.queue.get_nowait()
+            events.append((name, data['object'], data['id']))
+        assert events == [
+            ('created', 'submenu', submenu['id']),
+            ('created', 'dish', dish['id']),
+            ('deleted', 'menu', menu['id']),
+        ], 'События ленты не соответствуют ожидаемым'
+    finally:
+        change_feed.unsubscribe(subscription)
+
+
+async def test_subscriber_releases_connection(
+    menu_post: dict[str, str],
+    client: AsyncClient,
+) -> None:
+    """Открытая лента не занимает соединение из пула."""
+    routes = get_routes()
+    menu = (await client.post(reverse("create_menu", routes=routes), json=menu_post)).json()
+    checked_out = engine.pool.checkedout()
+    response = await read_menu_events(menu['id'], 'unknown-1')
+    try:
+        assert 'event: reset' in await response.body_iterator.__anext__(), 'Лента не отправила reset'
+        assert engine.pool.checkedout() == checked_out, 'Подписчик ленты занимает соединение'
+    finally:
+        await response.body_iterator.aclose()
+    await client.delete(reverse("delete_menu", menu_id=menu['id'], routes=routes))
@@ -0,0 +1,139 @@
+import uuid
+from http import HTTPStatus
+from typing import Any
+
+from httpx import AsyncClient
+
+from service import get_routes, reverse
+
+
+async def test_post_objects_for_batch(
+    menu_post: dict[str, str],
+    submenu_post: dict[str, str],
+    dish_post: dict[str, str],
+    dish_2_post: dict[str, str],
+    saved_data: dict[str, Any],
+    client: AsyncClient,
+) -> None:
+    """Добавление меню, подменю и двух блюд."""
+    routes = get_routes()
+    response = await client.post(reverse("create_menu", routes=routes), json=menu_post)
+    saved_data['menu'] = response.json()
+    response = await client.post(reverse("create_submenu", menu_id=saved_data['menu']['id'], routes=routes),
+                                 json=submenu_post)
+    saved_data['submenu'] = response.json()
+    saved_data['dishes'] = []
+    for dish in (dish_post, dish_2_post):
+        response = await client.post(reverse("create_dish", menu_id=saved_data['menu']['id'],
+                                             submenu_id=saved_data['submenu']['id'], routes=routes), json=dish)
+        assert response.status_code == HTTPStatus.CREATED, 'Статус ответа не 201'
+        saved_data['dishes'].append(response.json())
+
+
+def dish_path(saved_data: dict[str, Any], dish_id: str) -> str:
+    routes = get_routes()
+    return reverse("update_dish", menu_id=saved_data['menu']['id'], submenu_id=saved_data['submenu']['id'],
+                   dish_id=dish_id, routes=routes)
+
+
+async def test_batch_atomic(
+    saved_data: dict[str, Any],
+    client: AsyncClient,
+) -> None:
+    """Изменение цен нескольких блюд одним запросом."""
+    routes = get_routes()
+    operations = [
+        {'method': 'PATCH', 'path': dish_path(saved_data, dish['id']),
+         'body': {'title': dish['title'], 'description': dish['description'], 'price': '10.5'}}
+        for dish in saved_data['dishes']
+    ]
+    response = await client.post(reverse("run_batch", routes=routes), json={'operations': operations})
+    assert response.status_code == HTTPStatus.OK, 'Статус ответа не 200'
+    assert [result['status'] for result in response.json()] == [200, 200], 'Статусы операций не 200'
+    assert response.json()[0]['body']['price'] == '10.50', 'Цена в ответе не соответствует ожидаемой'
+    response = await client.get(dish_path(saved_data, saved_data['dishes'][1]['id']))
+    assert response.json()['price'] == '10.50', 'Цена блюда не изменилась'
+
+
+async def test_batch_atomic_rollback(
+    saved_data: dict[str, Any],
+    client: AsyncClient,
+) -> None:
+    """Ошибка одной операции отменяет весь пакет."""
+    routes = get_routes()
+    dish = saved_data['dishes'][0]
+    body = {'title': dish['title'], 'description': dish['description'], 'price': '20'}
+    operations = [
+        {'method': 'PATCH', 'path': dish_path(saved_data, dish['id']), 'body': body},
+        {'method': 'PATCH', 'path': dish_path(saved_data, str(uuid.uuid4())), 'body': body},
+    ]
+    response = await client.post(reverse("run_batch", routes=routes), json={'operations': operations})
+    assert response.status_code == HTTPStatus.NOT_FOUND, 'Статус ответа не 404'
+    assert response.json()['detail']['index'] == 1, 'Номер операции с ошибкой не соответствует ожидаемому'
+    response = await client.get(dish_path(saved_data, dish['id']))
+    assert response.json()['price'] == '10.50', 'Изменение из отмененного пакета сохранено'
+
+
+async def test_batch_per_item(
+    saved_data: dict[str, Any],
+    client: AsyncClient,
+) -> None:
+    """Без atomic ошибка одной операции не отменяет остальные."""
+    routes = get_routes()
+    dish = saved_data['dishes'][0]
+    operations = [
+        {'method': 'DELETE', 'path': dish_path(saved_data, str(uuid.uuid4()))},
+        {'method': 'DELETE', 'path': dish_path(saved_data, dish['id'])},
+        {'method': 'PATCH', 'path': dish_path(saved_data, dish['id']), 'body': {'title': 'No price'}},
+    ]
+    response = await client.post(reverse("run_batch", routes=routes),
+                                 json={'atomic': False, 'operations': operations})
+    assert response.status_code == HTTPStatus.OK, 'Статус ответа не 200'
+    assert [result['status'] for result in response.json()] == [404, 200, 422], \
+        'Статусы операций не соответствуют ожидаемым'
+    response = await client.get(dish_path(saved_data, dish['id']))
+    assert response.status_code == HTTPStatus.NOT_FOUND, 'Блюдо не удалено'
+    response = await client.get(reverse("read_submenu", menu_id=saved_data['menu']['id'],
+                                        submenu_id=saved_data['submenu']['id'], routes=routes))
+    assert response.json()['dishes_count'] == 1, 'Количество блюд не соответствует ожидаемому'
+
+
+async def test_batch_database_error(
+    dish_post: dict[str, str],
+    saved_data: dict[str, Any],
+    client: AsyncClient,
+) -> None:
+    """Нарушение уникальности названия дает 409 с номером операции, а не ошибку сервера."""
+    routes = get_routes()
+    dish = saved_data['dishes'][1]
+    dishes_path = reverse("create_dish", menu_id=saved_data['menu']['id'], submenu_id=saved_data['submenu']['id'],
+                          routes=routes)
+    operations = [
+        {'method': 'POST', 'path': dishes_path, 'body': {**dish_post, 'title': 'Batch dish'}},
+        {'method': 'PATCH', 'path': dish_path(saved_data, dish['id']),
+         'body': {'title': 'Batch dish', 'description': dish['description'], 'price': '30'}},
+    ]
+    response = await client.post(reverse("run_batch", routes=routes), json={'operations': operations})
+    assert response.status_code == HTTPStatus.CONFLICT, 'Статус ответа не 409'
+    assert response.json()['detail']['index'] == 1, 'Номер операции с ошибкой не соответствует ожидаемому'
+
+    response = await client.post(reverse("run_batch", routes=routes),
+                                 json={'atomic': False, 'operations': operations})
+    assert response.status_code == HTTPStatus.OK, 'Статус ответа не 200'
+    assert [result['status'] for result in response.json()] == [201, 409], \
+        'Статусы операций не соответствуют ожидаемым'
+    response = await client.get(dish_path(saved_data, dish['id']))
+    assert response.json()['title'] == dish['title'], 'Изменение из отмененной операции сохранено'
+    response = await client.get(reverse("read_submenu", menu_id=saved_data['menu']['id'],
+                                        submenu_id=saved_data['submenu']['id'], routes=routes))
+    assert response.json()['dishes_count'] == 2, 'Количество блюд не соответствует ожидаемому'
+
+
+async def test_delete_menu(
+    saved_data: dict[str, Any],
+    client: AsyncClient,
+) -> None:
+    """Удаление текущего меню."""
+    routes = get_routes()
+    response = await client.delete(reverse("delete_menu", menu_id=saved_data['menu']['id'], routes=routes))
+    assert response.status_code == HTTPStatus.OK, 'Статус ответа не 200'
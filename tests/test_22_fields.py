@@ -0,0 +1,86 @@
+from http import HTTPStatus
+from typing import Any
+
+from httpx import AsyncClient
+
+from app.database.fields import only, parse_fields
+from app.database.models import Menu as DBMenu
+from app.database.schemas import Menu as MenuOut
+from app.database.statements import MENU
+from service import QueryBudget, get_routes, reverse
+
+
+async def test_post_objects_for_fields(
+    menu_post: dict[str, str],
+    submenu_post: dict[str, str],
+    dish_post: dict[str, str],
+    saved_data: dict[str, Any],
+    client: AsyncClient,
+) -> None:
+    """Добавление меню, подменю и блюда."""
+    routes = get_routes()
+    response = await client.post(reverse("create_menu", routes=routes), json=menu_post)
+    saved_data['menu'] = response.json()
+    response = await client.post(reverse("create_submenu", menu_id=saved_data['menu']['id'], routes=routes),
+                                 json=submenu_post)
+    saved_data['submenu'] = response.json()
+    response = await client.post(reverse("create_dish", menu_id=saved_data['menu']['id'],
+                                         submenu_id=saved_data['submenu']['id'], routes=routes), json=dish_post)
+    assert response.status_code == HTTPStatus.CREATED, 'Статус ответа не 201'
+    saved_data['dish'] = response.json()
+
+
+async def test_menus_fields(
+    saved_data: dict[str, Any],
+    client: AsyncClient,
+    query_budget: QueryBudget,
+) -> None:
+    """Список меню только с запрошенными полями и запрос только их колонок."""
+    routes = get_routes()
+    with query_budget(1) as executed:
+        response = await client.get(reverse("read_all_menus", routes=routes), params={'fields': 'title'})
+    assert response.status_code == HTTPStatus.OK, 'Статус ответа не 200'
+    assert response.json() == [{'title': saved_data['menu']['title'], 'id': saved_data['menu']['id']}], \
+        'Поля меню не соответствуют запрошенным'
+    assert 'description' not in executed[0] and 'dishes_count' not in executed[0], 'Запрошены лишние колонки'
+    response = await client.get(reverse("read_all_menus", routes=routes))
+    assert response.json()[0] == saved_data['menu'], 'Полный ответ изменился после запроса части полей'
+
+
+async def test_objects_fields(
+    saved_data: dict[str, Any],
+    client: AsyncClient,
+) -> None:
+    """Подменю и блюдо только с запрошенными полями."""
+    routes = get_routes()
+    menu_id, submenu_id = saved_data['menu']['id'], saved_data['submenu']['id']
+    response = await client.get(reverse("read_submenu", menu_id=menu_id, submenu_id=submenu_id, routes=routes),
+                                params={'fields': 'dishes_count'})
+    assert response.json() == {'id': submenu_id, 'dishes_count': 1}, 'Поля подменю не соответствуют запрошенным'
+    response = await client.get(reverse("read_dish", menu_id=menu_id, submenu_id=submenu_id,
+                                        dish_id=saved_data['dish']['id'], routes=routes), params={'fields': 'price'})
+    assert response.json() == {'price': saved_data['dish']['price'], 'id': saved_data['dish']['id']}, \
+        'Поля блюда не соответствуют запрошенным'
+
+
+async def test_unknown_fields(client: AsyncClient) -> None:
+    """Запрос несуществующего поля."""
+    routes = get_routes()
+    response = await client.get(reverse("read_all_menus", routes=routes), params={'fields': 'title,secret'})
+    assert response.status_code == HTTPStatus.BAD_REQUEST, 'Статус ответа не 400'
+
+
+async def test_delete_menu(
+    saved_data: dict[str, Any],
+    client: AsyncClient,
+) -> None:
+    """Удаление текущего меню."""
+    routes = get_routes()
+    response = await client.delete(reverse("delete_menu", menu_id=saved_data['menu']['id'], routes=routes))
+    assert response.status_code == HTTPStatus.OK, 'Статус ответа не 200'
+
+
+def test_narrowed_statement_reused() -> None:
+    """Суженный по полям запрос строится один раз для готового запроса и набора полей."""
+    fields = parse_fields('title', MenuOut)
+    assert only(MENU, DBMenu, fields) is only(MENU, DBMenu, fields), 'Суженный запрос построен повторно'